@@ -0,0 +1,75 @@
+# bench_logger.py
+"""
+Micro-benchmark Loggera: stara ścieżka (open/append/close na każdą wiadomość)
+kontra kolejka + wątek zapisujący.
+
+Uruchomienie:
+    python bench_logger.py [--messages 20000] [--dir TEMP_DIR]
+
+Wypisuje liczbę wiadomości na sekundę oraz p50/p99 czasu pojedynczego
+wywołania po stronie wywołującego (czyli kosztu na ścieżce triggera).
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from logger import Logger
+
+
+def legacy_log(log_file, message, level="INFO"):
+    """Kopia poprzedniej implementacji Logger.log (bez widgetu i konsoli)."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    log_message = f"{timestamp} [{level}] - {message}\n"
+    with open(log_file, 'a') as file:
+        file.write(log_message)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run(name, log_call, count, finish=None):
+    latencies = []
+    t_start = time.perf_counter()
+    for i in range(count):
+        t0 = time.perf_counter_ns()
+        log_call(f"Signal sent: bench message {i}")
+        latencies.append(time.perf_counter_ns() - t0)
+    t_calls = time.perf_counter() - t_start
+    if finish:
+        finish()
+    t_total = time.perf_counter() - t_start
+
+    latencies.sort()
+    print(
+        f"{name:<8} {count / t_calls:>12,.0f} msg/s (calls)  "
+        f"{count / t_total:>12,.0f} msg/s (incl. drain)  "
+        f"p50 {percentile(latencies, 50) / 1000:8.2f} us  "
+        f"p99 {percentile(latencies, 99) / 1000:8.2f} us  "
+        f"max {latencies[-1] / 1000:9.2f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--dir", default=None, help="katalog na pliki logu (domyślnie katalog tymczasowy)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        legacy_file = os.path.join(tmp, "legacy.txt")
+        run("before", lambda msg: legacy_log(legacy_file, msg), args.messages)
+
+        logger = Logger(log_dir=os.path.join(tmp, "queued"), echo=False)
+        run("after", logger.log, args.messages, finish=logger.close)
+        if logger.dropped:
+            print(f"after: {logger.dropped} records dropped (queue full)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# bench_map_cpu.py
+"""
+Porównanie zużycia CPU rendererów mapy: "matplotlib" i "canvas".
+
+Dla każdego renderera otwierane jest okno Tk z widokiem mapy, a syntetyczny
+ślad 10 Hz (holding nad punktem) jest dopisywany do TrackStore i rysowany raz
+na sekundę – tak jak robi to Application._update_plot. Mierzony jest czas CPU
+procesu (time.process_time) w stosunku do czasu rzeczywistego.
+
+Uruchomienie (wymaga ekranu):
+    python bench_map_cpu.py [--seconds 60] [--renderer canvas ...] [--output wynik.json]
+
+Wynik: CPU% w trakcie minuty pracy na żywo oraz średni czas CPU jednej
+aktualizacji mapy w milisekundach.
+"""
+import argparse
+import json
+import math
+import sys
+import time
+import tkinter as tk
+
+from mapview import create_map_view
+from trackbuffer import TrackStore
+
+FIX_RATE_HZ = 10
+MAX_MAP_POINTS = 800
+MAP_POINT_BUDGET = 2000
+
+
+def holding_track(i):
+    """Racetrack ok. 4 x 1.5 km wokół 52.2N 21.0E, jedno okrążenie na ~4 min."""
+    t = (i / FIX_RATE_HZ) / 240.0 * 2 * math.pi
+    x = 2000 * math.cos(t) if math.cos(t) > 0 else 2000 * math.cos(t) * 0.9
+    y = 750 * math.sin(t)
+    return 52.2 + y / 111_320.0, 21.0 + x / (111_320.0 * math.cos(math.radians(52.2)))
+
+
+def run_renderer(kind, seconds, prefill_s):
+    root = tk.Tk()
+    root.geometry("600x600")
+    frame = tk.Frame(root)
+    frame.pack(fill=tk.BOTH, expand=True)
+    view = create_map_view(kind, frame)
+    view.pack(fill=tk.BOTH, expand=True)
+
+    track = TrackStore(MAX_MAP_POINTS)
+    state = {"i": 0, "updates": 0, "update_cpu": 0.0}
+    for _ in range(int(prefill_s * FIX_RATE_HZ)):
+        track.append(*holding_track(state["i"]))
+        state["i"] += 1
+
+    def tick():
+        for _ in range(FIX_RATE_HZ):
+            track.append(*holding_track(state["i"]))
+            state["i"] += 1
+        c0 = time.process_time()
+        view.set_track(*track.lod.render(MAP_POINT_BUDGET, recent=MAX_MAP_POINTS))
+        root.update_idletasks()
+        state["update_cpu"] += time.process_time() - c0
+        state["updates"] += 1
+        root.after(1000, tick)
+
+    root.update()
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    root.after(0, tick)
+    root.after(int(seconds * 1000), root.quit)
+    root.mainloop()
+    cpu, wall = time.process_time() - cpu0, time.monotonic() - wall0
+    root.destroy()
+
+    result = {
+        "cpu_percent": 100.0 * cpu / wall,
+        "cpu_seconds_per_minute": 60.0 * cpu / wall,
+        "updates": state["updates"],
+        "cpu_ms_per_update": 1000.0 * state["update_cpu"] / max(state["updates"], 1),
+        "points": len(track),
+    }
+    print(
+        f"{kind:<11} CPU {result['cpu_percent']:6.2f} %  "
+        f"({result['cpu_seconds_per_minute']:5.2f} s CPU/min)  "
+        f"{result['cpu_ms_per_update']:7.2f} ms CPU/update  points={result['points']}"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--prefill", type=float, default=3600.0,
+                        help="sekundy lotu dopisane przed pomiarem (domyślnie 1 h)")
+    parser.add_argument("--renderer", action="append", choices=["matplotlib", "canvas"])
+    parser.add_argument("--output", default=None, help="plik wynikowy JSON")
+    args = parser.parse_args()
+
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as e:
+        sys.exit(f"bench_map_cpu.py wymaga ekranu: {e}")
+
+    results = {name: run_renderer(name, args.seconds, args.prefill)
+               for name in args.renderer or ["matplotlib", "canvas"]}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "map_cpu", "seconds": args.seconds, "renderers": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
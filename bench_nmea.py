@@ -0,0 +1,134 @@
+# bench_nmea.py
+"""
+Porównanie parsera nmeaparser z pynmea2 na nagranym pliku NMEA.
+
+Uruchomienie:
+    python bench_nmea.py [PLIK] [--repeat 5]
+
+PLIK może być surowym zapisem NMEA albo plikiem GNSS_All_Log*.txt
+(linie "RRRR-MM-DD GG:MM:SS.mmm: $GPGGA,..."). Bez pliku generowana jest
+syntetyczna sesja 10 Hz (GGA + RMC + VTG + GSA, nadawca GP, aby stara ścieżka $GPGGA miała co parsować).
+"""
+import argparse
+import time
+
+import nmeaparser
+
+
+def _with_checksum(body):
+    cs = 0
+    for ch in body.encode("ascii"):
+        cs ^= ch
+    return f"${body}*{cs:02X}"
+
+
+def synthetic_session(seconds=1200, rate_hz=10):
+    lines = []
+    for i in range(seconds * rate_hz):
+        t = i / rate_hz
+        hh, rem = divmod(int(t) + 36000, 3600)
+        mm, ss = divmod(rem, 60)
+        hms = f"{hh:02d}{mm:02d}{ss:02d}.{int((t % 1) * 100):02d}"
+        lat = f"{5213 + (i % 600) / 1000:09.4f}"
+        lon = f"{2101 + (i % 900) / 1000:010.4f}"
+        lines.append(_with_checksum(f"GPGGA,{hms},{lat},N,{lon},E,1,12,0.8,152.3,M,34.1,M,,"))
+        lines.append(_with_checksum(f"GPRMC,{hms},A,{lat},N,{lon},E,95.2,271.4,181026,,,A"))
+        lines.append(_with_checksum("GNVTG,271.4,T,,M,95.2,N,176.3,K,A"))
+        lines.append(_with_checksum("GNGSA,A,3,05,07,13,15,18,21,24,,,,,,1.5,0.8,1.2"))
+    return lines
+
+
+def load_lines(path):
+    lines = []
+    with open(path, encoding="ascii", errors="replace") as f:
+        for raw in f:
+            pos = raw.find("$")
+            if pos >= 0:
+                lines.append(raw[pos:].strip())
+    return lines
+
+
+def old_path(lines):
+    """Poprzednia ścieżka _read_gps: dwa bloki $GPGGA, każdy z pynmea2.parse."""
+    import pynmea2
+
+    fixes = 0
+    for line in lines:
+        for _ in range(2):
+            if line.startswith("$GPGGA"):
+                try:
+                    msg = pynmea2.parse(line)
+                except pynmea2.ParseError:
+                    continue
+                if msg.gps_qual != 0:
+                    fields = (msg.timestamp, msg.latitude, msg.longitude, msg.gps_qual,
+                              msg.num_sats, msg.horizontal_dil, msg.altitude)
+                    fixes += 1
+    return fixes
+
+
+def pynmea2_all(lines):
+    """pynmea2 dla GGA/RMC/VTG dowolnego nadawcy (jedno parsowanie na zdanie,
+    odczyt tych samych pól, które zwraca nmeaparser)."""
+    import pynmea2
+
+    records = 0
+    for line in lines:
+        kind = line[3:6]
+        if kind in ("GGA", "RMC", "VTG"):
+            try:
+                msg = pynmea2.parse(line)
+            except pynmea2.ParseError:
+                continue
+            if kind == "GGA":
+                fields = (msg.timestamp, msg.latitude, msg.longitude, msg.gps_qual,
+                          msg.num_sats, msg.horizontal_dil, msg.altitude)
+            elif kind == "RMC":
+                fields = (msg.timestamp, msg.status, msg.latitude, msg.longitude,
+                          msg.spd_over_grnd, msg.true_course, msg.datestamp)
+            else:
+                fields = (msg.true_track, msg.spd_over_grnd_kts, msg.spd_over_grnd_kmph)
+            records += 1
+    return records
+
+
+def fast_path(lines):
+    records = 0
+    parse = nmeaparser.parse
+    for line in lines:
+        if parse(line) is not None:
+            records += 1
+    return records
+
+
+def bench(name, func, lines, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(lines)
+        best = min(best, time.perf_counter() - t0)
+    print(f"{name:<24} {len(lines) / best:>12,.0f} lines/s  {best / len(lines) * 1e6:7.2f} us/line  records={result}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", help="nagrany plik NMEA / GNSS_All_Log*.txt")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = load_lines(args.file) if args.file else synthetic_session()
+    print(f"{len(lines)} lines")
+    try:
+        import pynmea2  # noqa: F401
+    except ImportError:
+        print("pynmea2 nie jest zainstalowany – pomijam porównanie")
+    else:
+        bench("pynmea2 (old _read_gps)", old_path, lines, args.repeat)
+        bench("pynmea2 GGA/RMC/VTG", pynmea2_all, lines, args.repeat)
+    bench("nmeaparser (str)", fast_path, lines, args.repeat)
+    bench("nmeaparser (bytes)", fast_path, [l.encode("ascii") for l in lines], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
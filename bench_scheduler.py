@@ -0,0 +1,118 @@
+# bench_scheduler.py
+"""
+Test długiej sesji dla planisty (scheduler.py) – bez Tk, z symulowanym zegarem.
+
+Skryptowa sesja (session.Session, scenariusz z bench_session.py) jest
+odtwarzana wielokrotnie, akcja co ``--action-interval`` sekund. Efekty
+przejść są obsługiwane jak w aplikacji: "reset_timer" -> LegTimer.reset(),
+"check_triggers" -> przypomnienie po 120 s. Do tego mapa i status fix co 1 s.
+
+Dla każdej symulowanej minuty liczone są wywołania zadań i liczba aktywnych
+zadań. Oba mają pozostać stałe; tryb ``--legacy`` odtwarza dawny timer
+(nowy łańcuch 1 Hz przy każdym resecie) dla porównania.
+
+Uruchomienie:
+    python bench_scheduler.py [--hours 8] [--legacy] [--output wynik.json]
+"""
+import argparse
+import json
+import sys
+
+from bench_session import scenario
+from scheduler import LegTimer, Scheduler
+from session import FakeTriggerSink, Session
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(hours, action_interval_s, step_s, legacy=False):
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    leg_timer = LegTimer(scheduler, lambda elapsed_s: None)
+    state = {"check_handle": None}
+
+    def reset_timer():
+        if legacy:
+            scheduler.call_every(1.0, lambda: None, delay_s=0.0)  # dawny after(1000) bez anulowania
+        else:
+            leg_timer.reset()
+
+    def check_triggers():
+        if state["check_handle"] is not None:
+            state["check_handle"].cancel()
+        state["check_handle"] = scheduler.call_later(120.0, lambda: None)
+
+    effects = {"reset_timer": reset_timer, "check_triggers": check_triggers}
+
+    def on_outcome(outcome):
+        for effect in outcome.transition.effects:
+            handler = effects.get(effect)
+            if handler:
+                handler()
+
+    scheduler.call_every(1.0, lambda: None)  # mapa
+    scheduler.call_every(1.0, lambda: None)  # status fix
+    reset_timer()
+
+    actions = scenario()
+    session = None
+    queue = []
+    next_action = 0.0
+    minutes = []
+    last_minute_calls = 0
+    end = hours * 3600.0
+    while clock.now < end:
+        clock.now = round(clock.now + step_s, 6)
+        if clock.now >= next_action:
+            if not queue:
+                session = Session(FakeTriggerSink(), instructions=[])
+                session.on_outcome = on_outcome
+                session.start()
+                queue = list(actions)
+            session.perform(queue.pop(0))
+            next_action += action_interval_s
+        scheduler.run_due()
+        if clock.now % 60.0 < step_s / 2:
+            minutes.append({
+                "minute": int(clock.now // 60),
+                "callbacks": scheduler.callbacks_run - last_minute_calls,
+                "tasks": len(scheduler),
+            })
+            last_minute_calls = scheduler.callbacks_run
+    return minutes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=8.0)
+    parser.add_argument("--action-interval", type=float, default=5.0, help="sekundy między akcjami")
+    parser.add_argument("--step", type=float, default=0.1, help="krok symulowanego zegara [s]")
+    parser.add_argument("--legacy", action="store_true", help="dawny timer (bez anulowania) dla porównania")
+    parser.add_argument("--output", default=None, help="plik wynikowy JSON")
+    args = parser.parse_args()
+
+    minutes = simulate(args.hours, args.action_interval, args.step, legacy=args.legacy)
+    steady = minutes[5:]  # bez rozbiegu
+    calls = [m["callbacks"] for m in steady]
+    tasks = [m["tasks"] for m in steady]
+    print(
+        f"{len(minutes)} min: wywołania/min {min(calls)}..{max(calls)}, "
+        f"aktywne zadania {min(tasks)}..{max(tasks)}"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "scheduler", "legacy": args.legacy, "minutes": minutes}, f, indent=2)
+
+    # Stały koszt: 3 zadania 1 Hz (+/- przesunięcie fazy przy resecie) i przypomnienie CheckTriggers
+    if not args.legacy and (max(calls) > 3 * 60 + 10 or max(tasks) > 4):
+        sys.exit("Liczba wywołań lub zadań rośnie w czasie sesji")
+
+
+if __name__ == "__main__":
+    main()
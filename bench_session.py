@@ -0,0 +1,92 @@
+# bench_session.py
+"""
+Skryptowe sesje eksperymentu bez GUI (session.Session + FakeTriggerSink).
+
+Każda sesja przechodzi pełny scenariusz: start silnika, trzy holdingi
+(Command -> Reply -> Correct -> Parameters, wlot, Start/End 1–4) z przerwami
+Water / Pause / Alpha / Talk i pomyłką cofniętą przez Error, lądowanie.
+Wynik to liczba akcji na sekundę oraz sprawdzenie, że każda sesja wysłała
+tę samą sekwencję kodów. ``--timing`` dołącza histogramy czasu akcji
+(instrumentation.py) i wypisuje najwolniejsze.
+
+Uruchomienie:
+    python bench_session.py [--sessions 1000] [--timing] [--output wynik.json]
+"""
+import argparse
+import json
+import time
+
+from instrumentation import Instrumentation
+from session import FakeTriggerSink, Session
+
+ENGINE_START = ["start_engine", "taxiing", "take_off", "climbing"]
+ENGINE_END = ["descending", "landing", "taxiing_in", "experiment_end"]
+BRIEFING = ["command", "reply", "correct", "parameters"]
+LEGS = ["end1", "start2", "end2", "start3", "end3"]
+LEGS_4 = ["start4", "end4"]
+
+
+def turns(kind):
+    return [f"{kind}_{step}" for step in ("turn1_start", "turn1_end", "turn2_start", "turn2_end")]
+
+
+def scenario():
+    """Akcje jednej sesji: pierwszy holding, potem kolejne z Start4/End4 przed wlotem."""
+    actions = list(ENGINE_START)
+    actions += BRIEFING + ["direct"] + turns("direct") + ["holding_start"] + LEGS
+    actions += ["water", "water", "talk", "talk"]
+    for kind in ("parallel", "teardrop"):
+        actions += BRIEFING + [kind] + LEGS_4 + turns(kind) + ["holding_start"]
+        actions += ["end1", "error", "end1", "start2", "pause", "pause", "end2", "start3", "end3"]
+        actions += ["alpha", "alpha"]
+    actions += ["check_triggers"] + ENGINE_END
+    return actions
+
+
+def run_session(actions, stats=None):
+    session = Session(FakeTriggerSink(), instructions=[], stats=stats)
+    session.start()
+    session.run(actions)
+    return session.sink.codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--timing", action="store_true", help="histogramy czasu akcji")
+    parser.add_argument("--output", default=None, help="plik wynikowy JSON")
+    args = parser.parse_args()
+
+    stats = Instrumentation() if args.timing else None
+    actions = scenario()
+    reference = run_session(actions)
+    t0 = time.perf_counter()
+    for _ in range(args.sessions):
+        if run_session(actions, stats) != reference:
+            raise SystemExit("Sesje wysłały różne sekwencje kodów")
+    elapsed = time.perf_counter() - t0
+
+    result = {
+        "sessions": args.sessions,
+        "actions_per_session": len(actions),
+        "codes_per_session": len(reference),
+        "sessions_per_s": args.sessions / elapsed,
+        "actions_per_s": args.sessions * len(actions) / elapsed,
+        "us_per_action": 1e6 * elapsed / (args.sessions * len(actions)),
+    }
+    print(
+        f"{args.sessions} sesji x {len(actions)} akcji: {result['sessions_per_s']:.0f} sesji/s, "
+        f"{result['actions_per_s']:.0f} akcji/s ({result['us_per_action']:.1f} us/akcję)"
+    )
+    if stats is not None:
+        result["timing"] = stats.summary()
+        slowest = sorted(result["timing"].items(), key=lambda item: -item[1]["p99_us"])[:5]
+        for name, s in slowest:
+            print(f"  {name:<40} p50 {s['p50_us']:7.1f} us  p99 {s['p99_us']:7.1f} us  max {s['max_us']:8.1f} us")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "session", **result, "codes": reference}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
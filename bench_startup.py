@@ -0,0 +1,82 @@
+# bench_startup.py
+"""
+Pomiar czasu startu aplikacji (import modułów, pierwsza klatka, panel GPS).
+
+Aplikacja jest uruchamiana kilka razy ze zmienną EEG_STARTUP_PROBE – zapisuje
+wtedy czasy startu do pliku JSON (bez okien potwierdzeń) i sama się zamyka.
+
+Uruchomienie (wymaga ekranu):
+    python bench_startup.py [--runs 5] [--importtime] [--output wynik.json]
+
+Czasy liczone od początku importu Exp_PilotHoldingTask:
+    import_s       – import modułu aplikacji,
+    init_s         – koniec Application.__init__,
+    first_frame_s  – pierwsza klatka z panelem triggerów,
+    gps_pane_s     – dołączenie panelu GPS (mapa gotowa).
+process_s to czas całego procesu od uruchomienia interpretera do wyjścia.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Exp_PilotHoldingTask.py")
+
+
+def run_once(extra_args=()):
+    with tempfile.TemporaryDirectory() as tmp:
+        probe = os.path.join(tmp, "startup.json")
+        env = dict(os.environ, EEG_STARTUP_PROBE=probe)
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, *extra_args, APP], env=env,
+                              capture_output=True, text=True, timeout=120)
+        process_s = time.perf_counter() - t0
+        if not os.path.exists(probe):
+            raise RuntimeError(f"Aplikacja nie zapisała czasów startu:\n{proc.stderr}")
+        with open(probe) as f:
+            timing = json.load(f)
+    timing["process_s"] = process_s
+    return timing, proc.stderr
+
+
+def print_importtime(stderr, top=15):
+    """Najwolniejsze importy z wyjścia ``python -X importtime``."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((int(cumulative_us), name.rstrip()))
+    rows.sort(reverse=True)
+    print("\nNajwolniejsze importy (cumulative):")
+    for cumulative_us, name in rows[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="dodatkowy przebieg z python -X importtime")
+    parser.add_argument("--output", default=None, help="plik wynikowy JSON")
+    args = parser.parse_args()
+
+    runs = [run_once()[0] for _ in range(args.runs)]
+    summary = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+    for key, value in summary.items():
+        print(f"{key:<15} {value * 1000:8.0f} ms (mediana z {args.runs})")
+
+    if args.importtime:
+        _, stderr = run_once(("-X", "importtime"))
+        print_importtime(stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "startup", "median": summary, "runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# bench_triggers.py
+"""
+Benchmark opóźnienia i jittera triggerów EEG na wirtualnym porcie szeregowym.
+
+Para pty (Linux) udaje odbiornik DSI: aplikacyjna ścieżka Session.send
+(Logger + TriggerDispatcher + DSISerialPort) pisze do strony slave, a wątek
+odbiorczy czyta stronę master i stempluje każdy bajt time.perf_counter_ns.
+
+Uruchomienie:
+    python bench_triggers.py [--scenario realistic|burst|stress ...] [--output wynik.json]
+
+Wynik (JSON) zawiera dla każdego scenariusza histogram opóźnień
+(wywołanie Session.send -> bajt odebrany), p50/p95/p99/max
+oraz jitter odstępów między bajtami po stronie odbiorczej.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from dsiserialport import DSISerialPort
+from logger import Logger
+from session import Session
+from taskstate import TaskStateEnum
+from triggerdispatcher import TriggerDispatcher, sleep_until_ns
+
+# nazwa: (częstotliwość [Hz] lub None = tak szybko jak się da, liczba triggerów)
+SCENARIOS = {
+    "realistic": (2.0, 60),
+    "burst": (50.0, 500),
+    "stress": (None, 2000),
+}
+
+HISTOGRAM_EDGES_US = [10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000]
+
+BENCH_CODES = [
+    TaskStateEnum.COMMAND.value,
+    TaskStateEnum.REPLY.value,
+    TaskStateEnum.START_RIGHT.value,
+    TaskStateEnum.END1.value,
+    TaskStateEnum.WATER.value,
+]
+
+
+class TriggerPathHarness:
+    """Ścieżka triggera aplikacji bez okna Tk: Session + TriggerDispatcher + DSISerialPort."""
+
+    def __init__(self, port_name, log_dir):
+        self.logger = Logger(log_dir=log_dir, echo=False)
+        self.dsi = DSISerialPort(port_name, self._report_dsi_error)
+        self.dsi.initialize_serial_port()
+        self.trigger_dispatcher = TriggerDispatcher(self.dsi, on_sent=self._on_trigger_written)
+        self.session = Session(self.trigger_dispatcher, self.logger)
+
+    def _on_trigger_written(self, record):
+        self.session.log_trigger_written(record)
+
+    def _report_dsi_error(self, *args):
+        self.logger.log(" ".join(str(a) for a in args), level="ERROR")
+
+    def close(self):
+        self.trigger_dispatcher.stop()
+        self.dsi.close_serial_port()
+        self.logger.close()
+
+
+class LoopbackReceiver(threading.Thread):
+    """Czyta stronę master pty i zapisuje (czas odbioru ns, bajt)."""
+
+    def __init__(self, master_fd):
+        super().__init__(name="LoopbackReceiver", daemon=True)
+        self.master_fd = master_fd
+        self.received = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        import select
+
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([self.master_fd], [], [], 0.05)
+            if not ready:
+                continue
+            data = os.read(self.master_fd, 4096)
+            t_ns = time.perf_counter_ns()
+            for b in data:
+                self.received.append((t_ns, b))
+
+    def wait_for(self, count, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while len(self.received) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=1)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def summarize(values_us):
+    values = sorted(values_us)
+    if not values:
+        return {}
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1],
+        "mean": statistics.fmean(values),
+        "stdev": statistics.pstdev(values),
+    }
+
+
+def histogram(values_us):
+    counts = [0] * (len(HISTOGRAM_EDGES_US) + 1)
+    for v in values_us:
+        i = 0
+        while i < len(HISTOGRAM_EDGES_US) and v > HISTOGRAM_EDGES_US[i]:
+            i += 1
+        counts[i] += 1
+    return {"edges_us": HISTOGRAM_EDGES_US, "counts": counts}
+
+
+def run_scenario(name, rate_hz, count, log_dir):
+    master_fd, slave_fd = os.openpty()
+    port_name = os.ttyname(slave_fd)
+    receiver = LoopbackReceiver(master_fd)
+    receiver.start()
+    harness = TriggerPathHarness(port_name, log_dir)
+
+    sent_ns = []
+    period_ns = int(1e9 / rate_hz) if rate_hz else 0
+    t_start = time.perf_counter_ns()
+    for i in range(count):
+        if period_ns:
+            sleep_until_ns(t_start + i * period_ns)
+        sent_ns.append(time.perf_counter_ns())
+        harness.session.send(BENCH_CODES[i % len(BENCH_CODES)])
+
+    receiver.wait_for(count)
+    harness.close()
+    receiver.stop()
+    os.close(slave_fd)
+    os.close(master_fd)
+
+    received = receiver.received[:count]
+    latencies_us = [(rx - tx) / 1000 for (rx, _), tx in zip(received, sent_ns)]
+    intervals_us = [(received[i + 1][0] - received[i][0]) / 1000 for i in range(len(received) - 1)]
+    jitter_us = [abs(iv - period_ns / 1000) for iv in intervals_us] if period_ns else []
+
+    result = {
+        "rate_hz": rate_hz,
+        "sent": count,
+        "received": len(received),
+        "lost": count - len(received),
+        "latency_us": summarize(latencies_us),
+        "latency_histogram": histogram(latencies_us),
+        "receive_interval_us": summarize(intervals_us),
+        "receive_jitter_us": summarize(jitter_us),
+    }
+    lat = result["latency_us"]
+    print(
+        f"{name:<10} rate={'max' if rate_hz is None else rate_hz:>5} n={len(received):>5}  "
+        f"p50 {lat.get('p50', 0):8.1f} us  p95 {lat.get('p95', 0):8.1f} us  "
+        f"p99 {lat.get('p99', 0):8.1f} us  max {lat.get('max', 0):9.1f} us  "
+        f"jitter(stdev) {result['receive_jitter_us'].get('stdev', 0):8.1f} us"
+    )
+    return result
+
+
+def repo_version():
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenariusz do uruchomienia (domyślnie wszystkie)")
+    parser.add_argument("--output", default=None, help="plik wynikowy JSON")
+    args = parser.parse_args()
+
+    if not hasattr(os, "openpty"):
+        sys.exit("bench_triggers.py wymaga systemu z pty (Linux).")
+
+    results = {
+        "benchmark": "triggers",
+        "version": repo_version(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.scenario or SCENARIOS:
+            rate_hz, count = SCENARIOS[name]
+            results["scenarios"][name] = run_scenario(name, rate_hz, count, tmp)
+
+    output = args.output or f"bench_triggers_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wyniki zapisane w {output}")
+
+
+if __name__ == "__main__":
+    main()
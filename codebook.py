@@ -0,0 +1,89 @@
+# codebook.py
+"""
+Książka kodów triggerów DSI, budowana raz przy imporcie z TaskStateEnum.
+
+Tablice:
+    BY_VALUE   – kod (int) -> członek TaskStateEnum,
+    BYTES      – członek TaskStateEnum -> bajt wysyłany do DSI,
+    BYTES_BY_VALUE – kod (int) -> bajt.
+
+Import sprawdza, że każdy kod mieści się w jednym bajcie i że żadne dwa
+stany nie mają tego samego kodu (Enum po cichu robi z nich aliasy).
+
+Mapa kodów dla strony analizy EEG:
+    python codebook.py --json trigger_codes.json --tsv trigger_codes.tsv
+"""
+import argparse
+import json
+
+from taskstate import TaskStateEnum
+
+CODEBOOK_VERSION = 1
+
+
+def _validate(enum):
+    names_by_value = {}
+    for name, member in enum.__members__.items():
+        value = member.value
+        if not isinstance(value, int) or not 0 <= value <= 255:
+            raise ValueError(f"{enum.__name__}.{name} = {value!r} does not fit in one byte")
+        names_by_value.setdefault(value, []).append(name)
+    duplicates = {v: names for v, names in names_by_value.items() if len(names) > 1}
+    if duplicates:
+        raise ValueError(f"{enum.__name__} has duplicate trigger codes: {duplicates}")
+
+
+_validate(TaskStateEnum)
+
+BY_VALUE = {m.value: m for m in TaskStateEnum}
+BYTES = {m: bytes((m.value,)) for m in TaskStateEnum}
+BYTES_BY_VALUE = {m.value: BYTES[m] for m in TaskStateEnum}
+
+
+def member(code):
+    """Członek TaskStateEnum dla kodu albo None."""
+    return BY_VALUE.get(code)
+
+
+def encode(code):
+    """Bajt triggera dla kodu (int albo TaskStateEnum); ValueError dla nieznanego kodu."""
+    try:
+        if isinstance(code, TaskStateEnum):
+            return BYTES[code]
+        return BYTES_BY_VALUE[code]
+    except KeyError:
+        raise ValueError(f"Unknown trigger code: {code!r}") from None
+
+
+def rows():
+    """(nazwa, kod, bajt hex) w kolejności kodów."""
+    return [(m.name, m.value, f"0x{m.value:02X}") for m in sorted(TaskStateEnum, key=lambda m: m.value)]
+
+
+def export_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": CODEBOOK_VERSION,
+            "codes": [{"name": name, "value": value, "byte": byte} for name, value, byte in rows()],
+        }, f, indent=2)
+
+
+def export_tsv(path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("name\tvalue\tbyte\n")
+        for name, value, byte in rows():
+            f.write(f"{name}\t{value}\t{byte}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", default=None, help="plik wynikowy JSON")
+    parser.add_argument("--tsv", default=None, help="plik wynikowy TSV")
+    args = parser.parse_args()
+    if args.json:
+        export_json(args.json)
+    if args.tsv:
+        export_tsv(args.tsv)
+    if not (args.json or args.tsv):
+        for name, value, byte in rows():
+            print(f"{name}\t{value}\t{byte}")
@@ -1,31 +1,199 @@
 # dsiserialport.py
+"""
+Port szeregowy DSI (triggery EEG) z zarządzaniem połączeniem.
+
+``send_signal`` wywołuje wątek TriggerDispatcher; zapis ma ``write_timeout``,
+więc zawieszony odbiornik nie blokuje kolejki dłużej niż ten budżet. Błąd
+zapisu (odłączony dongle) zamyka port, a wątek DSIReconnect otwiera go
+ponownie z rosnącym odstępem (``reconnect_min_s`` .. ``reconnect_max_s``).
+Pojedynczy timeout zapisu nie zamyka portu: dopiero ``max_write_timeouts``
+timeoutów z rzędu traktujemy jak przerwę. Trigger z tolerowanym timeoutem
+i tak trafia do ``pending`` (nie wiadomo, czy bajt wyszedł), a
+``send_signal`` zwraca False.
+
+Triggery, których nie udało się zapisać w czasie przerwy, trafiają do
+ograniczonej kolejki ``pending`` (kod + czas). Nie są wysyłane ponownie – bajt
+wysłany po czasie dałby w EEG zdarzenie w złym miejscu. Po odzyskaniu
+połączenia (i przy zamknięciu) lista trafia do logu przez ``log_function``.
+``pending`` i początek przerwy współdzielą wątek dispatchera i DSIReconnect –
+dostęp pod ``_state_lock`` (osobnym od blokady portu, żeby log przerwy nie
+czekał na trwający zapis).
+
+``error_function`` dostaje tylko błąd pierwszego otwarcia (przed lotem);
+wszystko, co dzieje się w trakcie sesji, idzie do ``log_function`` – bez
+okien dialogowych.
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import NamedTuple
 
 import serial
 
+import codebook
+
+
+class FailedTrigger(NamedTuple):
+    code: int
+    wall_time: datetime
+    perf_ns: int
+
+
 class DSISerialPort:
-    def __init__(self, serial_port_com, error_function):
+    def __init__(
+        self,
+        serial_port_com,
+        error_function,
+        log_function=None,
+        baud_rate=9600,
+        write_timeout_s=0.05,
+        reconnect_min_s=0.5,
+        reconnect_max_s=30.0,
+        pending_max=256,
+        max_write_timeouts=3,
+    ):
         self._serial_port_dsi = None
         self._serial_port_com = serial_port_com
-        self._baud_rate = 9600
+        self._baud_rate = baud_rate
+        self._write_timeout_s = write_timeout_s
+        self._reconnect_min_s = reconnect_min_s
+        self._reconnect_max_s = reconnect_max_s
+        self._max_write_timeouts = max_write_timeouts
         self._error_function = error_function
-        self.eeg_not_available = False
+        self._log = log_function or error_function
+        self.eeg_not_available = False  # True, gdy port jest otwarty (nazwa historyczna)
+
+        self.pending = deque(maxlen=pending_max)
+        self.pending_dropped = 0
+        self.disconnects = 0
+        self.write_timeouts = 0  # timeouty zapisu z rzędu
+        self._outage_start = None
+        self._lock = threading.Lock()        # port
+        self._state_lock = threading.Lock()  # pending, pending_dropped, _outage_start, disconnects
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread = None
+
+    @property
+    def connected(self):
+        return self._serial_port_dsi is not None
 
     def initialize_serial_port(self):
+        """Pierwsza próba otwarcia; przy błędzie ponowne próby w tle."""
+        if not self._open(self._error_function):
+            self._start_outage()
+        self._thread = threading.Thread(target=self._reconnect_loop, name="DSIReconnect", daemon=True)
+        self._thread.start()
+
+    def _open(self, report=None):
         try:
-            self._serial_port_dsi = serial.Serial(self._serial_port_com, self._baud_rate, timeout=1)
-            self.eeg_not_available = True
+            port = serial.Serial(
+                self._serial_port_com, self._baud_rate, timeout=1, write_timeout=self._write_timeout_s
+            )
         except Exception as error:
-            self._error_function('Error', f'Could not open serial port: {self._serial_port_com}: {error}')
+            if report:
+                report('Error', f'Could not open serial port: {self._serial_port_com}: {error}')
+            return False
+        with self._lock:
+            self._serial_port_dsi = port
+            self.write_timeouts = 0
+        self.eeg_not_available = True
+        return True
 
     def send_signal(self, data):
-        if self._serial_port_dsi:
-            data_byte = data.to_bytes(1, 'big')
-            try:
-                self._serial_port_dsi.write(data_byte)
-            except Exception as error:
-                self._error_function(f'Error: cannot send data: {error}')
+        """Zapis bajtu triggera; False, gdy port jest niedostępny (trigger w ``pending``)."""
+        data_byte = codebook.encode(data)
+        failure = None
+        tolerated = False
+        with self._lock:
+            port = self._serial_port_dsi
+            if port is not None:
+                try:
+                    port.write(data_byte)
+                    self.write_timeouts = 0
+                    return True
+                except serial.SerialTimeoutException as error:
+                    self.write_timeouts += 1
+                    tolerated = self.write_timeouts < self._max_write_timeouts
+                    failure = error
+                except Exception as error:
+                    failure = error
+                if not tolerated:
+                    self._drop_port()
+        if tolerated:
+            self._log(f'Warning: write timeout {self.write_timeouts}/{self._max_write_timeouts}, '
+                      f'trigger {data} may not be delivered: {failure}')
+        elif failure is not None:
+            self._log(f'Error: cannot send data: {failure}')
+            self._start_outage()
+        self._add_pending(data)
+        return False
+
+    def _drop_port(self):
+        port, self._serial_port_dsi = self._serial_port_dsi, None
+        self.eeg_not_available = False
+        try:
+            port.close()
+        except Exception:
+            pass
+
+    def _add_pending(self, code):
+        failed = FailedTrigger(code, datetime.now(), time.perf_counter_ns())
+        with self._state_lock:
+            if len(self.pending) == self.pending.maxlen:
+                self.pending_dropped += 1
+            self.pending.append(failed)
+
+    def _start_outage(self):
+        with self._state_lock:
+            if self._outage_start is None:
+                self._outage_start = time.monotonic()
+                self.disconnects += 1
+        self._wake.set()
+
+    def _reconnect_loop(self):
+        delay = self._reconnect_min_s
+        while not self._closing.is_set():
+            if self.connected:
+                self._wake.wait()
+                self._wake.clear()
+                delay = self._reconnect_min_s
+                continue
+            if self._open():
+                self.report_outage()
+                continue
+            self._closing.wait(delay)
+            delay = min(delay * 2, self._reconnect_max_s)
+
+    def report_outage(self):
+        """Log przerwy: czas trwania i triggery niewysłane w tym czasie; czyści ``pending``."""
+        # Stan zdejmowany pod blokadą, log już poza nią
+        with self._state_lock:
+            outage_start, self._outage_start = self._outage_start, None
+            pending = list(self.pending)
+            self.pending.clear()
+            dropped, self.pending_dropped = self.pending_dropped, 0
+        if outage_start is not None:
+            duration = time.monotonic() - outage_start
+            state = "reconnected" if self.connected else "still unavailable"
+            self._log(
+                f'DSI port {self._serial_port_com} {state} after {duration:.1f} s outage; '
+                f'{len(pending) + dropped} trigger(s) not delivered'
+                + (f' ({dropped} not listed)' if dropped else '')
+            )
+        for failed in pending:
+            self._log(
+                f'Trigger not delivered: {failed.code}, {codebook.member(failed.code)}, '
+                f'at {failed.wall_time.strftime("%H:%M:%S.%f")}, perf_ns={failed.perf_ns}'
+            )
 
     def close_serial_port(self):
-        if self._serial_port_dsi and self._serial_port_dsi.is_open:
-            self._serial_port_dsi.close()
-            pass
\ No newline at end of file
+        self._closing.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.report_outage()
+        with self._lock:
+            if self._serial_port_dsi is not None:
+                self._drop_port()
@@ -0,0 +1,128 @@
+# fixstore.py
+"""
+Binarny zapis fixów GNSS obok GNSS_Log*.csv.
+
+Plik ``GNSS_Log*.fix`` to nagłówek (``HEADER_SIZE`` bajtów) i ciąg rekordów
+o stałym typie ``FIX_DTYPE`` dopisywanych porcjami. Skrypty analityczne mogą
+zmapować całą sesję bez parsowania tekstu::
+
+    fixes = open_fix_store("GNSS_Log20250101_120000.fix")
+    fixes["lat"], fixes["lon"], fixes["t_local"]
+
+Kolumny: t_local (czas lokalny, sekundy epoki Unix), t_gnss (sekundy doby
+UTC z GGA, NaN gdy brak), lat, lon, quality, num_sats, hdop, altitude.
+"""
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b"EEGFIX1\0"
+HEADER_SIZE = 512
+FORMAT_VERSION = 1
+_HEADER_PREFIX = struct.Struct("<8sII")
+
+FIX_DTYPE = np.dtype([
+    ("t_local", "<f8"),
+    ("t_gnss", "<f8"),
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("quality", "u1"),
+    ("num_sats", "u1"),
+    ("hdop", "<f4"),
+    ("altitude", "<f4"),
+])
+
+
+def _build_header(dtype):
+    descr = json.dumps(dtype.descr).encode("ascii")
+    header = _HEADER_PREFIX.pack(MAGIC, HEADER_SIZE, FORMAT_VERSION) + descr
+    if len(header) > HEADER_SIZE:
+        raise ValueError("dtype description does not fit in the fix store header")
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def read_header(path):
+    """Zwraca (rozmiar nagłówka, dtype) pliku fixów."""
+    with open(path, "rb") as f:
+        prefix = f.read(_HEADER_PREFIX.size)
+        magic, header_size, version = _HEADER_PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a GNSS fix store")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported fix store version {version}")
+        descr = f.read(header_size - _HEADER_PREFIX.size).rstrip(b"\0")
+    return header_size, np.dtype([tuple(field) for field in json.loads(descr)])
+
+
+class FixStoreWriter:
+    """Dopisuje fixy porcjami (``chunk_size`` rekordów lub co ``flush_ms``).
+
+    Istniejący plik (np. po restarcie odczytu GNSS) jest kontynuowany.
+    """
+
+    def __init__(self, path, chunk_size=256, flush_ms=1000):
+        self.path = path
+        self.flush_ns = int(flush_ms * 1e6)
+        self._chunk = np.zeros(chunk_size, dtype=FIX_DTYPE)
+        self._count = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            header_size, dtype = read_header(path)
+            if dtype != FIX_DTYPE:
+                raise ValueError(f"{path}: fix store has a different record layout")
+            # Ucinamy ewentualny niepełny ostatni rekord
+            records = (os.path.getsize(path) - header_size) // dtype.itemsize
+            self._file = open(path, "r+b")
+            self._file.truncate(header_size + records * dtype.itemsize)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_build_header(FIX_DTYPE))
+            self._file.flush()
+        self._last_flush_ns = time.monotonic_ns()
+
+    def append(self, t_local, t_gnss, lat, lon, quality, num_sats, hdop, altitude):
+        row = self._chunk[self._count]
+        row["t_local"] = t_local
+        row["t_gnss"] = np.nan if t_gnss is None else t_gnss
+        row["lat"] = lat
+        row["lon"] = lon
+        row["quality"] = quality or 0
+        row["num_sats"] = num_sats or 0
+        row["hdop"] = np.nan if hdop is None else hdop
+        row["altitude"] = np.nan if altitude is None else altitude
+        self._count += 1
+        if self._count == len(self._chunk) or time.monotonic_ns() - self._last_flush_ns >= self.flush_ns:
+            self.flush()
+
+    def flush(self):
+        if self._count:
+            self._file.write(self._chunk[:self._count].tobytes())
+            self._count = 0
+        self._file.flush()
+        self._last_flush_ns = time.monotonic_ns()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_fix_store(path, mode="r"):
+    """Mapuje plik fixów jako tablicę rekordów ``np.memmap`` (bez kopiowania).
+
+    Niepełny ostatni rekord (np. przy zapisie w toku) jest pomijany.
+    """
+    header_size, dtype = read_header(path)
+    count = (os.path.getsize(path) - header_size) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=header_size, shape=(count,))
@@ -0,0 +1,197 @@
+# gnssprocess.py
+"""
+Odczyt GNSS w procesie potomnym (``multiprocessing``) z publikacją fixów
+przez bufor pierścieniowy w ``multiprocessing.shared_memory``.
+
+Proces potomny wykonuje gnssreader.run_acquisition (odczyt portu, parsowanie,
+zapis plików) i dopisuje każdy fix do pamięci współdzielonej. GUI odpytuje
+bufor (``GnssProcess.poll``) bez blokad i bez serializacji obiektów.
+
+Układ pamięci: nagłówek ``HEADER_DTYPE`` i ``capacity`` slotów ``SLOT_DTYPE``.
+Zapis fixu nr ``n`` (od 1) do slotu ``(n - 1) % capacity`` – protokół seqlock:
+
+    slot.seq = -1  ->  pola fixu  ->  slot.seq = n  ->  header.seq = n
+
+Czytelnik kopiuje sloty ``last+1 .. header.seq`` i przyjmuje tylko te, których
+``seq`` był równy oczekiwanemu numerowi przed i po kopii; slot nadpisany
+w trakcie kopii jest odrzucany i liczony w ``dropped``.
+
+Gdy proces potomny się zakończy (np. odłączony odbiornik -> SerialException),
+``poll`` uruchamia go ponownie z rosnącym odstępem (``RESTART_MIN_S`` ..
+``RESTART_MAX_S``); pliki sesji są dopisywane dalej.
+"""
+import multiprocessing as mp
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from fixstore import FIX_DTYPE
+
+HEADER_DTYPE = np.dtype([
+    ("seq", "<i8"),        # numer ostatniego opublikowanego fixu
+    ("capacity", "<i8"),
+    ("fix_status", "<i8"),  # 1 = "A", 0 = "V"
+    ("speed_kn", "<f8"),    # NaN = brak danych
+])
+HEADER_SIZE = 64
+SLOT_DTYPE = np.dtype([("seq", "<i8"), ("mono_ns", "<i8")] + FIX_DTYPE.descr)
+
+EXIT_SERIAL_ERROR = 2
+
+
+def _map_ring(shm, capacity):
+    header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf)
+    slots = np.ndarray((capacity,), dtype=SLOT_DTYPE, buffer=shm.buf, offset=HEADER_SIZE)
+    return header, slots
+
+
+def _attach(name):
+    """Dołączenie do bloku utworzonego przez GnssProcess (właścicielem jest GUI)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 – proces potomny dzieli resource_tracker z GUI
+        return shared_memory.SharedMemory(name=name)
+
+
+class FixRingWriter:
+    """Strona procesu potomnego – publikacja fixów i statusu."""
+
+    def __init__(self, shm):
+        capacity = int(np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf)["capacity"][0])
+        self._header, self._slots = _map_ring(shm, capacity)
+        self._capacity = capacity
+        self._seq = int(self._header["seq"][0])  # po restarcie numeracja jest kontynuowana
+
+    def publish(self, msg, mono_ns, wall_ns):
+        n = self._seq + 1
+        i = (n - 1) % self._capacity
+        self._slots["seq"][i] = -1
+        self._slots[i] = (-1, mono_ns, wall_ns / 1e9, msg.utc_seconds, msg.latitude, msg.longitude, msg.gps_qual,
+                          msg.num_sats or 0, msg.horizontal_dil, msg.altitude)
+        self._slots["seq"][i] = n
+        self._header["seq"][0] = n
+        self._seq = n
+
+    def set_status(self, fix_status, speed_kn):
+        self._header["fix_status"][0] = 1 if fix_status == "A" else 0
+        self._header["speed_kn"][0] = np.nan if speed_kn is None else speed_kn
+
+    def release(self):
+        self._header = self._slots = None
+
+
+def _child_main(config, shm_name, stop_event):
+    """Punkt wejścia procesu potomnego."""
+    import serial
+    from gnssreader import run_acquisition
+
+    shm = _attach(shm_name)
+    ring = FixRingWriter(shm)
+    try:
+        run_acquisition(config, stop_event, on_fix=ring.publish, on_status=ring.set_status)
+    except serial.SerialException as e:
+        print(f"GNSS: port {config.port} niedostępny: {e}", file=sys.stderr)
+        ring.set_status("V", None)
+        sys.exit(EXIT_SERIAL_ERROR)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.release()
+        shm.close()
+
+
+class GnssProcess:
+    """Strona GUI – uruchamia proces odczytu i odpytuje bufor fixów."""
+
+    RESTART_MIN_S = 1.0
+    RESTART_MAX_S = 30.0
+
+    def __init__(self, config, capacity=4096, on_restart=None):
+        """``on_restart(exitcode, delay_s)`` – wołane przy planowaniu restartu."""
+        self.config = config
+        self.capacity = capacity
+        self.on_restart = on_restart
+        self.dropped = 0
+        self.restarts = 0
+        self._ctx = mp.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity * SLOT_DTYPE.itemsize)
+        self._header, self._slots = _map_ring(self._shm, capacity)
+        self._header[0] = (0, capacity, 0, np.nan)
+        self._last_seq = 0
+        self._process = None
+        self._backoff_s = self.RESTART_MIN_S
+        self._restart_at = None
+        self._started_at = None
+
+    def start(self):
+        self._process = self._ctx.Process(
+            target=_child_main,
+            args=(self.config, self._shm.name, self._stop_event),
+            name="GnssReader",
+            daemon=True,
+        )
+        self._process.start()
+        self._started_at = time.monotonic()
+        self._restart_at = None
+
+    @property
+    def fix_status(self):
+        return "A" if self._header["fix_status"][0] == 1 else "V"
+
+    @property
+    def ground_speed_kn(self):
+        speed = float(self._header["speed_kn"][0])
+        return None if np.isnan(speed) else speed
+
+    def poll(self):
+        """Nowe fixy od ostatniego wywołania (tablica ``SLOT_DTYPE``, od najstarszego)."""
+        self._check_process()
+
+        head = int(self._header["seq"][0])
+        if head == self._last_seq:
+            return self._slots[:0].copy()
+        first = max(self._last_seq + 1, head - self.capacity + 1)
+        self.dropped += first - (self._last_seq + 1)
+        expected = np.arange(first, head + 1, dtype=np.int64)
+        index = (expected - 1) % self.capacity
+
+        seq_before = self._slots["seq"][index]
+        batch = self._slots[index]
+        seq_after = self._slots["seq"][index]
+        valid = (seq_before == expected) & (seq_after == expected)
+        self.dropped += int(np.count_nonzero(~valid))
+        self._last_seq = head
+        return batch[valid]
+
+    def _check_process(self):
+        if self._process is None or self._stop_event.is_set():
+            return
+        now = time.monotonic()
+        if self._restart_at is None:
+            if self._process.is_alive():
+                return
+            # Dłuższa poprawna praca zeruje odstęp między restartami
+            if now - self._started_at > self.RESTART_MAX_S:
+                self._backoff_s = self.RESTART_MIN_S
+            self._restart_at = now + self._backoff_s
+            if self.on_restart:
+                self.on_restart(self._process.exitcode, self._backoff_s)
+            self._backoff_s = min(2 * self._backoff_s, self.RESTART_MAX_S)
+        elif now >= self._restart_at:
+            self.restarts += 1
+            self.start()
+
+    def stop(self, timeout=2.0):
+        """Zatrzymanie procesu i zwolnienie pamięci współdzielonej."""
+        self._stop_event.set()
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(1.0)
+        self._header = self._slots = None
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,134 @@
+# gnssreader.py
+"""
+Odczyt GNSS: port szeregowy -> surowy log, CSV, plik fixów oraz callbacki.
+
+``run_acquisition`` jest wspólny dla trybu wątku (Application._read_gps) i
+trybu procesu potomnego (gnssprocess.py). Konfiguracja to ``GnssConfig`` –
+zwykła krotka, którą można przekazać do procesu ``multiprocessing``.
+
+Pliki wynikowe są dopisywane, więc po restarcie odczytu (np. odłączony
+odbiornik) sesja jest kontynuowana w tych samych plikach.
+
+Z ``replay_file`` zamiast portu czytane jest nagranie (replay.ReplaySerial)
+w tempie ``replay_speed`` (None = najszybciej) od chwili ``replay_start``;
+z ``replay_playhead`` (replay.shared_playhead) – na osi wspólnej z odtwarzaniem akcji.
+"""
+import contextlib
+import csv
+from typing import NamedTuple
+
+import serial
+
+import nmeaparser
+from nmeastream import ChunkedSentenceReader
+from rawcapture import format_wall_time, open_raw_capture
+
+CSV_HEADER = ["timestamp", "timestampGnss", "latitude", "longitude", "gps_qual", "num_sats", "horizontal_dil", "altitude"]
+
+
+class GnssConfig(NamedTuple):
+    port: str
+    baud: int
+    raw_file: str
+    raw_format: str = "framed"
+    raw_compression: str = None  # None = zstd, jeśli zainstalowano zstandard, inaczej gzip
+    raw_rotate_s: float = 1800
+    raw_flush_ms: float = 1000
+    csv_file: str = None
+    fixstore_file: str = None
+    replay_file: str = None
+    replay_speed: float = 1.0
+    replay_start: str = None
+    replay_playhead: object = None  # replay.Playhead wspólny z ActionReplayer
+
+
+def run_acquisition(config, stop_event, on_fix=None, on_status=None):
+    """Czyta NMEA do ustawienia ``stop_event``.
+
+    ``on_fix(msg, mono_ns, wall_ns)`` – GGA z fixem (nmeaparser.GgaFix),
+    ``on_status(fix_status, speed_kn)`` – zmiana statusu ("A"/"V") lub prędkości.
+    ``serial.SerialException`` (brak portu, odłączony odbiornik) jest
+    przekazywany dalej – o ponownym otwarciu decyduje wywołujący.
+    """
+    with contextlib.ExitStack() as stack:
+        if config.replay_file:
+            from replay import open_replay
+            ser = stack.enter_context(open_replay(config.replay_file, config.replay_speed, config.replay_start,
+                                                        playhead=config.replay_playhead))
+        else:
+            ser = stack.enter_context(serial.Serial(config.port, config.baud, timeout=1))
+        raw_capture = stack.enter_context(open_raw_capture(
+            config.raw_file,
+            config.raw_format,
+            rotate_s=config.raw_rotate_s,
+            flush_ms=config.raw_flush_ms,
+            compression=config.raw_compression,
+        ))
+
+        csvfile = writer = None
+        if config.csv_file:
+            csvfile = stack.enter_context(open(config.csv_file, "a", newline=""))
+            writer = csv.writer(csvfile)
+            if csvfile.tell() == 0:
+                writer.writerow(CSV_HEADER)
+
+        fix_store = None
+        if config.fixstore_file:
+            from fixstore import FixStoreWriter
+            fix_store = stack.enter_context(FixStoreWriter(config.fixstore_file))
+
+        fix_status, speed_kn = "V", None
+        reader = ChunkedSentenceReader(ser, config.baud)
+        while not stop_event.is_set():
+            sentences = reader.read_sentences()
+            # Zdania to widoki na bufor czytnika – bez kopii do zapisu i parsera.
+            # Błąd jednego zdania (albo callbacku) nie przerywa reszty porcji.
+            for sentence, mono_ns, wall_ns in sentences:
+                try:
+                    raw_capture.write(mono_ns, wall_ns, sentence)
+                except Exception as e:
+                    print("GPS raw capture error:", e)
+
+                try:
+                    msg = nmeaparser.parse(sentence)
+                    if msg is None:
+                        continue
+
+                    status, speed = fix_status, speed_kn
+                    if isinstance(msg, nmeaparser.GgaFix):
+                        status = "A" if msg.gps_qual != 0 else "V"
+                        if msg.gps_qual != 0 and msg.latitude is not None and msg.longitude is not None:  # Mamy fix
+                            # Najpierw trwały zapis (CSV, plik fixów), potem callback – jego błąd nie gubi fixu
+                            if writer:
+                                writer.writerow(
+                                    [format_wall_time(wall_ns), nmeaparser.utc_time(msg.utc_seconds), msg.latitude,
+                                     msg.longitude, msg.gps_qual, msg.num_sats, msg.horizontal_dil, msg.altitude])
+                            if fix_store:
+                                fix_store.append(
+                                    wall_ns / 1e9, msg.utc_seconds, msg.latitude, msg.longitude, msg.gps_qual,
+                                    msg.num_sats, msg.horizontal_dil, msg.altitude)
+                            if on_fix:
+                                try:
+                                    on_fix(msg, mono_ns, wall_ns)
+                                except Exception as e:
+                                    print("GPS fix callback error:", e)
+                    elif isinstance(msg, nmeaparser.RmcFix):
+                        status, speed = msg.status, msg.speed_knots
+                    else:
+                        speed = msg.speed_knots
+
+                    if (status, speed) != (fix_status, speed_kn):
+                        fix_status, speed_kn = status, speed
+                        if on_status:
+                            on_status(fix_status, speed_kn)
+                except Exception as e:
+                    print("GPS parse error:", e)
+
+            try:
+                # Jeden flush CSV na porcję danych; surowy log i plik fixów flushują się same
+                if sentences and csvfile:
+                    csvfile.flush()
+                # Także po pustym odczycie – bez nowych zdań bufor nie czekałby na kolejną ramkę
+                raw_capture.flush_due()
+            except Exception as e:
+                print("GPS log flush error:", e)
@@ -0,0 +1,166 @@
+# instrumentation.py
+"""
+Pomiary opóźnień aplikacji: histogramy o stałym koszcie zapisu.
+
+Histogram ma kubełki potęg dwójki w nanosekundach – indeks kubełka to
+``ns.bit_length()``, więc zapis to kilka operacji na liczbach całkowitych,
+bez alokacji. Instrumentation trzyma histogramy po nazwie, np.:
+
+    loop.lag              – opóźnienie zadania planisty względem terminu (pętla Tk),
+    action.<slot>:<krok>  – obsługa akcji (przejście, triggery, odświeżenie widoku),
+    send.format / send.log / send.enqueue – etapy Session.send,
+    dispatch.queue / dispatch.write       – kolejka dispatchera i zapis na port DSI.
+
+``dump(path)`` zapisuje podsumowanie (count, mean, p50/p90/p99, max) i kubełki
+do JSON; DebugPanel pokazuje podsumowanie na żywo w osobnym oknie.
+
+Histogramy powstają leniwie z wielu wątków (GUI, dispatcher, logger, GPS):
+tworzenie i kopia listy do odczytu (``items``) idą pod jedną blokadą, więc
+podsumowanie w wątku GUI nie widzi słownika zmieniającego się w trakcie
+iteracji. Sam zapis do istniejącego histogramu jest bez blokady.
+"""
+import json
+import threading
+import time
+
+N_BUCKETS = 48  # 2**47 ns ~ 39 h
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self.counts = [0] * N_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, ns):
+        ns = int(ns)
+        if ns < 0:
+            ns = 0
+        self.counts[min(ns.bit_length(), N_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, p):
+        """p-ty percentyl (ns), interpolowany liniowo w kubełku [2**(i-1), 2**i)."""
+        if not self.count:
+            return 0
+        target = p / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= target:
+                low = 1 << (i - 1) if i else 0
+                value = low + (target - seen) / c * ((1 << i) - low)
+                return min(max(value, self.min_ns), self.max_ns)
+            seen += c
+        return self.max_ns
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "min_us": (self.min_ns or 0) / 1000,
+            "p50_us": self.percentile(50) / 1000,
+            "p90_us": self.percentile(90) / 1000,
+            "p99_us": self.percentile(99) / 1000,
+            "max_us": self.max_ns / 1000,
+        }
+
+
+class Instrumentation:
+    def __init__(self):
+        self.histograms = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        h = self.histograms.get(name)
+        if h is None:
+            with self._lock:
+                h = self.histograms.get(name)
+                if h is None:
+                    h = self.histograms[name] = Histogram()
+        return h
+
+    def record(self, name, ns):
+        self.histogram(name).record(ns)
+
+    def items(self):
+        """Posortowana kopia (nazwa, histogram) – bezpieczna przy tworzeniu histogramów w innych wątkach."""
+        with self._lock:
+            items = list(self.histograms.items())
+        return sorted(items)
+
+    def summary(self):
+        return {name: h.summary() for name, h in self.items()}
+
+    def dump(self, path):
+        """Podsumowanie i kubełki (granice 2**i ns) do pliku JSON."""
+        data = {
+            "started": self.started,
+            "finished": time.time(),
+            "bucket_upper_ns": [1 << i for i in range(N_BUCKETS)],
+            "histograms": {
+                name: {**h.summary(), "counts": h.counts}
+                for name, h in self.items()
+            },
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+class LoopLagMonitor:
+    """Mierzy, o ile później niż w terminie pętla Tk wykonuje zadanie planisty."""
+
+    def __init__(self, scheduler, stats, interval_s=0.1, name="loop.lag"):
+        self._scheduler = scheduler
+        self._hist = stats.histogram(name)
+        self.interval_s = interval_s
+        self._handle = scheduler.call_every(interval_s, self._tick)
+
+    def _tick(self):
+        # ``due`` jest już przestawione na następny okres (także o pominięte);
+        # opóźnienie liczymy od terminu, który właśnie się wykonuje
+        self._hist.record((self._scheduler.clock() - self._handle.last_due) * 1e9)
+
+    def stop(self):
+        self._handle.cancel()
+
+
+class DebugPanel:
+    """Okno z podsumowaniem histogramów, odświeżane co ``refresh_s``."""
+
+    def __init__(self, master, scheduler, stats, refresh_s=1.0):
+        import tkinter as tk
+        from tkinter.scrolledtext import ScrolledText
+
+        self._stats = stats
+        self.window = tk.Toplevel(master)
+        self.window.title("Timing")
+        self._text = ScrolledText(self.window, width=110, height=24, font=("Courier", 9), state="disabled")
+        self._text.pack(fill=tk.BOTH, expand=True)
+        self._handle = scheduler.call_every(refresh_s, self.refresh, delay_s=0.0)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+    def refresh(self):
+        lines = [f"{'name':<40}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>11}  [us]"]
+        for name, s in self._stats.summary().items():
+            lines.append(
+                f"{name:<40}{s['count']:>8}{s['mean_us']:>10.1f}{s['p50_us']:>10.1f}"
+                f"{s['p90_us']:>10.1f}{s['p99_us']:>10.1f}{s['max_us']:>11.1f}"
+            )
+        self._text.config(state="normal")
+        self._text.delete("1.0", "end")
+        self._text.insert("end", "\n".join(lines))
+        self._text.config(state="disabled")
+
+    def close(self):
+        self._handle.cancel()
+        self.window.destroy()
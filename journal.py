@@ -0,0 +1,300 @@
+# journal.py
+"""
+Dziennik sesji: jedna baza SQLite (WAL) ze wszystkimi zdarzeniami.
+
+Tabela ``events`` – jeden wiersz na zdarzenie, wspólny znacznik czasu
+``mono_ns`` (time.monotonic_ns, ten sam zegar co fixy GNSS i rawcapture)
+oraz ``wall`` (sekundy epoki Unix). Typy zdarzeń (kolumna ``type``):
+
+    trigger          – kod zlecony przez sesję (code, name, input_ns),
+    trigger_written  – bajt zapisany na port DSI (code, enqueue_ns, write_ns, input_ns),
+    action           – akcja operatora (name = slot, text = krok, input_ns),
+    instruction      – wygenerowany tekst instrukcji (text),
+    fix              – fix GNSS (t_gnss, lat, lon, quality, num_sats, hdop, altitude).
+
+``input_ns`` / ``enqueue_ns`` / ``write_ns`` to dokładne stemple
+time.perf_counter_ns z handlera wejścia i dispatchera triggerów.
+
+Z ``timebase`` (timebase.TimeBase) wątek zapisu uzupełnia triggerom
+``t_gnss`` (UTC z GNSS, sekundy od północy) i ``t_gnss_err`` (1 sigma);
+dla trigger_written liczony z ``write_ns``.
+
+Metody Journal tylko wkładają krotkę do kolejki (porcja fixów z GnssProcess
+idzie jako jeden element i jest rozwijana na wiersze dopiero w wątku zapisu,
+więc wątek GUI nie robi nic per fix); wątek JournalWriter zapisuje je porcjami w jednej transakcji (``batch_max`` wierszy albo co
+``flush_interval`` s). Przy pełnej kolejce zdarzenie jest pomijane
+(``dropped``) – ścieżka triggera nigdy nie czeka na dysk.
+
+Indeksy po (mono_ns) i (type, mono_ns), więc zapytania zakresowe, np.
+wszystkie fixy między START2 a END2, nie przeglądają całej tabeli::
+
+    conn = connect("Journal20250101_120000.sqlite")
+    between(conn, "START2", "END2", type=FIX)
+
+Z wiersza poleceń:
+    python journal.py Journal20250101_120000.sqlite --between START2 END2 [--type fix] [--occurrence 0]
+"""
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+
+import codebook
+from taskstate import TaskStateEnum
+
+TRIGGER = "trigger"
+TRIGGER_WRITTEN = "trigger_written"
+ACTION = "action"
+INSTRUCTION = "instruction"
+FIX = "fix"
+
+COLUMNS = (
+    "mono_ns", "wall", "type", "code", "name", "text",
+    "input_ns", "enqueue_ns", "write_ns",
+    "t_gnss", "lat", "lon", "quality", "num_sats", "hdop", "altitude", "t_gnss_err",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    mono_ns INTEGER NOT NULL,
+    wall REAL NOT NULL,
+    type TEXT NOT NULL,
+    code INTEGER,
+    name TEXT,
+    text TEXT,
+    input_ns INTEGER,
+    enqueue_ns INTEGER,
+    write_ns INTEGER,
+    t_gnss REAL,
+    lat REAL,
+    lon REAL,
+    quality INTEGER,
+    num_sats INTEGER,
+    hdop REAL,
+    altitude REAL,
+    t_gnss_err REAL
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (mono_ns);
+CREATE INDEX IF NOT EXISTS events_type_time ON events (type, mono_ns);
+"""
+
+_INSERT = f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+_EMPTY_FIX = (None,) * 8
+_TYPE, _WRITE_NS, _T_GNSS, _T_GNSS_ERR = (COLUMNS.index(c) for c in ("type", "write_ns", "t_gnss", "t_gnss_err"))
+
+
+class Journal:
+    def __init__(self, path, queue_size=100_000, batch_max=500, flush_interval=0.2, timebase=None):
+        self.path = path
+        self.timebase = timebase
+        self.batch_max = batch_max
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        # Schemat zakładany od razu – błąd ścieżki wychodzi w konstruktorze, nie w wątku
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.close()
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="JournalWriter", daemon=True)
+        self._writer_thread.start()
+
+    # ------------------------------------------------------------------
+    # Zdarzenia (dowolny wątek)
+    # ------------------------------------------------------------------
+    def _put(self, row, count=1):
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += count
+
+    def trigger(self, code, input_ns=None):
+        member = codebook.member(code)
+        self._put((time.monotonic_ns(), time.time(), TRIGGER, code, member.name if member else None, None,
+                   input_ns, None, None) + _EMPTY_FIX)
+
+    def trigger_written(self, record):
+        """TriggerRecord z wątku dispatchera."""
+        member = codebook.member(record.code)
+        self._put((time.monotonic_ns(), time.time(), TRIGGER_WRITTEN, record.code, member.name if member else None,
+                   None, record.input_ns, record.enqueue_ns, record.write_ns) + _EMPTY_FIX)
+
+    def action(self, slot, step, input_ns=None):
+        self._put((time.monotonic_ns(), time.time(), ACTION, None, slot, step, input_ns, None, None) + _EMPTY_FIX)
+
+    def instruction(self, text):
+        self._put((time.monotonic_ns(), time.time(), INSTRUCTION, None, None, text, None, None, None) + _EMPTY_FIX)
+
+    def fix(self, msg, mono_ns, wall_ns):
+        """GGA z fixem (nmeaparser.GgaFix) ze stemplami z NmeaStream."""
+        self._put((mono_ns, wall_ns / 1e9, FIX, None, msg.talker, None, None, None, None,
+                   msg.utc_seconds, msg.latitude, msg.longitude, msg.gps_qual, msg.num_sats,
+                   msg.horizontal_dil, msg.altitude, None))
+
+    def fixes(self, batch):
+        """Fixy z GnssProcess.poll() (tablica ``SLOT_DTYPE``) – jeden element kolejki na porcję."""
+        if len(batch):
+            self._put(_FixBatch(batch), len(batch))
+
+    # ------------------------------------------------------------------
+    # Wątek zapisu
+    # ------------------------------------------------------------------
+    def _writer_loop(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        running = True
+        while running:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            row = first
+            while True:
+                if row is None:
+                    running = False
+                    break
+                if isinstance(row, _FixBatch):
+                    batch.extend(row.rows())
+                else:
+                    batch.append(row)
+                if len(batch) >= self.batch_max:
+                    break
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch and self.timebase is not None:
+                batch = [self._with_gnss_time(row) for row in batch]
+            if batch:
+                try:
+                    with conn:
+                        conn.executemany(_INSERT, batch)
+                    self.written += len(batch)
+                except sqlite3.Error as e:
+                    print("Błąd zapisu dziennika:", e)
+        conn.close()
+
+    def _with_gnss_time(self, row):
+        kind = row[_TYPE]
+        if kind == TRIGGER:
+            gnss_time = self.timebase.gnss_time(row[0])
+        elif kind == TRIGGER_WRITTEN:
+            gnss_time = self.timebase.gnss_time_perf(row[_WRITE_NS])
+        else:
+            return row
+        if gnss_time is None:
+            return row
+        row = list(row)
+        row[_T_GNSS], row[_T_GNSS_ERR] = gnss_time
+        return tuple(row)
+
+    def close(self, timeout=5.0):
+        """Zapis zaległych zdarzeń i zamknięcie bazy."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer_thread.join(timeout=timeout)
+
+
+class _FixBatch:
+    """Porcja fixów z GnssProcess.poll() w kolejce; wiersze tworzy wątek zapisu."""
+
+    __slots__ = ("batch",)
+
+    def __init__(self, batch):
+        self.batch = batch
+
+    def rows(self):
+        batch = self.batch
+        return [
+            (mono_ns, t_local, FIX, None, None, None, None, None, None,
+             t_gnss, lat, lon, quality, num_sats, hdop, altitude, None)
+            for mono_ns, t_local, t_gnss, lat, lon, quality, num_sats, hdop, altitude in zip(
+                batch["mono_ns"].tolist(), batch["t_local"].tolist(), batch["t_gnss"].tolist(),
+                batch["lat"].tolist(), batch["lon"].tolist(), batch["quality"].tolist(),
+                batch["num_sats"].tolist(), batch["hdop"].tolist(), batch["altitude"].tolist(),
+            )
+        ]
+
+
+# ----------------------------------------------------------------------
+# Odczyt
+# ----------------------------------------------------------------------
+def connect(path):
+    """Połączenie tylko do odczytu (także w trakcie sesji – WAL)."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _code(code):
+    """Kod triggera z int, TaskStateEnum albo nazwy ("START2")."""
+    if isinstance(code, TaskStateEnum):
+        return code.value
+    if isinstance(code, str):
+        return TaskStateEnum[code].value
+    return int(code)
+
+
+def events(conn, type=None, start_ns=None, end_ns=None):
+    """Zdarzenia z przedziału [start_ns, end_ns] (mono_ns), opcjonalnie jednego typu."""
+    where, args = [], []
+    if type is not None:
+        where.append("type = ?")
+        args.append(type)
+    if start_ns is not None:
+        where.append("mono_ns >= ?")
+        args.append(start_ns)
+    if end_ns is not None:
+        where.append("mono_ns <= ?")
+        args.append(end_ns)
+    sql = "SELECT * FROM events"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return conn.execute(sql + " ORDER BY mono_ns, id", args).fetchall()
+
+
+def trigger_ns(conn, code, occurrence=0, after_ns=None, type=TRIGGER):
+    """mono_ns ``occurrence``-tego triggera o danym kodzie (po ``after_ns``); None, gdy brak."""
+    row = conn.execute(
+        "SELECT mono_ns FROM events WHERE type = ? AND code = ? AND mono_ns >= ? "
+        "ORDER BY mono_ns, id LIMIT 1 OFFSET ?",
+        (type, _code(code), after_ns if after_ns is not None else -2**63, occurrence),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def between(conn, start_code, end_code, type=FIX, occurrence=0):
+    """Zdarzenia ``type`` między ``occurrence``-tym triggerem start_code a następnym end_code."""
+    start_ns = trigger_ns(conn, start_code, occurrence)
+    if start_ns is None:
+        return []
+    end_ns = trigger_ns(conn, end_code, after_ns=start_ns)
+    return events(conn, type, start_ns, end_ns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="plik dziennika .sqlite")
+    parser.add_argument("--between", nargs=2, metavar=("START", "END"), help="nazwy albo kody triggerów")
+    parser.add_argument("--type", default=None, help="typ zdarzeń (domyślnie fix dla --between, wszystkie bez)")
+    parser.add_argument("--occurrence", type=int, default=0, help="które wystąpienie START (od 0)")
+    args = parser.parse_args()
+
+    conn = connect(args.path)
+    if args.between:
+        start, end = (int(c) if c.isdigit() else c for c in args.between)
+        rows = between(conn, start, end, type=args.type or FIX, occurrence=args.occurrence)
+    else:
+        rows = events(conn, args.type)
+    print("\t".join(COLUMNS))
+    for row in rows:
+        print("\t".join("" if row[c] is None else str(row[c]) for c in COLUMNS))
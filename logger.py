@@ -1,10 +1,32 @@
 import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from tkinter.scrolledtext import ScrolledText
 
 class Logger:
-    def __init__(self, log_dir: str = "c:\\eeg\\PilotHoldingTask\\Log"):
-        """Initialize the Logger class with a custom log directory and set up the log file."""
+    def __init__(
+        self,
+        log_dir: str = "c:\\eeg\\PilotHoldingTask\\Log",
+        queue_size: int = 10_000,
+        flush_interval: float = 0.5,
+        flush_bytes: int = 64 * 1024,
+        echo: bool = True,
+    ):
+        """Initialize the Logger class with a custom log directory and set up the log file.
+
+        Records are handed to a background writer thread through a bounded queue,
+        so ``log`` costs a queue put on the caller side. The writer keeps one file
+        handle open and flushes when ``flush_bytes`` are pending or
+        ``flush_interval`` seconds have passed since the last flush.
+
+        The log file is opened here, so a bad path raises to the caller. ``log``
+        never blocks: when the queue is full the record is counted in ``dropped``.
+        Write errors are counted in ``write_errors`` and the writer keeps running.
+        """
         # Create log directory if it doesn't exist
         self.log_dir = log_dir
         os.makedirs(self.log_dir, exist_ok=True)
@@ -16,33 +38,179 @@ class Logger:
 
         # Initialize optional log display attribute
         self.log_display = None
+        self.display_max_lines = 1000
+        self.display_batched = True
+        self.display_frame_ms = 50
+        self._display_pending = deque(maxlen=self.display_max_lines)
+        self._display_after_id = None
+
+        # Background writer
+        self.echo = echo
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self.dropped = 0
+        self.write_errors = 0
+        self._file = open(self.log_file, 'a')
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name="LoggerWriter", daemon=True
+        )
+        self._writer_thread.start()
 
 
     def get_filename_timestamp(self):
         return self._timestamp
 
-    def set_log_display(self, log_display: ScrolledText):
-        """Set the log display widget for GUI applications."""
+    def set_log_display(
+        self,
+        log_display: ScrolledText,
+        max_lines: int = 1000,
+        batched: bool = True,
+        frame_ms: int = 50,
+    ):
+        """Set the log display widget for GUI applications.
+
+        The widget keeps at most ``max_lines`` lines (oldest are trimmed from the
+        top). In batched mode lines are queued and inserted once per frame by an
+        ``after()`` loop running on the Tk main thread; while the widget is not
+        viewable pending lines are dropped instead of rendered.
+        """
+        self._stop_display_loop()
         self.log_display = log_display
+        self.display_max_lines = max_lines
+        self.display_batched = batched
+        self.display_frame_ms = frame_ms
+        self._display_pending = deque(maxlen=max_lines)
+        if log_display is not None and batched:
+            self._display_after_id = log_display.after(frame_ms, self._display_tick)
+
+    @staticmethod
+    def format_record(created: float, level: str, message: str) -> str:
+        """Format a queued record into the log line written to file and console."""
+        timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        return f"{timestamp} [{level}] - {message}\n"
 
     def log(self, message: str, level: str = "INFO"):
         """Log a message with a specified level to the log file and print it to the console."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        log_message = f"{timestamp} [{level}] - {message}\n"
+        created = time.time()
 
-        # Write to log file
-        with open(self.log_file, 'a') as file:
-            file.write(log_message)
-
-        # Print to console
-        print(log_message, end='')  # Avoid extra newline in console output
+        # Hand over to the writer thread; never wait on a full queue (Tk / trigger path)
+        if not self._closed:
+            try:
+                self._queue.put_nowait((created, level, message))
+            except queue.Full:
+                self.dropped += 1
 
         # Display in log display widget if set
         if self.log_display:
-            self.log_display.config(state='normal')
-            self.log_display.insert('end', log_message)
-            self.log_display.yview('end')
-            self.log_display.config(state='disabled')
+            if self.display_batched:
+                self._display_pending.append((created, level, message))
+            else:
+                self._insert_display(self.format_record(created, level, message))
+
+    def _writer_loop(self):
+        """Writer thread: drain the queue in batches into one open file handle."""
+        pending = 0
+        last_flush = time.monotonic()
+        with self._file as file:
+            running = True
+            while running:
+                try:
+                    batch = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    batch = []
+                # Zbieramy wszystko, co już czeka w kolejce
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                lines = []
+                for record in batch:
+                    if record is None:
+                        running = False
+                        continue
+                    lines.append(self.format_record(*record))
+
+                if not running and self.dropped:
+                    lines.append(self.format_record(
+                        time.time(), "ERROR", f"{self.dropped} log records dropped (queue full)"))
+
+                if lines:
+                    chunk = "".join(lines)
+                    self._write(file.write, chunk)
+                    pending += len(chunk)
+                    if self.echo:
+                        sys.stdout.write(chunk)
+
+                now = time.monotonic()
+                if pending and (
+                    not running
+                    or pending >= self.flush_bytes
+                    or now - last_flush >= self.flush_interval
+                ):
+                    self._write(file.flush)
+                    if self.echo:
+                        sys.stdout.flush()
+                    pending = 0
+                    last_flush = now
+
+    def _write(self, operation, *args):
+        """File write / flush on the writer thread; an error is counted, not fatal."""
+        try:
+            operation(*args)
+        except (OSError, ValueError) as error:
+            self.write_errors += 1
+            if self.write_errors == 1:
+                sys.stderr.write(f"Logger: cannot write {self.log_file}: {error}\n")
+
+    def _insert_display(self, text: str):
+        """Append text to the log display and trim it to display_max_lines."""
+        display = self.log_display
+        display.config(state='normal')
+        display.insert('end', text)
+        excess = int(display.index('end-1c').split('.')[0]) - self.display_max_lines
+        if excess > 0:
+            display.delete('1.0', f'{excess + 1}.0')
+        display.yview('end')
+        display.config(state='disabled')
+
+    def _display_tick(self):
+        """Frame callback: render all lines queued since the previous frame."""
+        self._display_after_id = None
+        display = self.log_display
+        if display is None:
+            return
+        if self._display_pending:
+            records = []
+            while self._display_pending:
+                records.append(self._display_pending.popleft())
+            if display.winfo_viewable():
+                self._insert_display("".join(self.format_record(*r) for r in records))
+        self._display_after_id = display.after(self.display_frame_ms, self._display_tick)
+
+    def _stop_display_loop(self):
+        if self._display_after_id is not None and self.log_display is not None:
+            try:
+                self.log_display.after_cancel(self._display_after_id)
+            except Exception:
+                pass
+        self._display_after_id = None
+
+    def close(self, timeout: float = 5.0):
+        """Drain pending records, flush and close the log file."""
+        self._stop_display_loop()
+        if self._closed:
+            return
+        # No new records after this point; everything queued so far is written before the sentinel
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._writer_thread.join(timeout=timeout)
 
     def log_click(self, button_text: str):
         """Log a button click action with specific details."""
@@ -59,6 +227,7 @@ class Logger:
     def clear_log_display(self):
         """Clear the log display widget, if it is set."""
         if self.log_display:
+            self._display_pending.clear()
             self.log_display.config(state='normal')
             self.log_display.delete('1.0', 'end')
             self.log_display.config(state='disabled')
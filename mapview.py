@@ -0,0 +1,224 @@
+# mapview.py
+"""
+Widok mapy GPS w lewym panelu aplikacji.
+
+MatplotlibMapView tworzy artystów raz i przy nowych punktach aktualizuje tylko
+dane linii (``Line2D.set_data``). Tło osi jest buforowane i przy każdej
+aktualizacji odtwarzane przez blitting; pełne przerysowanie następuje tylko,
+gdy ślad wyjdzie poza bieżący widok (zmiana skali) albo zmieni się rozmiar okna.
+
+CanvasMapView rysuje ten sam ślad bezpośrednio na ``tk.Canvas`` w lokalnym
+układzie metrycznym (rzut równoodległościowy wokół pierwszego fixa): linię
+śladu, bieżącą pozycję, siatkę i podziałkę. Elementy są tworzone raz, a przy
+aktualizacji zmieniane są tylko ich współrzędne – bez rasteryzacji Agg.
+
+``create_map_view("canvas" | "matplotlib", master)`` wybiera renderer.
+"""
+import math
+import tkinter as tk
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_000.0
+
+
+class MatplotlibMapView:
+    # Margines (ułamek rozpiętości) dodawany przy zmianie skali oraz
+    # minimalna rozpiętość osi w stopniach, gdy jest tylko jeden punkt
+    MARGIN = 0.25
+    MIN_SPAN_DEG = 0.002
+
+    def __init__(self, master):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.fig = Figure()
+        self.ax = self.fig.add_subplot()
+        self.ax.set_title("GPS position (Live)")
+        self.ax.set_xlabel("Longitude")
+        self.ax.set_ylabel("Latitude")
+        self.ax.set_aspect("equal", adjustable="datalim")
+        self.ax.grid(True)
+        (self.line,) = self.ax.plot([], [], marker="o", linestyle="-", color="blue", animated=True)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self._background = None
+        self._has_data = False
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def pack(self, **kwargs):
+        self.widget.pack(**kwargs)
+
+    def _on_draw(self, event):
+        """Po pełnym przerysowaniu: zapamiętaj tło i dorysuj ślad."""
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        if self._has_data:
+            self.ax.draw_artist(self.line)
+
+    def _contains(self, lons, lats):
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        return x0 <= np.min(lons) and np.max(lons) <= x1 and y0 <= np.min(lats) and np.max(lats) <= y1
+
+    def _rescale(self, lons, lats):
+        x0, x1 = np.min(lons), np.max(lons)
+        y0, y1 = np.min(lats), np.max(lats)
+        dx = max(x1 - x0, self.MIN_SPAN_DEG) * self.MARGIN
+        dy = max(y1 - y0, self.MIN_SPAN_DEG) * self.MARGIN
+        self.ax.set_xlim(x0 - dx, x1 + dx)
+        self.ax.set_ylim(y0 - dy, y1 + dy)
+
+    def set_track(self, lons, lats):
+        """Ustawia ślad (sekwencje długości geograficznej i szerokości)."""
+        if len(lons) == 0:
+            return
+        self.line.set_data(lons, lats)
+        self._has_data = True
+
+        if self._background is None or not self._contains(lons, lats):
+            self._rescale(lons, lats)
+            self.canvas.draw_idle()  # _on_draw odświeży tło i dorysuje ślad
+            return
+
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
+
+
+class CanvasMapView:
+    MARGIN = 0.25
+    MIN_SPAN_M = 200.0
+    GRID_LINES = 16  # pula linii siatki (pionowe + poziome)
+
+    def __init__(self, master, bg="white"):
+        self.widget = tk.Canvas(master, bg=bg, highlightthickness=0)
+        c = self.widget
+        self._grid_items = [c.create_line(0, 0, 0, 0, fill="#dddddd", state="hidden")
+                            for _ in range(self.GRID_LINES)]
+        self._track_item = c.create_line(0, 0, 0, 0, fill="blue", width=2, state="hidden")
+        self._pos_item = c.create_oval(0, 0, 0, 0, fill="red", outline="black", state="hidden")
+        self._scale_item = c.create_line(0, 0, 0, 0, width=3, state="hidden")
+        self._scale_text = c.create_text(0, 0, anchor="sw", state="hidden")
+        self._title = c.create_text(8, 8, anchor="nw", text="GPS position (Live)")
+
+        self._origin = None      # (lat0, lon0) układu lokalnego
+        self._view = None        # (x0, y0, x1, y1) widok w metrach
+        self._x = self._y = None
+        c.bind("<Configure>", self._on_resize)
+
+    def pack(self, **kwargs):
+        self.widget.pack(**kwargs)
+
+    def _project(self, lons, lats):
+        lat0, lon0 = self._origin
+        k = math.pi / 180.0 * EARTH_RADIUS_M
+        x = (np.asarray(lons, dtype=float) - lon0) * (k * math.cos(math.radians(lat0)))
+        y = (np.asarray(lats, dtype=float) - lat0) * k
+        return x, y
+
+    def _size(self):
+        return max(self.widget.winfo_width(), 2), max(self.widget.winfo_height(), 2)
+
+    def _to_screen(self, x, y):
+        w, h = self._size()
+        x0, y0, x1, y1 = self._view
+        scale = min(w / (x1 - x0), h / (y1 - y0))
+        cx, cy = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+        return w / 2.0 + (x - cx) * scale, h / 2.0 - (y - cy) * scale, scale
+
+    def _rescale(self, x, y):
+        x0, x1 = float(x.min()), float(x.max())
+        y0, y1 = float(y.min()), float(y.max())
+        dx = max(x1 - x0, self.MIN_SPAN_M) * self.MARGIN
+        dy = max(y1 - y0, self.MIN_SPAN_M) * self.MARGIN
+        self._view = (x0 - dx, y0 - dy, x1 + dx, y1 + dy)
+
+    def _contains(self, x, y):
+        x0, y0, x1, y1 = self._view
+        return x0 <= x.min() and x.max() <= x1 and y0 <= y.min() and y.max() <= y1
+
+    @staticmethod
+    def _nice_step(span):
+        raw = span / 6.0
+        exp = 10 ** math.floor(math.log10(raw))
+        for m in (1, 2, 5, 10):
+            if m * exp >= raw:
+                return m * exp
+        return 10 * exp
+
+    def _draw_frame(self):
+        """Siatka i podziałka – tylko po zmianie skali lub rozmiaru okna."""
+        c = self.widget
+        w, h = self._size()
+        _, _, scale = self._to_screen(0.0, 0.0)
+        x0, y0, x1, y1 = self._view
+        cx, cy = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+        half_w, half_h = w / 2.0 / scale, h / 2.0 / scale
+        step = self._nice_step(max(2 * half_w, 2 * half_h))
+
+        items = iter(self._grid_items)
+        for gx in np.arange(math.ceil((cx - half_w) / step) * step, cx + half_w, step):
+            item = next(items, None)
+            if item is None:
+                break
+            sx, _, _ = self._to_screen(float(gx), 0.0)
+            c.coords(item, sx, 0, sx, h)
+            c.itemconfigure(item, state="normal")
+        for gy in np.arange(math.ceil((cy - half_h) / step) * step, cy + half_h, step):
+            item = next(items, None)
+            if item is None:
+                break
+            _, sy, _ = self._to_screen(0.0, float(gy))
+            c.coords(item, 0, sy, w, sy)
+            c.itemconfigure(item, state="normal")
+        for item in items:
+            c.itemconfigure(item, state="hidden")
+
+        bar = step * scale
+        c.coords(self._scale_item, 10, h - 10, 10 + bar, h - 10)
+        c.coords(self._scale_text, 10, h - 14)
+        label = f"{step / 1000:g} km" if step >= 1000 else f"{step:g} m"
+        c.itemconfigure(self._scale_text, text=label, state="normal")
+        c.itemconfigure(self._scale_item, state="normal")
+
+    def _draw_track(self):
+        sx, sy, _ = self._to_screen(self._x, self._y)
+        flat = np.empty(2 * max(len(sx), 2))
+        if len(sx) == 1:
+            sx, sy = np.repeat(sx, 2), np.repeat(sy, 2)
+        flat[0::2] = sx
+        flat[1::2] = sy
+        c = self.widget
+        c.coords(self._track_item, *flat.tolist())
+        px, py = float(sx[-1]), float(sy[-1])
+        c.coords(self._pos_item, px - 4, py - 4, px + 4, py + 4)
+        c.itemconfigure(self._track_item, state="normal")
+        c.itemconfigure(self._pos_item, state="normal")
+
+    def _on_resize(self, event):
+        if self._view is not None:
+            self._draw_frame()
+            self._draw_track()
+
+    def set_track(self, lons, lats):
+        """Ustawia ślad (sekwencje długości geograficznej i szerokości)."""
+        if len(lons) == 0:
+            return
+        if self._origin is None:
+            self._origin = (float(lats[0]), float(lons[0]))
+        self._x, self._y = self._project(lons, lats)
+
+        if self._view is None or not self._contains(self._x, self._y):
+            self._rescale(self._x, self._y)
+            self._draw_frame()
+        self._draw_track()
+
+
+def create_map_view(kind, master):
+    """Renderer mapy: "canvas" (tk.Canvas) albo "matplotlib"."""
+    if kind == "canvas":
+        return CanvasMapView(master)
+    if kind == "matplotlib":
+        return MatplotlibMapView(master)
+    raise ValueError(f"Unknown map renderer: {kind}")
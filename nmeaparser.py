@@ -0,0 +1,153 @@
+# nmeaparser.py
+"""
+Szybki, jednoprzebiegowy parser zdań NMEA 0183 (GGA, RMC, VTG).
+
+Zastępuje pynmea2 na ścieżce odczytu GPS: sprawdza sumę kontrolną i wyciąga
+tylko potrzebne pola, zwracając zwarte rekordy (NamedTuple). Prefiks nadawcy
+(GP, GN, GL, GA, BD, ...) jest dowolny. Czas UTC jest podawany jako sekundy
+doby (``utc_seconds``); ``utc_time`` zamienia go na ``datetime.time``.
+"""
+import datetime
+from functools import reduce
+from operator import xor
+from typing import NamedTuple, Optional
+
+_UTC = datetime.timezone.utc
+_KINDS = (b"GGA", b"RMC", b"VTG")
+
+
+class GgaFix(NamedTuple):
+    talker: str
+    utc_seconds: Optional[float]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    gps_qual: int
+    num_sats: Optional[int]
+    horizontal_dil: Optional[float]
+    altitude: Optional[float]
+
+
+class RmcFix(NamedTuple):
+    talker: str
+    utc_seconds: Optional[float]
+    status: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    speed_knots: Optional[float]
+    course: Optional[float]
+    datestamp: Optional[datetime.date]
+
+
+class VtgFix(NamedTuple):
+    talker: str
+    course_true: Optional[float]
+    speed_knots: Optional[float]
+    speed_kmh: Optional[float]
+
+
+def checksum_ok(line: bytes) -> bool:
+    """True, jeśli zdanie nie ma sumy kontrolnej albo suma się zgadza."""
+    star = line.rfind(b"*")
+    if star < 0:
+        return True
+    try:
+        expected = int(line[star + 1:star + 3], 16)
+    except ValueError:
+        return False
+    return reduce(xor, line[1:star], 0) == expected
+
+
+def _float(field: bytes):
+    return float(field) if field else None
+
+
+def _int(field: bytes):
+    return int(field) if field else None
+
+
+def _time(field: bytes):
+    if len(field) < 6:
+        return None
+    hhmmss = float(field)
+    hh, rest = divmod(hhmmss, 10000.0)
+    mm, ss = divmod(rest, 100.0)
+    return hh * 3600.0 + mm * 60.0 + ss
+
+
+def utc_time(seconds: Optional[float]) -> Optional[datetime.time]:
+    """Sekundy doby UTC -> datetime.time (jak ``timestamp`` w pynmea2)."""
+    if seconds is None:
+        return None
+    whole = int(seconds)
+    micro = int(round((seconds - whole) * 1e6))
+    if micro >= 1_000_000:
+        whole, micro = whole + 1, micro - 1_000_000
+    hh, rem = divmod(whole, 3600)
+    mm, ss = divmod(rem, 60)
+    return datetime.time(hh % 24, mm, ss, micro, tzinfo=_UTC)
+
+
+def _date(field: bytes):
+    if len(field) != 6:
+        return None
+    return datetime.date(2000 + int(field[4:6]), int(field[2:4]), int(field[0:2]))
+
+
+def _coord(value: bytes, hemisphere: bytes):
+    if not value:
+        return None
+    deg, minutes = divmod(float(value), 100.0)
+    deg += minutes / 60.0
+    return -deg if hemisphere in (b"S", b"W") else deg
+
+
+def parse(line):
+    """Parsuje jedno zdanie NMEA. Zwraca GgaFix/RmcFix/VtgFix albo None.
+
+    None oznacza: inny typ zdania, zła suma kontrolna albo uszkodzone pola.
+    Przyjmuje ``bytes``, ``bytearray``, ``memoryview`` lub ``str``; widok
+    jest kopiowany dopiero dla zdania obsługiwanego typu.
+    """
+    if isinstance(line, str):
+        line = line.encode("ascii", errors="replace")
+    if len(line) >= 7 and line[0] == 0x24 and bytes(line[3:6]) not in _KINDS:
+        return None  # GSV, GSA, ... – bez kopiowania całego zdania
+    line = bytes(line).strip()
+    if len(line) < 7 or line[0] != 0x24:  # '$'
+        return None
+
+    kind = line[3:6]
+    if kind not in _KINDS:
+        return None
+    if not checksum_ok(line):
+        return None
+
+    star = line.rfind(b"*")
+    fields = (line[1:star] if star >= 0 else line[1:]).split(b",")
+    talker = line[1:3].decode("ascii", errors="replace")
+    try:
+        if kind == b"GGA":
+            return GgaFix(
+                talker,
+                _time(fields[1]),
+                _coord(fields[2], fields[3]),
+                _coord(fields[4], fields[5]),
+                int(fields[6]) if fields[6] else 0,
+                _int(fields[7]),
+                _float(fields[8]),
+                _float(fields[9]),
+            )
+        if kind == b"RMC":
+            return RmcFix(
+                talker,
+                _time(fields[1]),
+                fields[2].decode("ascii"),
+                _coord(fields[3], fields[4]),
+                _coord(fields[5], fields[6]),
+                _float(fields[7]),
+                _float(fields[8]),
+                _date(fields[9]),
+            )
+        return VtgFix(talker, _float(fields[1]), _float(fields[5]), _float(fields[7]))
+    except (IndexError, ValueError):
+        return None
@@ -0,0 +1,70 @@
+# nmeastream.py
+"""
+Odczyt strumienia NMEA z portu szeregowego porcjami zamiast readline().
+
+ChunkedSentenceReader czyta naraz tyle bajtów, ile zgłasza ``in_waiting``,
+do jednego, wielokrotnie używanego bufora ``bytearray``. Kompletne zdania są
+zwracane jako ``memoryview`` (bez kopiowania), niepełna końcówka czeka na
+kolejny odczyt. Każda porcja dostaje jeden znacznik czasu, a czas przyjścia
+poszczególnych zdań jest interpolowany na podstawie prędkości transmisji.
+"""
+import time
+
+
+class ChunkedSentenceReader:
+    def __init__(self, ser, baud_rate, capacity=64 * 1024, bits_per_byte=10):
+        self._ser = ser
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        # 8N1: bit startu + 8 bitów danych + bit stopu
+        self.byte_time_ns = bits_per_byte * 1_000_000_000 // baud_rate
+        self.dropped_bytes = 0
+
+    def read_sentences(self):
+        """Czyta jedną porcję i zwraca listę (zdanie, monotonic_ns, wall_ns).
+
+        Zdania są widokami na wewnętrzny bufor bez końcowego ``\\r\\n`` – są
+        ważne tylko do następnego wywołania. Gdy nic nie przyszło, metoda
+        blokuje się najwyżej na czas ``timeout`` portu i zwraca pustą listę.
+        """
+        buf, view = self._buf, self._view
+        # Niepełna końcówka z poprzedniej porcji na początek bufora
+        # (przypisanie bez zmiany rozmiaru; poprzednie widoki tracą ważność)
+        tail = self._end - self._start
+        if self._start and tail:
+            buf[0:tail] = buf[self._start:self._end]
+        self._start, self._end = 0, tail
+
+        free = len(buf) - self._end
+        if free == 0:
+            # Bufor pełny bez znaku końca linii – śmieci na łączu, odrzucamy
+            self.dropped_bytes += self._end
+            self._end = 0
+            free = len(buf)
+
+        wanted = min(max(self._ser.in_waiting, 1), free)
+        n = self._ser.readinto(view[self._end:self._end + wanted])
+        mono_ns = time.monotonic_ns()
+        wall_ns = time.time_ns()
+        if not n:
+            return []
+        end = self._end + n
+
+        sentences = []
+        start = 0
+        nl = buf.find(b"\n", self._end, end)
+        while nl >= 0:
+            stop = nl
+            if stop > start and buf[stop - 1] == 0x0D:  # '\r'
+                stop -= 1
+            if stop > start:
+                # Ostatni bajt zdania przyszedł (end - nl) bajtów przed końcem porcji
+                lag_ns = (end - 1 - nl) * self.byte_time_ns
+                sentences.append((view[start:stop], mono_ns - lag_ns, wall_ns - lag_ns))
+            start = nl + 1
+            nl = buf.find(b"\n", start, end)
+
+        self._start, self._end = start, end
+        return sentences
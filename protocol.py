@@ -0,0 +1,339 @@
+# protocol.py
+"""
+Przebieg eksperymentu jako tabela przejść.
+
+Każdy przycisk panelu to "slot" z bieżącym krokiem. Wiersz tabeli opisuje,
+co się dzieje po naciśnięciu slotu w danym kroku: kody wysyłane do DSI,
+nowe kroki slotów, sloty pokazywane / ukrywane oraz efekty (tekst
+instrukcji, timer...). Tabela jest kompilowana raz, przy imporcie, do
+słownika ``(slot, krok) -> Transition``.
+
+ProtocolMachine rozstrzyga wejście jednym odczytem ze słownika i nie czyta
+stanu widżetów – przyciski TaskButton są tylko widokiem stanu maszyny
+(etykieta, widoczność, kolor).
+
+Każde przejście odkłada na stos cofania zwartą deltę: poprzednie wartości
+tylko tych pól, które się zmieniły. Error zdejmuje deltę ze stosu (do
+``UNDO_DEPTH`` poziomów) i przywraca te pola; delta dotyczy tylko stanu
+przycisków, nie kodów. Wysyłane kody są jak w dawnym error_action: ERROR,
+a po nim ostatni kod wysłany przed Error (CURRENT), np. po Command – ERROR,
+COMMAND, po Correct – ERROR i stan wysłany po CORRECT.
+"""
+from collections import deque
+from typing import NamedTuple
+
+from taskstate import TaskStateEnum as S
+
+# Kody symboliczne, rozwiązywane w chwili przejścia
+CURRENT = "current"  # ostatnio wysłany kod
+RESUME = "resume"    # kod sprzed Water / Pause / Alpha / Talk
+
+# Efekty obsługiwane przez samą maszynę; pozostałe wykonuje widok
+SELECT_ENTRY = "select_entry"
+SHOW_ENTRY = "show_entry"
+SHOW_RIGHT_AFTER_FIRST_RUN = "show_right_after_first_run"
+
+
+class Slot(NamedTuple):
+    name: str
+    key: str
+    row: int
+    column: int
+    first_step: str
+    visible: bool = True
+
+
+class Transition(NamedTuple):
+    codes: tuple = ()
+    steps: tuple = ()        # ((slot, krok), ...)
+    show: tuple = ()
+    hide: tuple = ()
+    effects: tuple = ()
+    save_resume: frozenset = None  # zapamiętaj bieżący kod, jeśli nie należy do zbioru
+    spacing_s: float = 0.01
+    undo: bool = False
+
+
+class UndoDelta(NamedTuple):
+    steps: dict    # slot -> poprzedni krok
+    visible: dict  # slot -> poprzednia widoczność
+    attrs: dict    # atrybut maszyny -> poprzednia wartość
+
+
+class Outcome(NamedTuple):
+    transition: Transition
+    codes: tuple
+    dirty: frozenset  # sloty do przerysowania
+
+
+SLOTS = (
+    Slot("start_left_button", "s", 1, 0, "command"),
+    Slot("direct_button", "d", 2, 0, "direct", visible=False),
+    Slot("parallel_button", "f", 3, 0, "parallel", visible=False),
+    Slot("teardrop_button", "q", 4, 0, "teardrop", visible=False),
+    Slot("start_engine_button", "a", 5, 0, "start_engine"),
+    Slot("start_right_button", "w", 1, 1, "start1", visible=False),
+    Slot("water_button", "e", 1, 2, "water"),
+    Slot("pause_button", "r", 2, 2, "pause"),
+    Slot("alpha_button", "z", 3, 2, "alpha"),
+    Slot("check_triggers_button", "x", 4, 2, "check"),
+    Slot("talk_button", "c", 5, 2, "talk"),
+    Slot("error_button", "v", 6, 2, "error"),
+)
+
+ENTRY_SLOTS = ("direct_button", "parallel_button", "teardrop_button")
+
+# (slot, krok) -> (etykieta bez skrótu, kolor tła albo None)
+STEPS = {
+    ("start_engine_button", "start_engine"): ("Start Engine", None),
+    ("start_engine_button", "taxiing"): ("Taxxing", None),
+    ("start_engine_button", "take_off"): ("Take off", None),
+    ("start_engine_button", "climbing"): ("Climbing", None),
+    ("start_engine_button", "descending"): ("Descending", None),
+    ("start_engine_button", "landing"): ("Landing", None),
+    ("start_engine_button", "taxiing_in"): ("TAXIING", None),
+    ("start_engine_button", "experiment_end"): ("ExperimentEnd", None),
+    ("start_left_button", "command"): ("Command", None),
+    ("start_left_button", "reply"): ("Reply", None),
+    ("start_left_button", "correct"): ("Correct", None),
+    ("start_left_button", "parameters"): ("Parameters", None),
+    ("start_left_button", "holding_start"): ("HoldingStart", None),
+    ("start_right_button", "start1"): ("Start1", None),
+    ("start_right_button", "end1"): ("End1", None),
+    ("start_right_button", "start2"): ("Start2", None),
+    ("start_right_button", "end2"): ("End2", None),
+    ("start_right_button", "start3"): ("Start3", None),
+    ("start_right_button", "end3"): ("End3", None),
+    ("start_right_button", "start4"): ("Start4", "red"),
+    ("start_right_button", "end4"): ("End4", None),
+    ("water_button", "water"): ("Water", None),
+    ("water_button", "active"): ("Water InProgress", None),
+    ("pause_button", "pause"): ("Pause", None),
+    ("pause_button", "active"): ("Pause InProgress", None),
+    ("alpha_button", "alpha"): ("Alpha", None),
+    ("alpha_button", "active"): ("Alpha InProgress", None),
+    ("talk_button", "talk"): ("Talk", None),
+    ("talk_button", "active"): ("Talk InProgress", None),
+    ("check_triggers_button", "check"): ("CheckTriggers", None),
+    ("error_button", "error"): ("Error", None),
+}
+for _entry, _name in zip(ENTRY_SLOTS, ("Direct", "Parallel", "Teardrop")):
+    STEPS[(_entry, _name.lower())] = (_name, None)
+    for _step, _label in (("turn1_start", "Turn1Start"), ("turn1_end", "Turn1End"),
+                          ("turn2_start", "Turn2Start"), ("turn2_end", "Turn2End")):
+        STEPS[(_entry, _step)] = (_label, None)
+
+STEPS_FIRST = {slot.name: slot.first_step for slot in SLOTS}
+_BREAK_STATES = frozenset({S.WATER.value, S.PAUSE.value, S.TALKING.value, S.ALPHA.value})
+
+
+def _entry_rows(slot, first_step, turn_codes):
+    rows = [(slot, first_step, Transition(steps=((slot, "turn1_start"),), effects=(SELECT_ENTRY,)))]
+    chain = ("turn1_start", "turn1_end", "turn2_start", "turn2_end")
+    for step, next_step, code in zip(chain, chain[1:], turn_codes):
+        rows.append((slot, step, Transition(codes=(code,), steps=((slot, next_step),))))
+    rows.append((slot, "turn2_end", Transition(
+        codes=(turn_codes[-1],), steps=((slot, first_step),), hide=(slot,), show=("start_left_button",))))
+    return rows
+
+
+def _break_rows(slot, code, exclude=_BREAK_STATES):
+    """Water / Pause / Alpha / Talk: wejście zapamiętuje stan, wyjście go przywraca."""
+    first = STEPS_FIRST[slot]
+    return [
+        (slot, first, Transition(codes=(code,), steps=((slot, "active"),), save_resume=exclude)),
+        (slot, "active", Transition(codes=(RESUME,), steps=((slot, first),))),
+    ]
+
+
+# (slot, krok, przejście)
+TRANSITIONS = [
+    # --- Start silnika ... koniec eksperymentu ---
+    ("start_engine_button", "start_engine", Transition(codes=(S.START_ENGINE,), steps=(("start_engine_button", "taxiing"),))),
+    ("start_engine_button", "taxiing", Transition(codes=(S.TAXIING,), steps=(("start_engine_button", "take_off"),))),
+    ("start_engine_button", "take_off", Transition(codes=(S.TAKE_OFF,), steps=(("start_engine_button", "climbing"),))),
+    ("start_engine_button", "climbing", Transition(codes=(S.CLIMBING,), steps=(("start_engine_button", "descending"),))),
+    ("start_engine_button", "descending", Transition(codes=(S.DESCENDING,), steps=(("start_engine_button", "landing"),))),
+    ("start_engine_button", "landing", Transition(codes=(S.LANDING,), steps=(("start_engine_button", "taxiing_in"),))),
+    ("start_engine_button", "taxiing_in", Transition(steps=(("start_engine_button", "experiment_end"),))),
+    ("start_engine_button", "experiment_end", Transition(hide=("start_engine_button",))),
+
+    # --- Command / Reply / Correct / Parameters / HoldingStart ---
+    ("start_left_button", "command", Transition(
+        codes=(S.COMMAND,), steps=(("start_left_button", "reply"),),
+        effects=("generate_text", SHOW_RIGHT_AFTER_FIRST_RUN))),
+    ("start_left_button", "reply", Transition(codes=(S.REPLY,), steps=(("start_left_button", "correct"),))),
+    ("start_left_button", "correct", Transition(
+        codes=(S.CORRECT, CURRENT), steps=(("start_left_button", "parameters"),), effects=("clear_text",))),
+    ("start_left_button", "parameters", Transition(
+        codes=(S.PARAMETERS, CURRENT),
+        steps=(("start_left_button", "holding_start"), ("parallel_button", "parallel"), ("teardrop_button", "teardrop")),
+        hide=("start_left_button",), show=ENTRY_SLOTS)),
+    ("start_left_button", "holding_start", Transition(
+        codes=(S.HOLDING_START,), steps=(("start_left_button", "command"), ("start_right_button", "end1")),
+        show=("start_right_button",), hide=("start_left_button",), effects=("reset_timer",))),
+
+    # --- Wloty: Direct / Parallel / Teardrop ---
+    *_entry_rows("direct_button", "direct", (
+        S.ENTRY_DIRECT_TURN1_START, S.ENTRY_DIRECT_TURN1_END,
+        S.ENTRY_DIRECT_TURN2_START, S.ENTRY_DIRECT_TURN2_END)),
+    *_entry_rows("parallel_button", "parallel", (
+        S.ENTRY_PARALLEL_TURN1_START, S.ENTRY_PARALLEL_TURN1_END,
+        S.ENTRY_PARALLEL_TURN2_START, S.ENTRY_PARALLEL_TURN2_END)),
+    *_entry_rows("teardrop_button", "teardrop", (
+        S.ENTRY_TEARDROP_TURN1_START, S.ENTRY_TEARDROP_TURN1_END,
+        S.ENTRY_TEARDROP_TURN2_START, S.ENTRY_TEARDROP_TURN2_END)),
+
+    # --- Start / End 1–4 ---
+    ("start_right_button", "start1", Transition(codes=(S.START_RIGHT,), steps=(("start_right_button", "end1"),), effects=("reset_timer",))),
+    ("start_right_button", "end1", Transition(codes=(S.END1,), steps=(("start_right_button", "start2"),), effects=("reset_timer",))),
+    ("start_right_button", "start2", Transition(codes=(S.START2,), steps=(("start_right_button", "end2"),), effects=("reset_timer",))),
+    ("start_right_button", "end2", Transition(codes=(S.END2,), steps=(("start_right_button", "start3"),), effects=("reset_timer",))),
+    ("start_right_button", "start3", Transition(codes=(S.START3,), steps=(("start_right_button", "end3"),), effects=("reset_timer",))),
+    ("start_right_button", "end3", Transition(
+        codes=(S.END3,), steps=(("start_right_button", "start4"),),
+        show=("start_left_button",), hide=("start_right_button",), effects=("reset_timer",))),
+    ("start_right_button", "start4", Transition(codes=(S.START4,), steps=(("start_right_button", "end4"),), effects=("reset_timer",))),
+    ("start_right_button", "end4", Transition(
+        codes=(S.END4,), steps=(("start_right_button", "start1"),),
+        hide=("start_right_button",), effects=(SHOW_ENTRY, "reset_timer"))),
+
+    # --- Water / Pause / Alpha / Talk ---
+    # Water nie pomija TALKING przy zapamiętywaniu stanu (jak dotychczas)
+    *_break_rows("water_button", S.WATER, _BREAK_STATES - {S.TALKING.value}),
+    *_break_rows("pause_button", S.PAUSE),
+    *_break_rows("alpha_button", S.ALPHA),
+    *_break_rows("talk_button", S.TALKING),
+
+    # --- CheckTriggers / Error ---
+    ("check_triggers_button", "check", Transition(hide=("check_triggers_button",), effects=("check_triggers",))),
+    ("error_button", "error", Transition(codes=(S.ERROR, CURRENT), spacing_s=0.0, undo=True)),
+]
+
+
+def compile_table(rows, slots=SLOTS, steps=STEPS):
+    """Słownik ``(slot, krok) -> Transition`` z kodami jako int; sprawdza spójność tabeli."""
+    names = {slot.name for slot in slots}
+    table = {}
+    for slot, step, transition in rows:
+        key = (slot, step)
+        if key in table:
+            raise ValueError(f"Duplicate transition for {key}")
+        if key not in steps:
+            raise ValueError(f"No label for step {key}")
+        for target in transition.steps:
+            if target not in steps:
+                raise ValueError(f"{key}: unknown target step {target}")
+        for name in (*transition.show, *transition.hide):
+            if name not in names:
+                raise ValueError(f"{key}: unknown slot {name}")
+        codes = tuple(c if c in (CURRENT, RESUME) else S(c).value for c in transition.codes)
+        table[key] = transition._replace(codes=codes)
+    for key in steps:
+        if key not in table:
+            raise ValueError(f"Step {key} has no transition")
+    return table
+
+
+TABLE = compile_table(TRANSITIONS)
+KEYS = {slot.key: slot.name for slot in SLOTS}
+LABELS = {key: f"{text} ({slot.key})"
+          for slot in SLOTS for key, (text, _bg) in STEPS.items() if key[0] == slot.name}
+COLORS = {key: bg for key, (_text, bg) in STEPS.items()}
+
+
+class ProtocolMachine:
+    """Stan przycisków eksperymentu i przejścia według TABLE.
+
+    ``current_code()`` zwraca ostatnio wysłany kod (dla CURRENT i zapamiętania
+    stanu przed przerwą). Maszyna tylko wylicza kody – wysyła je wywołujący.
+    """
+
+    UNDO_DEPTH = 32
+
+    def __init__(self, current_code, table=TABLE):
+        self._current_code = current_code
+        self._table = table
+        self.steps = {slot.name: slot.first_step for slot in SLOTS}
+        self.visible = {slot.name for slot in SLOTS if slot.visible}
+        self.is_first_run = True
+        self.holding_type = None
+        self.resume_code = S.INIT_VALUE.value
+        self.undo_stack = deque(maxlen=self.UNDO_DEPTH)
+
+    def label(self, slot):
+        return LABELS[(slot, self.steps[slot])]
+
+    def color(self, slot):
+        return COLORS[(slot, self.steps[slot])]
+
+    def set_visible(self, slot, visible=True):
+        (self.visible.add if visible else self.visible.discard)(slot)
+
+    # --- zmiany stanu zapisywane w delcie ---
+    def _set_step(self, delta, slot, step):
+        delta.steps.setdefault(slot, self.steps[slot])
+        self.steps[slot] = step
+
+    def _show(self, delta, slot, visible=True):
+        delta.visible.setdefault(slot, slot in self.visible)
+        self.set_visible(slot, visible)
+
+    def _set_attr(self, delta, name, value):
+        delta.attrs.setdefault(name, getattr(self, name))
+        setattr(self, name, value)
+
+    def _changed_slots(self, delta):
+        changed = {slot for slot, step in delta.steps.items() if self.steps[slot] != step}
+        changed.update(slot for slot, visible in delta.visible.items() if (slot in self.visible) != visible)
+        return frozenset(changed)
+
+    def undo(self):
+        """Cofa ostatnią akcję; zmienione sloty albo None, gdy stos jest pusty."""
+        if not self.undo_stack:
+            return None
+        delta = self.undo_stack.pop()
+        changed = self._changed_slots(delta)
+        self.steps.update(delta.steps)
+        for slot, visible in delta.visible.items():
+            self.set_visible(slot, visible)
+        for name, value in delta.attrs.items():
+            setattr(self, name, value)
+        return changed
+
+    def fire(self, slot):
+        """Przejście dla naciśniętego slotu; None, gdy slot jest ukryty."""
+        if slot not in self.visible:
+            return None
+        t = self._table[(slot, self.steps[slot])]
+        current = self._current_code()
+
+        codes = tuple(current if c == CURRENT else self.resume_code if c == RESUME else c for c in t.codes)
+        if t.undo:
+            return Outcome(t, codes, self.undo() or frozenset())
+
+        delta = UndoDelta({}, {}, {})
+        if t.save_resume is not None and current not in t.save_resume:
+            self._set_attr(delta, "resume_code", current)
+
+        for name, step in t.steps:
+            self._set_step(delta, name, step)
+        for name in t.hide:
+            self._show(delta, name, False)
+        for name in t.show:
+            self._show(delta, name)
+
+        if SELECT_ENTRY in t.effects:
+            for name in ENTRY_SLOTS:
+                self._show(delta, name, False)
+            self._set_attr(delta, "holding_type", slot)
+            if self.is_first_run or "start_right_button" not in self.visible:
+                self._show(delta, slot)
+            self._set_attr(delta, "is_first_run", False)
+        if SHOW_ENTRY in t.effects and self.holding_type:
+            self._show(delta, self.holding_type)
+        if SHOW_RIGHT_AFTER_FIRST_RUN in t.effects and not self.is_first_run:
+            self._show(delta, "start_right_button")
+
+        self.undo_stack.append(delta)
+        return Outcome(t, codes, self._changed_slots(delta))
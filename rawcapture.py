@@ -0,0 +1,238 @@
+# rawcapture.py
+"""
+Zapis surowego strumienia NMEA (GNSS_All_Log) w zwartych, rotowanych segmentach.
+
+Format "framed": każdy segment ``<base>_NNNN.nmea.zst`` albo ``.nmea.gz``
+zaczyna się nagłówkiem ``MAGIC``, po którym następują ramki::
+
+    <q monotonic_ns> <q wall_ns> <H długość> <bajty zdania>
+
+``compression=None`` (domyślnie) wybiera zstd, jeśli da się zaimportować
+``zstandard``, a w przeciwnym razie gzip; "gzip" / "zstd" wymuszają format.
+
+Nowy segment zaczyna się co ``rotate_s`` sekund, a dane są zrzucane na dysk
+co ``flush_ms`` milisekund zamiast po każdej linii. Termin flushu jest
+sprawdzany przy zapisie ramki oraz w ``flush_due()``, które pętla odczytu
+wywołuje po każdym odczycie portu – także pustym, więc gdy odbiornik milknie,
+bufor trafia na dysk najpóźniej po ``flush_ms`` + timeout odczytu.
+
+Format "text" to dotychczasowy ``<base>.txt`` z liniami
+``RRRR-MM-DD GG:MM:SS.mmm: $GPGGA,...`` – także z ograniczonym flushowaniem.
+
+Odczyt: ``iter_records`` zwraca krotki (monotonic_ns, wall_ns, bajty),
+``iter_lines`` – linie w formacie tekstowym dla istniejących narzędzi::
+
+    python rawcapture.py GNSS_All_Log20250101_120000 > GNSS_All_Log.txt
+"""
+import glob
+import gzip
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # opcjonalna zależność
+    zstandard = None
+
+MAGIC = b"EEGRAW1\n"
+_FRAME = struct.Struct("<qqH")
+_EXTENSIONS = {"gzip": ".nmea.gz", "zstd": ".nmea.zst"}
+
+
+def default_compression():
+    """"zstd", gdy zainstalowano ``zstandard``, inaczej "gzip"."""
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def format_wall_time(wall_ns):
+    return datetime.fromtimestamp(wall_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+class RawCaptureWriter:
+    """Zapis ramek (monotonic_ns, wall_ns, bajty) do rotowanych segmentów."""
+
+    def __init__(self, base_path, rotate_s=1800, flush_ms=1000, compression=None):
+        if compression is None:
+            compression = default_compression()
+        if compression not in _EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("compression='zstd' requires the 'zstandard' package")
+        self.base_path = base_path
+        self.compression = compression
+        self.rotate_ns = int(rotate_s * 1e9)
+        self.flush_ns = int(flush_ms * 1e6)
+        self.segment_paths = []
+        # Po restarcie odczytu numeracja segmentów jest kontynuowana
+        self._next_segment = len(segment_paths(base_path))
+        self._pending = bytearray()
+        self._raw_file = None
+        self._stream = None
+        self._segment_start_ns = None
+        self._last_flush_ns = time.monotonic_ns()
+
+    def _open_segment(self, mono_ns):
+        self._close_segment()
+        path = f"{self.base_path}_{self._next_segment:04d}{_EXTENSIONS[self.compression]}"
+        self._next_segment += 1
+        if self.compression == "gzip":
+            self._stream = gzip.open(path, "wb", compresslevel=5)
+        else:
+            self._raw_file = open(path, "wb")
+            self._stream = zstandard.ZstdCompressor(level=3).stream_writer(self._raw_file)
+        self._stream.write(MAGIC)
+        self.segment_paths.append(path)
+        self._segment_start_ns = mono_ns
+
+    def _close_segment(self):
+        if self._stream is None:
+            return
+        self._write_pending()
+        self._stream.close()
+        if self._raw_file is not None:
+            self._raw_file.close()
+        self._stream = self._raw_file = None
+
+    def _write_pending(self):
+        if self._pending:
+            self._stream.write(self._pending)
+            self._pending.clear()
+
+    def write(self, mono_ns, wall_ns, data):
+        if self._stream is None or mono_ns - self._segment_start_ns >= self.rotate_ns:
+            self._open_segment(mono_ns)
+        self._pending += _FRAME.pack(mono_ns, wall_ns, len(data))
+        self._pending += data
+        if mono_ns - self._last_flush_ns >= self.flush_ns:
+            self.flush()
+
+    def flush_due(self):
+        """Flush, jeśli od poprzedniego minęło ``flush_ms`` (wywoływane także bez nowych danych)."""
+        if self._pending and time.monotonic_ns() - self._last_flush_ns >= self.flush_ns:
+            self.flush()
+
+    def flush(self):
+        if self._stream is None:
+            return
+        self._write_pending()
+        self._stream.flush()
+        self._last_flush_ns = time.monotonic_ns()
+
+    def close(self):
+        self._close_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TextCaptureWriter:
+    """Dotychczasowy format tekstowy GNSS_All_Log*.txt z ograniczonym flushowaniem."""
+
+    def __init__(self, base_path, flush_ms=1000):
+        self.path = base_path + ".txt"
+        self.flush_ns = int(flush_ms * 1e6)
+        self._file = open(self.path, "a")
+        self._dirty = False
+        self._last_flush_ns = time.monotonic_ns()
+
+    def write(self, mono_ns, wall_ns, data):
+        self._file.write(f"{format_wall_time(wall_ns)}: {str(data, 'ascii', 'replace')}\n")  # także memoryview
+        self._dirty = True
+        if mono_ns - self._last_flush_ns >= self.flush_ns:
+            self.flush()
+
+    def flush_due(self):
+        if self._dirty and time.monotonic_ns() - self._last_flush_ns >= self.flush_ns:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        self._dirty = False
+        self._last_flush_ns = time.monotonic_ns()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_raw_capture(base_path, fmt="framed", rotate_s=1800, flush_ms=1000, compression=None):
+    """Writer surowego logu GNSS: ``fmt`` = "framed" albo "text"."""
+    if fmt == "text":
+        return TextCaptureWriter(base_path, flush_ms=flush_ms)
+    return RawCaptureWriter(base_path, rotate_s=rotate_s, flush_ms=flush_ms, compression=compression)
+
+
+def segment_paths(base_or_paths):
+    """Lista segmentów: ścieżki podane wprost albo wszystkie ``<base>_NNNN.*``."""
+    if isinstance(base_or_paths, (list, tuple)):
+        return list(base_or_paths)
+    if os.path.isfile(base_or_paths):
+        return [base_or_paths]
+    return sorted(glob.glob(glob.escape(base_or_paths) + "_[0-9][0-9][0-9][0-9].nmea.*"))
+
+
+def _open_segment_for_read(path):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path} requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return gzip.open(path, "rb")
+
+
+def _read_exact(stream, n):
+    data = stream.read(n)
+    while data and len(data) < n:
+        more = stream.read(n - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def iter_records(base_or_paths):
+    """Iteruje (monotonic_ns, wall_ns, bajty) po wszystkich segmentach.
+
+    Urwany ostatni segment (np. po awarii zasilania) jest czytany do ostatniej
+    pełnej ramki.
+    """
+    for path in segment_paths(base_or_paths):
+        with _open_segment_for_read(path) as stream:
+            try:
+                if _read_exact(stream, len(MAGIC)) != MAGIC:
+                    raise ValueError(f"{path}: not a raw NMEA capture segment")
+                while True:
+                    header = _read_exact(stream, _FRAME.size)
+                    if len(header) < _FRAME.size:
+                        break
+                    mono_ns, wall_ns, length = _FRAME.unpack(header)
+                    data = _read_exact(stream, length)
+                    if len(data) < length:
+                        break
+                    yield mono_ns, wall_ns, data
+            except EOFError:
+                continue
+
+
+def iter_lines(base_or_paths):
+    """Linie w formacie GNSS_All_Log*.txt: ``RRRR-MM-DD GG:MM:SS.mmm: $...``."""
+    for _mono_ns, wall_ns, data in iter_records(base_or_paths):
+        yield f"{format_wall_time(wall_ns)}: {data.decode('ascii', errors='replace')}"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python rawcapture.py BASE_PATH | SEGMENT...")
+    source = sys.argv[1] if len(sys.argv) == 2 else sys.argv[1:]
+    for line in iter_lines(source):
+        print(line)
@@ -0,0 +1,412 @@
+# replay.py
+"""
+Odtwarzanie nagranych sesji bez sprzętu.
+
+NMEA: ReplaySerial udaje port szeregowy (``in_waiting``, ``readinto``,
+``read``, ``timeout``) i oddaje nagrane zdania w tempie nagrania
+podzielonym przez ``speed`` (1.0 = czas rzeczywisty, 10.0 = 10x, None/0 =
+najszybciej). Wchodzi w miejsce ``serial.Serial`` w gnssreader.run_acquisition
+(``GnssConfig.replay_file``), więc dane przechodzą przez tę samą ścieżkę:
+ChunkedSentenceReader, parser, surowy log, CSV, plik fixów, mapa.
+
+Źródła NMEA (``load_nmea``):
+    GNSS_All_Log*.txt     – linie ``RRRR-MM-DD GG:MM:SS[.f]: $GPGGA,...``,
+    GNSS_All_Log* (base)  – segmenty .nmea.gz / .nmea.zst (rawcapture.py).
+
+Akcje operatora: ActionReplayer naciska przyciski przez planistę GUI
+(scheduler.py) w tym samym tempie. Źródła (``load_actions``):
+    log_*.txt             – linie ``[ACTION] - Button clicked: <etykieta>``;
+                            slot jest szukany wśród widocznych po etykiecie,
+    Journal*.sqlite       – wiersze ``action`` (journal.py) z nazwą slotu.
+
+Oś czasu to czas ścienny nagrania (sekundy epoki Unix); ``seek(t)`` /
+``start`` przyjmuje sekundy epoki, ``"GG:MM:SS"`` (dzień nagrania) albo datę
+ISO. Stemple monotonic nadawane przy odtwarzaniu są czasem odtwarzania.
+
+NMEA i akcje odtwarzane razem muszą mieć jedną oś: ``shared_playhead`` daje
+Playhead z początkiem ``start`` albo najwcześniejszym stemplem obu nagrań.
+ReplaySerial i ActionReplayer z tym samym ``playhead`` nic nie oddają przed
+``playhead.start()``, a potem liczą pozycję od tej samej chwili – akcja
+nagrana w chwili T wykonuje się, gdy odtwarzanie NMEA dochodzi do T.
+Playhead z zegarem time.monotonic można przekazać do procesu potomnego
+(GnssConfig.replay_playhead) – po ``start()`` jest niezmienny.
+
+Bez GUI – przepustowość parsera i sesji na nagraniu:
+    python replay.py --nmea GNSS_All_Log20250101_120000.txt [--actions log_20250101_120000.txt]
+                     [--speed 0] [--start 12:30:00]
+"""
+import argparse
+import bisect
+import re
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+_NMEA_LINE = re.compile(r"^(\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:\.\d+)?):\s*(\$.*?)\s*$")
+_LOG_LINE = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(?:\.\d+)?) \[(\w+)\] - (.*?)\s*$")
+_CLICK_PREFIX = "Button clicked: "
+
+
+class ActionEvent(NamedTuple):
+    t: float
+    slot: Optional[str] = None   # nazwa slotu (dziennik)
+    label: Optional[str] = None  # etykieta przycisku (log tekstowy)
+
+
+# ----------------------------------------------------------------------
+# Wczytywanie nagrań
+# ----------------------------------------------------------------------
+def load_nmea(path):
+    """Lista (czas ścienny [s], bajty zdania) w kolejności nagrania."""
+    if path.endswith(".txt"):
+        records = []
+        t = 0.0
+        with open(path, "r", encoding="ascii", errors="replace") as f:
+            for line in f:
+                match = _NMEA_LINE.match(line)
+                if match:
+                    t = datetime.fromisoformat(match.group(1)).timestamp()
+                    records.append((t, match.group(2).encode("ascii")))
+                elif line.startswith("$"):  # linia bez stempla – czas poprzedniej
+                    records.append((t, line.strip().encode("ascii")))
+        return records
+
+    from rawcapture import iter_records
+    return [(wall_ns / 1e9, data) for _mono_ns, wall_ns, data in iter_records(path)]
+
+
+def load_actions(path):
+    """Lista ActionEvent z logu tekstowego (log_*.txt) albo dziennika (.sqlite)."""
+    if path.endswith(".sqlite"):
+        import journal
+        conn = journal.connect(path)
+        try:
+            return [ActionEvent(row["wall"], slot=row["name"]) for row in journal.events(conn, journal.ACTION)]
+        finally:
+            conn.close()
+
+    events = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = _LOG_LINE.match(line)
+            if match and match.group(2) == "ACTION" and match.group(3).startswith(_CLICK_PREFIX):
+                t = datetime.fromisoformat(match.group(1)).timestamp()
+                events.append(ActionEvent(t, label=match.group(3)[len(_CLICK_PREFIX):]))
+    return events
+
+
+def parse_time(value, reference_t=None):
+    """Sekundy epoki z liczby, daty ISO albo ``GG:MM:SS`` (dzień ``reference_t``)."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if re.fullmatch(r"\d\d:\d\d:\d\d(?:\.\d+)?", value):
+        if reference_t is None:
+            raise ValueError(f"Time of day {value!r} needs a recording to take the date from")
+        day = datetime.fromtimestamp(reference_t).date().isoformat()
+        value = f"{day} {value}"
+    return datetime.fromisoformat(value).timestamp()
+
+
+class Playhead:
+    """Pozycja w nagraniu: czas nagrania <-> zegar odtwarzania.
+
+    Do ``start()`` (albo ``seek``) stoi przed ``origin_t`` i nic nie oddaje.
+    """
+
+    def __init__(self, speed, origin_t=0.0, clock=time.monotonic):
+        self.speed = speed or None  # None / 0 = najszybciej
+        self.clock = clock
+        self.origin_t = origin_t
+        self.origin_clock = None
+
+    @property
+    def started(self):
+        return self.origin_clock is not None
+
+    def start(self):
+        self.origin_clock = self.clock()
+
+    def seek(self, t):
+        self.origin_t = t
+        self.start()
+
+    def position(self):
+        if not self.started:
+            return float("-inf")
+        if self.speed is None:
+            return float("inf")
+        return self.origin_t + (self.clock() - self.origin_clock) * self.speed
+
+    def delay_until(self, t):
+        """Sekundy zegara do chwili ``t`` nagrania (0, gdy minęła; inf przed startem)."""
+        if not self.started:
+            return float("inf")
+        if self.speed is None:
+            return 0.0
+        return max(0.0, (t - self.position()) / self.speed)
+
+
+def first_nmea_time(path):
+    """Czas ścienny pierwszego zdania nagrania NMEA bez wczytywania całości; None, gdy puste."""
+    if path.endswith(".txt"):
+        with open(path, "r", encoding="ascii", errors="replace") as f:
+            for line in f:
+                match = _NMEA_LINE.match(line)
+                if match:
+                    return datetime.fromisoformat(match.group(1)).timestamp()
+        return None
+    from rawcapture import iter_records
+    for _mono_ns, wall_ns, _data in iter_records(path):
+        return wall_ns / 1e9
+    return None
+
+
+def shared_playhead(speed=1.0, start=None, nmea_path=None, events=(), clock=time.monotonic):
+    """Wspólny Playhead NMEA i akcji: od ``start`` albo od najwcześniejszego stempla obu nagrań."""
+    firsts = [t for t in (first_nmea_time(nmea_path) if nmea_path else None,
+                          min((e.t for e in events), default=None)) if t is not None]
+    reference = min(firsts) if firsts else None
+    if start is not None:
+        origin = parse_time(start, reference)
+    else:
+        origin = reference if reference is not None else 0.0
+    return Playhead(speed, origin, clock)
+
+
+# ----------------------------------------------------------------------
+# NMEA jako port szeregowy
+# ----------------------------------------------------------------------
+class ReplaySerial:
+    """Port "szeregowy" z nagraniem; przy ``speed`` None porcje po ``burst`` zdań.
+
+    Z ``playhead`` (wspólnym z ActionReplayer) ``speed``, ``start`` i ``clock``
+    są ignorowane, a odtwarzanie czeka na ``playhead.start()``.
+    """
+
+    def __init__(self, records, speed=1.0, start=None, timeout=1.0, burst=64, clock=time.monotonic,
+                 sleep=time.sleep, playhead=None):
+        self._records = records
+        self._times = [t for t, _ in records]
+        self._sleep = sleep
+        self.timeout = timeout
+        self.burst = burst
+        self.is_open = True
+        self._pending = bytearray()
+        self._index = 0
+        if playhead is None:
+            self._playhead = Playhead(speed, clock=clock)
+            self.seek(parse_time(start, self._times[0] if records else None) if start is not None else
+                      (self._times[0] if records else 0.0))
+        else:
+            self._playhead = playhead
+            self._index = bisect.bisect_left(self._times, playhead.origin_t)
+
+    def seek(self, t):
+        """Odtwarzanie od pierwszego zdania nagranego w chwili >= ``t``."""
+        self._index = bisect.bisect_left(self._times, t)
+        self._pending.clear()
+        self._playhead.seek(t)
+
+    @property
+    def position(self):
+        return min(self._playhead.position(), self._times[-1] if self._times else 0.0)
+
+    @property
+    def finished(self):
+        return self._index >= len(self._records) and not self._pending
+
+    def _release(self):
+        records, pending = self._records, self._pending
+        if not self._playhead.started:
+            return
+        if self._playhead.speed is None:
+            stop = min(self._index + self.burst, len(records))
+        else:
+            stop = bisect.bisect_right(self._times, self._playhead.position(), self._index)
+        for i in range(self._index, stop):
+            pending += records[i][1]
+            pending += b"\r\n"
+        self._index = max(self._index, stop)
+
+    @property
+    def in_waiting(self):
+        self._release()
+        return len(self._pending)
+
+    def readinto(self, buffer):
+        self._release()
+        if not self._pending:
+            # Jak bezczynny port: czekamy na następne zdanie najwyżej ``timeout``
+            if self._index >= len(self._records):
+                self._sleep(self.timeout)
+                return 0
+            self._sleep(min(self.timeout, self._playhead.delay_until(self._times[self._index])))
+            self._release()
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        del self._pending[:n]
+        return n
+
+    def read(self, size=1):
+        buffer = bytearray(size)
+        return bytes(buffer[:self.readinto(buffer)])
+
+    def close(self):
+        self.is_open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_replay(path, speed=1.0, start=None, timeout=1.0, playhead=None):
+    """ReplaySerial dla pliku NMEA (GnssConfig.replay_file)."""
+    return ReplaySerial(load_nmea(path), speed=speed, start=start, timeout=timeout, playhead=playhead)
+
+
+# ----------------------------------------------------------------------
+# Akcje operatora
+# ----------------------------------------------------------------------
+class ActionReplayer:
+    """Naciska przyciski z nagrania przez planistę; ``press(slot)`` – ścieżka kliknięcia aplikacji.
+
+    Ze wspólnym ``playhead`` (zegar jak ``scheduler.clock``) ``start()`` tylko
+    planuje akcje od ``playhead.origin_t`` – playhead uruchamia wywołujący.
+    """
+
+    def __init__(self, events, machine, press, scheduler, speed=1.0, start=None, playhead=None):
+        self.events = events
+        self._times = [e.t for e in events]
+        self._machine = machine
+        self._press = press
+        self._scheduler = scheduler
+        self._shared = playhead is not None
+        self._playhead = playhead if playhead is not None else Playhead(speed, clock=scheduler.clock)
+        self._start = parse_time(start, self._times[0] if events else None)
+        self._index = 0
+        self._handle = None
+        self.pressed = 0
+        self.skipped = []  # ActionEvent bez widocznego slotu w chwili odtworzenia
+
+    def start(self):
+        if self._shared:
+            self.stop()
+            self._index = bisect.bisect_left(self._times, self._playhead.origin_t)
+            self._schedule_next()
+            return
+        self.seek(self._start if self._start is not None else (self._times[0] if self.events else 0.0))
+
+    def seek(self, t):
+        self.stop()
+        self._index = bisect.bisect_left(self._times, t)
+        self._playhead.seek(t)
+        self._schedule_next()
+
+    @property
+    def finished(self):
+        return self._index >= len(self.events)
+
+    def _schedule_next(self):
+        if self._index < len(self.events):
+            delay = self._playhead.delay_until(self._times[self._index])
+            self._handle = self._scheduler.call_later(delay, self._fire)
+        else:
+            self._handle = None
+
+    def _fire(self):
+        event = self.events[self._index]
+        self._index += 1
+        slot = self.resolve(event)
+        if slot is None:
+            self.skipped.append(event)
+        else:
+            self._press(slot)
+            self.pressed += 1
+        self._schedule_next()
+
+    def resolve(self, event):
+        """Widoczny slot dla zdarzenia: po nazwie albo po bieżącej etykiecie."""
+        machine = self._machine
+        if event.slot is not None:
+            return event.slot if event.slot in machine.visible else None
+        for slot in sorted(machine.visible):
+            if machine.label(slot) == event.label:
+                return slot
+        return None
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+
+# ----------------------------------------------------------------------
+# Odtwarzanie bez GUI
+# ----------------------------------------------------------------------
+def _run_headless(args):
+    import nmeaparser
+    from nmeastream import ChunkedSentenceReader
+    from scheduler import Scheduler
+    from session import FakeTriggerSink, Session
+
+    speed = args.speed or None
+    events = load_actions(args.actions) if args.actions else []
+    scheduler = Scheduler()
+    # Jedna oś dla NMEA i akcji, uruchomiona jednocześnie dla obu
+    playhead = shared_playhead(speed, args.start, args.nmea, events, clock=scheduler.clock)
+    ser = reader = None
+    sentences = fixes = 0
+    if args.nmea:
+        ser = open_replay(args.nmea, timeout=0.05, playhead=playhead)
+        reader = ChunkedSentenceReader(ser, 9600)
+
+    session = replayer = None
+    if args.actions:
+        session = Session(FakeTriggerSink(), instructions=[])
+        session.start()
+        replayer = ActionReplayer(events, session.machine, session.press, scheduler, playhead=playhead)
+    playhead.start()
+    if replayer is not None:
+        replayer.start()
+
+    t0 = time.perf_counter()
+    while (ser is not None and not ser.finished) or (replayer is not None and not replayer.finished):
+        if reader is not None and not ser.finished:
+            for sentence, _mono_ns, _wall_ns in reader.read_sentences():
+                sentences += 1
+                msg = nmeaparser.parse(sentence)
+                if isinstance(msg, nmeaparser.GgaFix) and msg.gps_qual:
+                    fixes += 1
+        if replayer is not None:
+            scheduler.run_due()
+            if ser is None or ser.finished:
+                due = scheduler.next_due()
+                if due is not None:
+                    time.sleep(max(0.0, due - scheduler.clock()))
+    elapsed = time.perf_counter() - t0
+
+    if ser is not None:
+        print(f"NMEA: {sentences} zdań, {fixes} fixów w {elapsed:.2f} s ({sentences / max(elapsed, 1e-9):.0f} zdań/s)")
+    if replayer is not None:
+        print(f"Akcje: {replayer.pressed} naciśniętych, {len(replayer.skipped)} pominiętych, "
+              f"{len(session.sink.codes)} triggerów")
+        for event in replayer.skipped[:10]:
+            print(f"  pominięta: {datetime.fromtimestamp(event.t):%H:%M:%S.%f} {event.slot or event.label}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nmea", default=None, help="GNSS_All_Log*.txt albo baza segmentów rawcapture")
+    parser.add_argument("--actions", default=None, help="log_*.txt albo Journal*.sqlite")
+    parser.add_argument("--speed", type=float, default=0.0, help="tempo (1 = czas rzeczywisty, 0 = najszybciej)")
+    parser.add_argument("--start", default=None, help="początek: sekundy epoki, GG:MM:SS albo data ISO")
+    args = parser.parse_args()
+    if not (args.nmea or args.actions):
+        parser.error("podaj --nmea i/lub --actions")
+    _run_headless(args)
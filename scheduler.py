@@ -0,0 +1,167 @@
+# scheduler.py
+"""
+Jeden planista zadań okresowych i jednorazowych dla wątku GUI.
+
+Scheduler trzyma zadania w kopcu według terminu z ``time.monotonic`` i ma
+w pętli Tk co najwyżej jedno oczekujące ``after()`` – ustawione na najbliższy
+termin. Każde zadanie ma uchwyt (Handle) z ``cancel()``; zadanie okresowe
+wywołuje się w stałym rytmie (bez dryfu), a pominięte okresy są opuszczane.
+
+Bez widżetu Tk planista działa ręcznie: ``run_due(now)`` wykonuje zadania,
+których termin minął – tak używają go skrypty i testy z własnym zegarem.
+
+LegTimer to licznik czasu odcinka (Start/End) oparty na jednym zadaniu 1 Hz,
+które ``reset()`` anuluje i zakłada od nowa.
+"""
+import heapq
+import itertools
+import math
+import time
+import traceback
+
+
+class Handle:
+    __slots__ = ("due", "last_due", "interval", "callback", "cancelled", "_scheduler")
+
+    def __init__(self, scheduler, due, interval, callback):
+        self._scheduler = scheduler
+        self.due = due
+        self.last_due = None  # termin bieżącego / ostatniego wywołania (przed przestawieniem ``due``)
+        self.interval = interval
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self._scheduler._handles.discard(self)
+
+
+class Scheduler:
+    def __init__(self, widget=None, clock=time.monotonic):
+        """``widget`` – dowolny widżet Tk (pętla ``after``); None = tryb ręczny."""
+        self._widget = widget
+        self.clock = clock
+        self._heap = []
+        self._seq = itertools.count()
+        self._handles = set()
+        self._after_id = None
+        self._armed_due = None
+        self._running = False
+        self.callbacks_run = 0
+
+    def __len__(self):
+        """Liczba aktywnych (nieanulowanych) zadań."""
+        return len(self._handles)
+
+    def call_later(self, delay_s, callback):
+        return self._schedule(self.clock() + delay_s, None, callback)
+
+    def call_every(self, interval_s, callback, delay_s=None):
+        """Zadanie okresowe; pierwsze wywołanie po ``delay_s`` (domyślnie po jednym okresie)."""
+        if interval_s <= 0:
+            raise ValueError("interval_s must be positive")
+        first = interval_s if delay_s is None else delay_s
+        return self._schedule(self.clock() + first, interval_s, callback)
+
+    def _schedule(self, due, interval, callback):
+        handle = Handle(self, due, interval, callback)
+        self._handles.add(handle)
+        heapq.heappush(self._heap, (due, next(self._seq), handle))
+        self._arm()
+        return handle
+
+    def run_due(self, now=None):
+        """Wykonuje zadania z minionym terminem; zwraca liczbę wywołań."""
+        if now is None:
+            now = self.clock()
+        ran = 0
+        heap = self._heap
+        self._running = True  # zadania planowane w callbackach nie przestawiają after()
+        while heap and heap[0][0] <= now:
+            due, _, handle = heapq.heappop(heap)
+            if handle.cancelled:
+                continue
+            handle.last_due = due
+            if handle.interval is None:
+                handle.cancel()
+            else:
+                missed = math.floor((now - due) / handle.interval)
+                handle.due = due + (missed + 1) * handle.interval
+                heapq.heappush(heap, (handle.due, next(self._seq), handle))
+            try:
+                handle.callback()
+            except Exception:
+                traceback.print_exc()
+            ran += 1
+        self._running = False
+        self.callbacks_run += ran
+        self._arm()
+        return ran
+
+    def next_due(self):
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def _arm(self):
+        """Jedno ``after()`` na najbliższy termin (tylko z widżetem Tk)."""
+        if self._widget is None or self._running:
+            return
+        due = self.next_due()
+        if due is not None and due == self._armed_due and self._after_id is not None:
+            return
+        self._cancel_after()
+        if due is None:
+            return
+        delay_ms = max(0, math.ceil((due - self.clock()) * 1000))
+        self._after_id = self._widget.after(delay_ms, self._on_after)
+        self._armed_due = due
+
+    def _on_after(self):
+        self._after_id = None
+        self._armed_due = None
+        self.run_due()
+
+    def _cancel_after(self):
+        if self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        self._armed_due = None
+
+    def stop(self):
+        """Anuluje wszystkie zadania i oczekujące ``after()``."""
+        for handle in list(self._handles):
+            handle.cancel()
+        self._heap.clear()
+        self._cancel_after()
+
+
+class LegTimer:
+    """Czas od ostatniego resetu; ``on_tick(elapsed_s)`` co ``interval_s`` sekund."""
+
+    def __init__(self, scheduler, on_tick, interval_s=1.0):
+        self._scheduler = scheduler
+        self._on_tick = on_tick
+        self.interval_s = interval_s
+        self.start = scheduler.clock()
+        self._handle = None
+
+    @property
+    def elapsed(self):
+        return self._scheduler.clock() - self.start
+
+    def reset(self):
+        """Nowy odcinek: licznik od zera, poprzednie zadanie anulowane."""
+        self.start = self._scheduler.clock()
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = self._scheduler.call_every(self.interval_s, self._tick)
+        self._tick()
+
+    def _tick(self):
+        self._on_tick(self.elapsed)
@@ -0,0 +1,303 @@
+# session.py
+"""
+Silnik sesji eksperymentu bez Tk.
+
+Session łączy ProtocolMachine (protocol.py) z wysyłaniem triggerów, logiem
+sygnałów i tekstem instrukcji. Triggery idą do ``sink`` – obiektu z metodami
+``send(code)`` i ``send_sequence(codes, spacing_s)``: TriggerDispatcher z
+DSISerialPort w aplikacji albo FakeTriggerSink w testach i skryptach.
+
+Akcje są dostępne po nazwie (``session.perform("command")``) albo jako
+metody (``session.command()``, ``session.end1()``, ``session.water()``).
+Aplikacja Tk jest jednym z widoków: rejestruje ``on_outcome`` i rysuje
+przyciski według stanu ``session.machine``.
+
+Skrypt sesji bez GUI::
+
+    session = Session(FakeTriggerSink())
+    session.start()
+    session.run(["start_engine", "command", "reply", "correct", "parameters",
+                 "direct", "direct_turn1_start", ...])
+    session.sink.codes
+
+Z ``stats`` (instrumentation.Instrumentation) Session mierzy czas każdej
+akcji (``action.<slot>:<krok>``) i etapy wysyłania: format, log, enqueue.
+
+``press(slot, stamp)`` przyjmuje InputStamp – czas naciśnięcia klawisza /
+przycisku zebrany na wejściu handlera Tk. Stempel trafia do logu obok każdego
+triggera wywołanego tym naciśnięciem (korekta latencji zdarzeń EEG offline)
+i do rekordu dispatchera (``TriggerRecord.input_ns``).
+
+Z ``journal`` (journal.Journal) każda akcja, trigger i tekst instrukcji
+trafia też do dziennika sesji SQLite. Z ``timebase`` (timebase.TimeBase)
+log zapisu triggera zawiera czas UTC z GNSS z oszacowaniem błędu.
+"""
+import csv
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+import codebook
+from protocol import ENTRY_SLOTS, STEPS, ProtocolMachine
+from taskstate import TaskStateEnum
+from timebase import format_utc
+
+# Sloty przełączane (bez względu na krok) – akcja nazywa się jak slot bez "_button"
+_TOGGLE_SLOTS = ("water_button", "pause_button", "alpha_button", "talk_button",
+                 "check_triggers_button", "error_button")
+
+
+def _build_actions():
+    """Nazwa akcji -> (slot, wymagany krok albo None)."""
+    actions = {}
+    for slot in _TOGGLE_SLOTS:
+        actions[slot[:-len("_button")]] = (slot, None)
+    for slot, step in STEPS:
+        if slot in _TOGGLE_SLOTS:
+            continue
+        if slot in ENTRY_SLOTS and step.startswith("turn"):
+            name = f"{slot.split('_')[0]}_{step}"
+        else:
+            name = step
+        if name in actions:
+            raise ValueError(f"Duplicate action name: {name}")
+        actions[name] = (slot, step)
+    return actions
+
+
+ACTIONS = _build_actions()
+
+
+class InputStamp(NamedTuple):
+    """Naciśnięcie, które wywołało akcję."""
+    source: str                  # "key", "mouse" albo "replay"
+    key: Optional[str]           # keysym dla klawiatury
+    event_time_ms: Optional[int]  # event.time z Tk (zegar serwera okien, ms); None dla przycisku
+    perf_ns: int                 # time.perf_counter_ns() na wejściu handlera
+
+
+def load_instructions(csv_filename):
+    """Instrukcje holdingu z pliku CSV (``Inbound [deg]``; ``Typ wlotu``)."""
+    instructions = []
+    try:
+        with open(csv_filename, mode="r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f, delimiter=";")
+            for row in reader:
+                inbound_str = row.get("Inbound [deg]", "0")
+                typ_wlotu = row.get("Typ wlotu", "D")
+                try:
+                    inbound_deg = int(inbound_str)
+                except ValueError:
+                    inbound_deg = 0
+                instructions.append(
+                    {"inbound_deg": inbound_deg, "typ_wlotu": typ_wlotu}
+                )
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print("Błąd czytania CSV:", e)
+    return instructions
+
+
+class FakeTriggerSink:
+    """Sink triggerów bez portu – zapisuje (perf_counter_ns, kod) bez opóźnień."""
+
+    def __init__(self):
+        self.sent = []
+
+    @property
+    def codes(self):
+        return [code for _t, code in self.sent]
+
+    def send(self, code, input_ns=None):
+        self.sent.append((time.perf_counter_ns(), code))
+
+    def send_sequence(self, codes, spacing_s=0.01, input_ns=None):
+        for code in codes:
+            self.send(code)
+
+    def stop(self, timeout=None):
+        pass
+
+
+class Session:
+    def __init__(self, sink, logger=None, instructions=None, stats=None, journal=None, timebase=None):
+        """``instructions`` – lista z load_instructions (None = nie wczytane)."""
+        self.sink = sink
+        self.stats = stats
+        self.journal = journal
+        self.timebase = timebase
+        self.logger = logger
+        self.instructions = instructions
+        self.current_instruction_index = 0
+        self.instruction_text = ""
+        self.last_sent_state = TaskStateEnum.INIT_VALUE.value
+        self.prev_sent_state = None
+        self._previous_timestamp = datetime.now()
+        self.machine = ProtocolMachine(lambda: self.last_sent_state)
+        self._input = None  # InputStamp naciśnięcia obsługiwanego w press()
+        self.on_outcome = None  # on_outcome(outcome) – widok (np. aplikacja Tk)
+
+    # ------------------------------------------------------------------
+    # Akcje
+    # ------------------------------------------------------------------
+    def start(self):
+        """Trigger INIT_VALUE na początek sesji."""
+        self.send(TaskStateEnum.INIT_VALUE.value)
+
+    def press(self, slot, stamp=None):
+        """Naciśnięcie slotu (przycisk / skrót); None, gdy slot jest ukryty.
+
+        ``stamp`` – InputStamp z handlera Tk; None dla akcji ze skryptu.
+        """
+        t0 = time.perf_counter_ns()
+        step = self.machine.steps.get(slot)
+        outcome = self.machine.fire(slot)
+        if outcome is None:
+            return None
+        if self.journal is not None:
+            self.journal.action(slot, step, stamp.perf_ns if stamp is not None else None)
+        codes = outcome.codes
+        self._input = stamp
+        try:
+            if len(codes) == 1:
+                self.send(codes[0])
+            elif codes:
+                self.send_sequence(codes, outcome.transition.spacing_s)
+        finally:
+            self._input = None
+
+        effects = outcome.transition.effects
+        if "generate_text" in effects:
+            self.generate_text()
+        if "clear_text" in effects:
+            self.instruction_text = ""
+        if self.on_outcome:
+            self.on_outcome(outcome)
+        if self.stats is not None:
+            self.stats.record(f"action.{slot}:{step}", time.perf_counter_ns() - t0)
+        return outcome
+
+    def available(self, name):
+        slot, step = ACTIONS[name]
+        return slot in self.machine.visible and (step is None or self.machine.steps[slot] == step)
+
+    def perform(self, name):
+        """Akcja po nazwie; RuntimeError, gdy w bieżącym stanie jest niedostępna."""
+        if name not in ACTIONS:
+            raise KeyError(f"Unknown action: {name}")
+        if not self.available(name):
+            slot, _step = ACTIONS[name]
+            raise RuntimeError(f"Action {name!r} not available (slot {slot} at {self.machine.steps[slot]!r})")
+        return self.press(ACTIONS[name][0])
+
+    def run(self, names):
+        """Wykonuje akcje po kolei; zwraca listę wyników przejść."""
+        return [self.perform(name) for name in names]
+
+    def __getattr__(self, name):
+        if name in ACTIONS:
+            return lambda: self.perform(name)
+        raise AttributeError(name)
+
+    # ------------------------------------------------------------------
+    # Triggery
+    # ------------------------------------------------------------------
+    def send(self, data: int):
+        self._register_sent_state(data)
+        t0 = time.perf_counter_ns()
+        self.sink.send(data, input_ns=self._input_ns())
+        if self.stats is not None:
+            self.stats.record("send.enqueue", time.perf_counter_ns() - t0)
+
+    def send_sequence(self, codes, spacing_s=0.01):
+        """Wysyła kilka kodów w odstępie spacing_s (odstępy odmierza sink)."""
+        for data in codes:
+            self._register_sent_state(data)
+        t0 = time.perf_counter_ns()
+        self.sink.send_sequence(codes, spacing_s, input_ns=self._input_ns())
+        if self.stats is not None:
+            self.stats.record("send.enqueue", time.perf_counter_ns() - t0)
+
+    def _input_ns(self):
+        return self._input.perf_ns if self._input is not None else None
+
+    def _register_sent_state(self, data: int):
+        data_byte = codebook.encode(data)  # ValueError dla kodu spoza TaskStateEnum
+        self.prev_sent_state = self.last_sent_state
+        self.last_sent_state = data
+        if self.journal is not None:
+            self.journal.trigger(data, self._input_ns())
+        if not self.logger:
+            return
+
+        t0 = time.perf_counter_ns()
+        now = datetime.now()
+        diff = now - self._previous_timestamp
+        self._previous_timestamp = now
+
+        log_msg = (
+            f"{now.strftime('%H:%M:%S.%f')}>>{diff}\t"
+            f"Sending data byte: {data_byte}, {data}, {codebook.member(data)}"
+        )
+        stamp = self._input
+        if stamp is not None:
+            log_msg += (
+                f"\tinput={stamp.source}:{stamp.key} event_time_ms={stamp.event_time_ms} "
+                f"input_ns={stamp.perf_ns} (+{(t0 - stamp.perf_ns) / 1000:.0f} us)"
+            )
+        t1 = time.perf_counter_ns()
+        self.logger.log_signal(log_msg)
+        if self.stats is not None:
+            self.stats.record("send.format", t1 - t0)
+            self.stats.record("send.log", time.perf_counter_ns() - t1)
+
+    def log_trigger_written(self, record):
+        """Callback wątku dispatchera – czas od zlecenia do zapisu bajtu."""
+        if self.journal is not None:
+            self.journal.trigger_written(record)
+        if not self.logger:
+            return
+        msg = (
+            f"Trigger written: {record.code}, enqueue_ns={record.enqueue_ns}, "
+            f"write_ns={record.write_ns}, "
+            f"delay={(record.write_ns - record.enqueue_ns) / 1000:.0f} us"
+        )
+        if record.input_ns is not None:
+            msg += (
+                f", input_ns={record.input_ns}, "
+                f"input_to_write={(record.write_ns - record.input_ns) / 1000:.0f} us"
+            )
+        if self.timebase is not None:
+            gnss_time = self.timebase.gnss_time_perf(record.write_ns)
+            if gnss_time is not None:
+                msg += f", gnss_utc={format_utc(gnss_time)}"
+        self.logger.log(msg, level="TIMING")
+
+    # ------------------------------------------------------------------
+    # Instrukcje
+    # ------------------------------------------------------------------
+    def generate_text(self):
+        if self.instructions is None:
+            txt = "Instrukcje nie wczytane."
+        elif self.current_instruction_index >= len(self.instructions):
+            txt = "Brak dalszych instrukcji w pliku CSV."
+        else:
+            instr = self.instructions[self.current_instruction_index]
+            self.current_instruction_index += 1
+            deg = instr["inbound_deg"]
+            typ = {"D": "Direct", "P": "Parallel", "T": "Teardrop"}.get(
+                instr["typ_wlotu"], "Direct"
+            )
+            txt = (
+                "Hold over point Zulu Uniform Echo 5000 ft altitude\n"
+                f"Inbound track {deg} degrees\n"
+                f"{typ} entry\n"
+                "Outbound time 1 minute"
+            )
+        self.instruction_text = txt
+        if self.journal is not None:
+            self.journal.instruction(txt)
+        if self.logger:
+            self.logger.log_generated_text(txt)
+        return txt
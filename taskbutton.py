@@ -16,6 +16,7 @@ class TaskButton:
         # Zapisujemy podany callback w atrybucie self.callback
         self.callback = command
         self.logger = logger
+        self.text = text
 
         # Przycisk Tkinter, którego "command" ustawiamy na metodę on_click
         self.button = tk.Button(
@@ -27,16 +28,17 @@ class TaskButton:
         )
         self.button.grid(row=row, column=column, padx=5, pady=5)
 
-    def on_click(self):
+    def on_click(self, *args):
         """
         Metoda wywoływana po kliknięciu w przycisk.
         Logujemy kliknięcie (jeżeli logger istnieje) i wywołujemy self.callback(),
         czyli faktyczną funkcję związaną z danym przyciskiem.
+        Argumenty (np. stempel naciśnięcia klawisza) są przekazywane do callbacku.
         """
         if self.logger:
-            self.logger.log_click(self.button.cget("text"))
+            self.logger.log_click(self.text)
         if self.callback:
-            self.callback()
+            self.callback(*args)
 
     def update_button(self, new_text, new_command, bg=None):
         """
@@ -45,6 +47,7 @@ class TaskButton:
         przechowujemy nowy callback także w self.callback.
         """
         self.callback = new_command
+        self.text = new_text
         self.button.config(text=new_text, command=self.on_click)
 
         if bg:
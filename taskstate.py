@@ -0,0 +1,48 @@
+# taskstate.py
+"""Kody triggerów DSI wysyłane w trakcie eksperymentu."""
+from enum import Enum
+
+
+class TaskStateEnum(Enum):
+    INIT_VALUE = 5
+    START_ENGINE = 6
+    TAXIING = 7
+    TAKE_OFF = 8
+    CLIMBING = 9
+    DESCENDING = 10
+    LANDING = 11
+    TALKING = 12
+    START_LEFT = 19
+    COMMAND = 20
+    REPLY = 30
+    CORRECT = 50
+    PARAMETERS = 60
+    HOLDING_START = 70
+    HOLDING_ENTRY = 80
+    START_RIGHT = 90
+    END1 = 100
+    START2 = 110
+    END2 = 120
+    START3 = 130
+    END3 = 140
+    START4 = 150
+    END4 = 160
+    DIRECT = 200
+    PARALLEL = 210
+    TEARDROP = 220
+    ENTRY_DIRECT_TURN1_START = 211
+    ENTRY_DIRECT_TURN1_END = 212
+    ENTRY_DIRECT_TURN2_START = 213
+    ENTRY_DIRECT_TURN2_END = 214
+    ENTRY_TEARDROP_TURN1_START = 222
+    ENTRY_TEARDROP_TURN1_END = 225
+    ENTRY_TEARDROP_TURN2_START = 230
+    ENTRY_TEARDROP_TURN2_END = 235
+    ENTRY_PARALLEL_TURN1_START = 237
+    ENTRY_PARALLEL_TURN1_END = 240
+    ENTRY_PARALLEL_TURN2_START = 243
+    ENTRY_PARALLEL_TURN2_END = 245
+    PAUSE = 249
+    WATER = 250
+    ALPHA = 251
+    ERROR = 13
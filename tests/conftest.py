@@ -0,0 +1,118 @@
+# tests/conftest.py
+"""
+Moduły projektu leżą płasko w katalogu głównym repozytorium.
+
+Wspólne atrapy testów: zegar FakeClock, skryptowa sesja (``scenario``,
+``run_session``) i symulacja długiej sesji dla planisty (``simulate``).
+Testy nie importują skryptów bench_*.py – te mogą się zmieniać niezależnie.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import LegTimer, Scheduler  # noqa: E402
+from session import FakeTriggerSink, Session  # noqa: E402
+
+ENGINE_START = ["start_engine", "taxiing", "take_off", "climbing"]
+ENGINE_END = ["descending", "landing", "taxiing_in", "experiment_end"]
+BRIEFING = ["command", "reply", "correct", "parameters"]
+LEGS = ["end1", "start2", "end2", "start3", "end3"]
+LEGS_4 = ["start4", "end4"]
+
+
+class FakeClock:
+    """Zegar sekund dla Scheduler(clock=...) przesuwany ręcznie."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def turns(kind):
+    return [f"{kind}_{step}" for step in ("turn1_start", "turn1_end", "turn2_start", "turn2_end")]
+
+
+def scenario():
+    """Akcje jednej sesji: pierwszy holding, potem kolejne z Start4/End4 przed wlotem."""
+    actions = list(ENGINE_START)
+    actions += BRIEFING + ["direct"] + turns("direct") + ["holding_start"] + LEGS
+    actions += ["water", "water", "talk", "talk"]
+    for kind in ("parallel", "teardrop"):
+        actions += BRIEFING + [kind] + LEGS_4 + turns(kind) + ["holding_start"]
+        actions += ["end1", "error", "end1", "start2", "pause", "pause", "end2", "start3", "end3"]
+        actions += ["alpha", "alpha"]
+    actions += ["check_triggers"] + ENGINE_END
+    return actions
+
+
+def run_session(actions):
+    """Kody wysłane przez Session dla listy akcji."""
+    session = Session(FakeTriggerSink(), instructions=[])
+    session.start()
+    session.run(actions)
+    return session.sink.codes
+
+
+def simulate(hours, action_interval_s, step_s, legacy=False):
+    """Statystyki planisty co symulowaną minutę dla powtarzanego ``scenario()``.
+
+    Efekty przejść jak w aplikacji: "reset_timer" -> LegTimer.reset(),
+    "check_triggers" -> przypomnienie po 120 s; do tego dwa zadania 1 Hz.
+    ``legacy`` odtwarza dawny timer (nowy łańcuch 1 Hz przy każdym resecie).
+    """
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    leg_timer = LegTimer(scheduler, lambda elapsed_s: None)
+    state = {"check_handle": None}
+
+    def reset_timer():
+        if legacy:
+            scheduler.call_every(1.0, lambda: None, delay_s=0.0)
+        else:
+            leg_timer.reset()
+
+    def check_triggers():
+        if state["check_handle"] is not None:
+            state["check_handle"].cancel()
+        state["check_handle"] = scheduler.call_later(120.0, lambda: None)
+
+    effects = {"reset_timer": reset_timer, "check_triggers": check_triggers}
+
+    def on_outcome(outcome):
+        for effect in outcome.transition.effects:
+            handler = effects.get(effect)
+            if handler:
+                handler()
+
+    scheduler.call_every(1.0, lambda: None)  # mapa
+    scheduler.call_every(1.0, lambda: None)  # status fix
+    reset_timer()
+
+    actions = scenario()
+    session = None
+    pending = []
+    next_action = 0.0
+    minutes = []
+    last_minute_calls = 0
+    while clock.now < hours * 3600.0:
+        clock.now = round(clock.now + step_s, 6)
+        if clock.now >= next_action:
+            if not pending:
+                session = Session(FakeTriggerSink(), instructions=[])
+                session.on_outcome = on_outcome
+                session.start()
+                pending = list(actions)
+            session.perform(pending.pop(0))
+            next_action += action_interval_s
+        scheduler.run_due()
+        if clock.now % 60.0 < step_s / 2:
+            minutes.append({
+                "minute": int(clock.now // 60),
+                "callbacks": scheduler.callbacks_run - last_minute_calls,
+                "tasks": len(scheduler),
+            })
+            last_minute_calls = scheduler.callbacks_run
+    return minutes
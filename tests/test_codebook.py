@@ -0,0 +1,46 @@
+# tests/test_codebook.py
+import json
+from enum import Enum
+
+import pytest
+
+import codebook
+from taskstate import TaskStateEnum
+
+
+def test_validation_rejects_duplicate_codes():
+    Duplicated = Enum("Duplicated", [("START", 10), ("ALSO_START", 10)])
+    with pytest.raises(ValueError, match="duplicate"):
+        codebook._validate(Duplicated)
+
+
+@pytest.mark.parametrize("value", [256, -1, "A"])
+def test_validation_rejects_codes_outside_one_byte(value):
+    Wide = Enum("Wide", [("OK", 1), ("BAD", value)])
+    with pytest.raises(ValueError, match="one byte"):
+        codebook._validate(Wide)
+
+
+def test_task_states_pass_validation_and_encode():
+    codebook._validate(TaskStateEnum)
+    for m in TaskStateEnum:
+        assert codebook.encode(m) == codebook.encode(m.value) == bytes((m.value,))
+        assert codebook.member(m.value) is m
+    unused = next(v for v in range(256) if v not in codebook.BY_VALUE)
+    with pytest.raises(ValueError):
+        codebook.encode(unused)
+
+
+def test_json_and_tsv_exports_match_task_states(tmp_path):
+    expected = sorted((m.name, m.value, f"0x{m.value:02X}") for m in TaskStateEnum)
+    codebook.export_json(tmp_path / "codes.json")
+    codebook.export_tsv(tmp_path / "codes.tsv")
+
+    data = json.loads((tmp_path / "codes.json").read_text(encoding="utf-8"))
+    assert data["version"] == codebook.CODEBOOK_VERSION
+    assert sorted((c["name"], c["value"], c["byte"]) for c in data["codes"]) == expected
+    assert [c["value"] for c in data["codes"]] == sorted(m.value for m in TaskStateEnum)
+
+    header, *lines = (tmp_path / "codes.tsv").read_text(encoding="utf-8").splitlines()
+    assert header == "name\tvalue\tbyte"
+    assert sorted((name, int(value), byte) for name, value, byte in (line.split("\t") for line in lines)) == expected
@@ -0,0 +1,85 @@
+# tests/test_dsiserialport.py
+import time
+
+import pytest
+import serial
+
+import dsiserialport
+from dsiserialport import DSISerialPort
+from taskstate import TaskStateEnum as S
+
+
+class FakeSerial:
+    """Port DSI: ``script`` – kolejne wyniki zapisu (None = zapisano, wyjątek = rzucony)."""
+
+    opened = []
+    script = []
+
+    def __init__(self, *args, **kwargs):
+        self.written = []
+        self.closed = False
+        FakeSerial.opened.append(self)
+
+    def write(self, data):
+        outcome = FakeSerial.script.pop(0) if FakeSerial.script else None
+        if outcome is not None:
+            raise outcome
+        self.written.append(data)
+        return len(data)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def port(monkeypatch):
+    FakeSerial.opened, FakeSerial.script = [], []
+    monkeypatch.setattr(dsiserialport.serial, "Serial", FakeSerial)
+    log = []
+    dsi = DSISerialPort("COM_TEST", lambda *a: log.append(a), log_function=log.append,
+                        reconnect_min_s=0.01, max_write_timeouts=3)
+    dsi.initialize_serial_port()
+    yield dsi, log
+    dsi.close_serial_port()
+
+
+def timeout():
+    return serial.SerialTimeoutException("Write timeout")
+
+
+def test_tolerated_timeouts_keep_port_open_but_mark_trigger_failed(port):
+    dsi, log = port
+    FakeSerial.script = [timeout(), timeout()]
+    assert dsi.send_signal(S.COMMAND.value) is False
+    assert dsi.send_signal(S.REPLY.value) is False
+    assert dsi.connected and dsi.disconnects == 0
+    assert [f.code for f in dsi.pending] == [S.COMMAND.value, S.REPLY.value]
+    assert dsi.send_signal(S.CORRECT.value) is True
+    assert dsi.write_timeouts == 0
+    assert len(FakeSerial.opened) == 1
+    assert sum("Warning: write timeout" in line for line in log) == 2
+
+
+def test_consecutive_timeouts_start_outage_and_reconnect(port):
+    dsi, log = port
+    FakeSerial.script = [timeout(), timeout(), timeout()]
+    results = [dsi.send_signal(S.COMMAND.value) for _ in range(3)]
+    assert results == [False, False, False]
+    assert dsi.disconnects == 1
+    assert FakeSerial.opened[0].closed
+
+    deadline = time.monotonic() + 2.0
+    while not any("reconnected" in line for line in log) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert dsi.connected and len(FakeSerial.opened) == 2
+    assert sum("Trigger not delivered" in line for line in log) == 3
+    assert not dsi.pending
+    assert dsi.send_signal(S.REPLY.value) is True
+
+
+def test_other_write_error_drops_port_at_once(port):
+    dsi, log = port
+    FakeSerial.script = [serial.SerialException("device disconnected")]
+    assert dsi.send_signal(S.COMMAND.value) is False
+    assert dsi.disconnects == 1
+    assert any("cannot send data" in line for line in log)
@@ -0,0 +1,53 @@
+# tests/test_fixstore.py
+import numpy as np
+import pytest
+
+from fixstore import FIX_DTYPE, HEADER_SIZE, FixStoreWriter, open_fix_store, read_header
+
+
+def write_fixes(path, k0, k1, **kwargs):
+    with FixStoreWriter(str(path), **kwargs) as writer:
+        for k in range(k0, k1):
+            writer.append(1000.0 + k, 43200.0 + k, 52.0 + k * 1e-4, 21.0, 1, 8, 0.9, 100.0)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "GNSS_Log.fix"
+    write_fixes(path, 0, 600, chunk_size=256)
+    assert read_header(str(path)) == (HEADER_SIZE, FIX_DTYPE)
+    fixes = open_fix_store(str(path))
+    assert len(fixes) == 600
+    assert np.array_equal(fixes["t_local"], 1000.0 + np.arange(600))
+    assert fixes["lat"][-1] == pytest.approx(52.0 + 599e-4)
+    assert (fixes["quality"][0], fixes["num_sats"][0]) == (1, 8)
+
+
+def test_missing_values_are_nan(tmp_path):
+    path = tmp_path / "GNSS_Log.fix"
+    with FixStoreWriter(str(path)) as writer:
+        writer.append(1000.0, None, 52.0, 21.0, None, None, None, None)
+    (fix,) = open_fix_store(str(path))
+    assert np.isnan(fix["t_gnss"]) and np.isnan(fix["hdop"]) and np.isnan(fix["altitude"])
+    assert fix["quality"] == 0 and fix["num_sats"] == 0
+
+
+def test_reopened_partial_file_drops_torn_record_and_continues(tmp_path):
+    path = tmp_path / "GNSS_Log.fix"
+    write_fixes(path, 0, 5)
+    with open(path, "ab") as f:
+        f.write(b"\x01" * (FIX_DTYPE.itemsize // 2))  # urwany zapis ostatniego rekordu
+    # Czytelnik pomija niepełny rekord, pisarz go ucina i dopisuje dalej
+    assert len(open_fix_store(str(path))) == 5
+    write_fixes(path, 5, 8)
+    fixes = open_fix_store(str(path))
+    assert np.array_equal(fixes["t_local"], 1000.0 + np.arange(8))
+    assert path.stat().st_size == HEADER_SIZE + 8 * FIX_DTYPE.itemsize
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "GNSS_Log.fix"
+    path.write_bytes(b"not a fix store".ljust(64, b"\0"))
+    with pytest.raises(ValueError):
+        open_fix_store(str(path))
+    with pytest.raises(ValueError):
+        FixStoreWriter(str(path))
@@ -0,0 +1,47 @@
+# tests/test_gnssreader.py
+import threading
+from functools import reduce
+from operator import xor
+
+from fixstore import open_fix_store
+from gnssreader import GnssConfig, run_acquisition
+from rawcapture import iter_records
+
+
+def nmea(body):
+    return f"${body}*{reduce(xor, body.encode(), 0):02X}"
+
+
+FIXES = [nmea(f"GPGGA,1200{s:02d}.00,5213.0000,N,02100.0000,E,1,08,0.9,100.0,M,,,,") for s in range(3)]
+OTHER = [nmea("GPGSV,1,1,01,01,40,083,46"), "$GPGGA,garbage*00", nmea("GPRMC,120001.00,A,5213.0,N,02100.0,E,0.0,0.0,010125,,")]
+
+
+def test_callback_error_does_not_drop_fixes(tmp_path):
+    sentences = [FIXES[0], OTHER[0], OTHER[1], FIXES[1], OTHER[2], FIXES[2]]
+    recording = tmp_path / "GNSS_All_Log.txt"
+    recording.write_text("".join(f"2025-01-01 12:00:0{i}.000: {s}\n" for i, s in enumerate(sentences)))
+
+    stop = threading.Event()
+    fixes = []
+
+    def on_fix(msg, mono_ns, wall_ns):
+        fixes.append(msg.utc_seconds)
+        if len(fixes) == 1:
+            raise RuntimeError("callback failed")
+        if len(fixes) == len(FIXES):
+            stop.set()
+
+    config = GnssConfig(None, 9600, str(tmp_path / "raw"), raw_compression="gzip",
+                        csv_file=str(tmp_path / "fix.csv"), fixstore_file=str(tmp_path / "fix.fix"), replay_file=str(recording), replay_speed=None)
+    guard = threading.Timer(5.0, stop.set)  # przy regresji pętla czekałaby na dane bez końca
+    guard.start()
+    try:
+        run_acquisition(config, stop, on_fix=on_fix)
+    finally:
+        guard.cancel()
+
+    assert fixes == [43200.0, 43201.0, 43202.0]
+    # Callback pierwszego fixu zawiódł, ale CSV i plik fixów mają wszystkie, a surowy log każde zdanie
+    assert len((tmp_path / "fix.csv").read_text().splitlines()) == 1 + len(FIXES)
+    assert len(open_fix_store(str(tmp_path / "fix.fix"))) == len(FIXES)
+    assert [data.decode() for _m, _w, data in iter_records(str(tmp_path / "raw"))] == sentences
@@ -0,0 +1,68 @@
+# tests/test_instrumentation.py
+import json
+import threading
+
+from conftest import FakeClock
+from instrumentation import Histogram, Instrumentation, LoopLagMonitor
+from scheduler import Scheduler
+
+
+def test_loop_lag_records_stall_longer_than_interval():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    stats = Instrumentation()
+    LoopLagMonitor(scheduler, stats, interval_s=0.1)
+
+    clock.now = 0.1
+    scheduler.run_due()
+    clock.now = 0.55  # pętla zablokowana 350 ms po terminie 0.2 s
+    scheduler.run_due()
+
+    hist = stats.histograms["loop.lag"]
+    assert hist.count == 2
+    assert hist.min_ns == 0
+    assert abs(hist.max_ns - 350_000_000) < 1000
+
+
+def test_histogram_percentiles_within_bucket():
+    hist = Histogram()
+    for us in range(1, 101):
+        hist.record(us * 1000)
+    summary = hist.summary()
+    assert summary["count"] == 100
+    assert summary["min_us"] == 1.0
+    assert summary["max_us"] == 100.0
+    assert 32 <= summary["p50_us"] <= 65.536
+    assert summary["p99_us"] <= 100.0
+
+
+def test_dump_writes_summary_and_buckets(tmp_path):
+    stats = Instrumentation()
+    stats.record("send.log", 1500)
+    path = tmp_path / "timing.json"
+    stats.dump(str(path))
+    data = json.loads(path.read_text())
+    assert data["histograms"]["send.log"]["count"] == 1
+    assert sum(data["histograms"]["send.log"]["counts"]) == 1
+
+
+def test_summary_while_other_threads_create_histograms():
+    stats = Instrumentation()
+
+    def create(prefix):
+        for i in range(3000):
+            stats.record(f"{prefix}.{i}", i)
+
+    threads = [threading.Thread(target=create, args=(p,)) for p in ("dispatch", "log", "gps")]
+    for t in threads:
+        t.start()
+    errors = []
+    while any(t.is_alive() for t in threads):
+        try:
+            stats.summary()
+        except RuntimeError as e:  # "dictionary changed size during iteration"
+            errors.append(e)
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len(stats.summary()) == 9000
@@ -0,0 +1,98 @@
+# tests/test_journal.py
+import time
+
+import numpy as np
+import pytest
+
+import journal
+from gnssprocess import SLOT_DTYPE
+from nmeaparser import GgaFix
+from taskstate import TaskStateEnum as S
+from timebase import TimeBase
+from triggerdispatcher import TriggerRecord
+
+S_NS = 1_000_000_000
+
+
+def fix(utc_seconds):
+    return GgaFix("GP", utc_seconds, 52.0, 21.0, 1, 8, 0.9, 100.0)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "Journal.sqlite")
+
+
+def test_events_round_trip_and_between(path):
+    j = journal.Journal(path)
+    j._put((0, 0.0, journal.TRIGGER, S.START2.value, "START2") + (None,) * 12)
+    for k in range(1, 4):
+        j.fix(fix(100.0 + k), k * S_NS, k * S_NS)
+    j._put((5 * S_NS, 5.0, journal.TRIGGER, S.END2.value, "END2") + (None,) * 12)
+    j.fix(fix(106.0), 6 * S_NS, 6 * S_NS)
+    j.close()
+    assert j.written == 6 and j.dropped == 0
+
+    conn = journal.connect(path)
+    try:
+        rows = journal.between(conn, "START2", "END2")
+        assert [row["t_gnss"] for row in rows] == [101.0, 102.0, 103.0]
+        assert journal.trigger_ns(conn, S.END2) == 5 * S_NS
+        assert journal.trigger_ns(conn, S.END2.value, occurrence=1) is None
+        assert len(journal.events(conn)) == 6
+    finally:
+        conn.close()
+
+
+def test_actions_instructions_and_gnss_time_for_triggers(path):
+    tb = TimeBase(min_samples=2)
+    start = 10 * S_NS
+    for k in range(5):
+        tb.add_fix(1000.0 + k, start + k * S_NS)
+
+    j = journal.Journal(path, timebase=tb)
+    j.action("start_left_button", "command", input_ns=123)
+    j.instruction("Turn left")
+    j.trigger(S.COMMAND.value, input_ns=123)
+    write_ns = time.perf_counter_ns()
+    j.trigger_written(TriggerRecord(S.COMMAND.value, write_ns - 1000, write_ns, 123))
+    j.close()
+
+    conn = journal.connect(path)
+    try:
+        action, instruction, trigger, written = journal.events(conn)
+        assert (action["type"], action["name"], action["text"], action["input_ns"]) == (
+            journal.ACTION, "start_left_button", "command", 123)
+        assert instruction["text"] == "Turn left"
+        assert trigger["name"] == "COMMAND" and trigger["t_gnss"] is not None
+        assert written["type"] == journal.TRIGGER_WRITTEN and written["write_ns"] == write_ns
+        assert written["t_gnss"] == pytest.approx(tb.gnss_time_perf(write_ns).utc_s)
+    finally:
+        conn.close()
+
+
+def test_closed_journal_ignores_events(path):
+    j = journal.Journal(path)
+    j.close()
+    j.instruction("late")
+    assert j.dropped == 0 and j.written == 0
+
+
+def test_fix_batch_is_one_queue_item_expanded_by_writer(path):
+    batch = np.zeros(3, dtype=SLOT_DTYPE)
+    batch["mono_ns"] = [1 * S_NS, 2 * S_NS, 3 * S_NS]
+    batch["t_gnss"] = [101.0, 102.0, 103.0]
+    batch["lat"] = 52.0
+    j = journal.Journal(path, queue_size=1)  # porcja musi zmieścić się jako jeden element
+    j.fixes(batch)
+    j.fixes(batch[:0])
+    j.close()
+    assert j.dropped == 0 and j.written == 3
+
+    conn = journal.connect(path)
+    try:
+        rows = journal.events(conn, journal.FIX)
+        assert [row["t_gnss"] for row in rows] == [101.0, 102.0, 103.0]
+        assert {row["lat"] for row in rows} == {52.0}
+    finally:
+        conn.close()
@@ -0,0 +1,66 @@
+# tests/test_logger.py
+import threading
+import time
+
+import pytest
+
+import logger as logger_module
+from logger import Logger
+
+
+def read_log(log):
+    with open(log.log_file) as f:
+        return f.read()
+
+
+def test_records_are_written_on_close(tmp_path):
+    log = Logger(log_dir=str(tmp_path), echo=False)
+    log.log("first")
+    log.log_signal("5")
+    log.close()
+    text = read_log(log)
+    assert "[INFO] - first" in text
+    assert "[SIGNAL] - Signal sent: 5" in text
+    log.log("after close")  # ignorowane, bez wyjątku
+    assert "after close" not in read_log(log)
+
+
+def test_open_error_raises_in_constructor(tmp_path, monkeypatch):
+    def failing_open(*args, **kwargs):
+        raise PermissionError("denied")
+
+    monkeypatch.setattr(logger_module, "open", failing_open, raising=False)
+    with pytest.raises(PermissionError):
+        Logger(log_dir=str(tmp_path), echo=False)
+
+
+def test_write_error_keeps_writer_running(tmp_path):
+    log = Logger(log_dir=str(tmp_path), echo=False, flush_interval=0.01)
+    log._file.close()  # każdy zapis wątku kończy się błędem
+    for i in range(5):
+        log.log(f"record {i}")
+        time.sleep(0.02)
+    assert log._writer_thread.is_alive()
+    assert log.write_errors >= 1
+    log.close(timeout=2.0)
+    assert not log._writer_thread.is_alive()
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    log = Logger(log_dir=str(tmp_path), queue_size=2, echo=False)
+    release = threading.Event()
+    real_format = log.format_record
+
+    def slow_format(*record):
+        release.wait(5)
+        return real_format(*record)
+
+    log.format_record = slow_format  # writer stoi na pierwszym rekordzie
+    t0 = time.perf_counter()
+    for i in range(50):
+        log.log(f"record {i}")
+    assert time.perf_counter() - t0 < 0.5
+    assert log.dropped > 0
+    release.set()
+    log.close()
+    assert "log records dropped" in read_log(log)
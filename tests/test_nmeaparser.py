@@ -0,0 +1,79 @@
+# tests/test_nmeaparser.py
+import datetime
+from functools import reduce
+from operator import xor
+
+import pytest
+
+from nmeaparser import GgaFix, RmcFix, VtgFix, checksum_ok, parse, utc_time
+
+
+def nmea(body):
+    return f"${body}*{reduce(xor, body.encode(), 0):02X}".encode()
+
+
+GGA = nmea("GNGGA,123519.50,4807.038,N,01131.000,W,1,08,0.9,545.4,M,46.9,M,,")
+RMC = nmea("GPRMC,235959.99,A,4807.038,S,01131.000,E,022.4,084.4,230325,003.1,W")
+VTG = nmea("GPVTG,054.7,T,034.4,M,005.5,N,010.2,K")
+
+
+def test_gga_fields():
+    msg = parse(GGA)
+    assert isinstance(msg, GgaFix)
+    assert msg.talker == "GN"
+    assert msg.utc_seconds == pytest.approx(12 * 3600 + 35 * 60 + 19.5)
+    assert msg.latitude == pytest.approx(48 + 7.038 / 60)
+    assert msg.longitude == pytest.approx(-(11 + 31.0 / 60))
+    assert (msg.gps_qual, msg.num_sats, msg.horizontal_dil, msg.altitude) == (1, 8, 0.9, 545.4)
+
+
+def test_rmc_and_vtg_fields():
+    rmc = parse(RMC)
+    assert isinstance(rmc, RmcFix)
+    assert rmc.status == "A" and rmc.latitude < 0 < rmc.longitude
+    assert rmc.datestamp == datetime.date(2025, 3, 23)
+    assert rmc.speed_knots == 22.4
+    assert parse(VTG) == VtgFix("GP", 54.7, 5.5, 10.2)
+
+
+@pytest.mark.parametrize("line", [GGA, bytearray(GGA), memoryview(b"  " + GGA)[2:], GGA.decode(), GGA + b"\r\n"])
+def test_accepts_bytes_like_and_str(line):
+    assert parse(line) == parse(GGA)
+
+
+@pytest.mark.parametrize("line", [
+    GGA[:-2] + b"00",                                # zła suma kontrolna
+    nmea("GPGSV,1,1,01,01,40,083,46"),               # nieobsługiwany typ
+    nmea("GPGGA,123519,4807.038,N"),                 # za mało pól
+    nmea("GPGGA,12x519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,,,,"),  # uszkodzone pole
+    b"GPGGA,123519", b"", b"$GP",
+])
+def test_rejects_bad_sentences(line):
+    assert parse(line) is None
+
+
+def test_missing_fix_fields_are_none():
+    msg = parse(nmea("GPGGA,,,,,,0,,,,,,,,"))
+    assert msg == GgaFix("GP", None, None, None, 0, None, None, None)
+
+
+def test_checksum_is_optional():
+    assert checksum_ok(b"$GPVTG,054.7,T,034.4,M,005.5,N,010.2,K")
+    assert parse(b"$GPVTG,054.7,T,034.4,M,005.5,N,010.2,K") == parse(VTG)
+
+
+def test_utc_time_rounds_microseconds():
+    assert utc_time(None) is None
+    assert utc_time(86399.9999999) == datetime.time(0, 0, 0, tzinfo=datetime.timezone.utc)
+    assert utc_time(45319.5) == datetime.time(12, 35, 19, 500000, tzinfo=datetime.timezone.utc)
+
+
+def test_matches_pynmea2():
+    pynmea2 = pytest.importorskip("pynmea2")
+    for line in (GGA, RMC):
+        ref = pynmea2.parse(line.decode())
+        msg = parse(line)
+        assert msg.latitude == pytest.approx(ref.latitude)
+        assert msg.longitude == pytest.approx(ref.longitude)
+        assert utc_time(msg.utc_seconds).replace(tzinfo=None) == ref.timestamp.replace(tzinfo=None)
+    assert parse(GGA).altitude == pynmea2.parse(GGA.decode()).altitude
@@ -0,0 +1,50 @@
+# tests/test_nmeastream.py
+from nmeastream import ChunkedSentenceReader
+
+
+class ChunkSerial:
+    """Port oddający kolejne porcje bajtów (pusta porcja = timeout)."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    @property
+    def in_waiting(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def readinto(self, buffer):
+        if not self.chunks:
+            return 0
+        chunk = self.chunks.pop(0)
+        n = min(len(buffer), len(chunk))
+        buffer[:n] = chunk[:n]
+        if n < len(chunk):
+            self.chunks.insert(0, chunk[n:])
+        return n
+
+
+def read_all(reader, reads):
+    return [[bytes(s) for s, _m, _w in reader.read_sentences()] for _ in range(reads)]
+
+
+def test_sentences_split_across_chunks():
+    ser = ChunkSerial([b"$A,1\r\n$B,", b"2\r\n\r\n$C", b"", b",3\n"])
+    reader = ChunkedSentenceReader(ser, 9600)
+    assert read_all(reader, 4) == [[b"$A,1"], [b"$B,2"], [], [b"$C,3"]]
+
+
+def test_sentence_stamps_interpolated_from_baud_rate():
+    ser = ChunkSerial([b"$A\r\n$BB\r\n"])
+    reader = ChunkedSentenceReader(ser, 9600)
+    (a, a_mono, a_wall), (b, b_mono, b_wall) = reader.read_sentences()
+    # $A kończy się 5 bajtów przed końcem porcji ($BB\r\n)
+    assert b_mono - a_mono == 5 * reader.byte_time_ns
+    assert b_wall - a_wall == 5 * reader.byte_time_ns
+    assert reader.byte_time_ns == 10 * 1_000_000_000 // 9600
+
+
+def test_line_longer_than_buffer_is_dropped():
+    ser = ChunkSerial([b"x" * 16, b"$A\r\n"])
+    reader = ChunkedSentenceReader(ser, 9600, capacity=16)
+    assert read_all(reader, 2) == [[], [b"$A"]]
+    assert reader.dropped_bytes == 16
@@ -0,0 +1,157 @@
+# tests/test_protocol.py
+import pytest
+
+from conftest import run_session, scenario
+from protocol import STEPS, TABLE, TRANSITIONS, ProtocolMachine, Transition, compile_table
+from session import FakeTriggerSink, Session
+from taskstate import TaskStateEnum as S
+
+
+def new_session(*actions):
+    session = Session(FakeTriggerSink(), instructions=[])
+    session.start()
+    session.run(actions)
+    return session
+
+
+def sent_since(session, n):
+    return [S(code) for code in session.sink.codes[n:]]
+
+
+def test_table_covers_every_step_once():
+    assert set(TABLE) == set(STEPS)
+    with pytest.raises(ValueError, match="Duplicate"):
+        compile_table(TRANSITIONS + [("error_button", "error", Transition())])
+
+
+def test_scenario_is_deterministic_and_uses_known_codes():
+    codes = run_session(scenario())
+    assert codes == run_session(scenario())
+    assert codes[0] == S.INIT_VALUE.value
+    assert {code for code in codes} <= {member.value for member in S}
+
+
+def test_correct_sends_current_state_after_marker():
+    session = new_session("command", "reply")
+    n = len(session.sink.codes)
+    session.perform("correct")
+    assert sent_since(session, n) == [S.CORRECT, S.REPLY]
+
+
+class BaselineEmitter:
+    """Bajty wysyłane przez dawne Exp_PilotHoldingTask (send_signal_to_dsi i akcje)."""
+
+    def __init__(self):
+        self.sent = []
+        self.last_sent_state = S.INIT_VALUE.value
+        self.prev_sent_state = None
+        self.send_signal_to_dsi(S.INIT_VALUE.value)
+
+    def send_signal_to_dsi(self, data):
+        self.prev_sent_state = self.last_sent_state
+        self.last_sent_state = data
+        self.sent.append(data)
+
+    def command(self):
+        self.send_signal_to_dsi(S.COMMAND.value)
+
+    def reply(self):
+        self.send_signal_to_dsi(S.REPLY.value)
+
+    def _marker(self, code):
+        current_state = self.last_sent_state
+        self.send_signal_to_dsi(code)
+        self.send_signal_to_dsi(current_state)
+
+    def correct(self):
+        self._marker(S.CORRECT.value)
+
+    def parameters(self):
+        self._marker(S.PARAMETERS.value)
+
+    def direct(self):
+        pass
+
+    def error(self):
+        self.send_signal_to_dsi(S.ERROR.value)
+        if self.prev_sent_state is not None:
+            self.send_signal_to_dsi(self.prev_sent_state)
+
+
+@pytest.mark.parametrize("actions", [
+    ("command", "error"),
+    ("command", "error", "error"),
+    ("command", "reply", "correct", "error"),
+    ("command", "reply", "correct", "parameters", "error"),
+    ("command", "reply", "correct", "parameters", "direct", "error"),
+])
+def test_error_sends_same_bytes_as_baseline(actions):
+    baseline = BaselineEmitter()
+    for name in actions:
+        getattr(baseline, name)()
+    session = new_session(*actions)
+    assert bytes(session.sink.codes) == bytes(baseline.sent)
+
+
+def test_error_after_command_resends_command_and_restores_step():
+    session = new_session("command")
+    n = len(session.sink.codes)
+    session.perform("error")
+    assert sent_since(session, n) == [S.ERROR, S.COMMAND]
+    assert session.machine.steps["start_left_button"] == "command"
+
+
+def test_undo_after_correct_restores_step():
+    session = new_session("command", "reply", "correct")
+    n = len(session.sink.codes)
+    session.perform("error")
+    assert sent_since(session, n) == [S.ERROR, S.REPLY]
+    assert session.machine.steps["start_left_button"] == "correct"
+
+
+def test_undo_after_action_without_code_restores_visibility():
+    session = new_session("command", "reply", "correct", "parameters")
+    visible = set(session.machine.visible)
+    last = session.last_sent_state
+    n = len(session.sink.codes)
+    session.perform("direct")  # wybór wlotu nie wysyła kodu
+    assert len(session.sink.codes) == n
+    assert session.machine.holding_type == "direct_button"
+
+    outcome = session.perform("error")
+    assert session.sink.codes[n:] == [S.ERROR.value, last]
+    assert session.machine.visible == visible
+    assert session.machine.holding_type is None
+    assert session.machine.steps["direct_button"] == "direct"
+    assert "parallel_button" in outcome.dirty
+
+
+def test_repeated_undo_steps_back_state_and_resends_last_code():
+    session = new_session("command", "reply", "correct")
+    n = len(session.sink.codes)
+    session.perform("error")
+    session.perform("error")
+    session.perform("error")
+    assert sent_since(session, n) == [S.ERROR, S.REPLY] * 3
+    assert session.machine.steps["start_left_button"] == "command"
+    assert not session.machine.undo_stack
+
+
+def test_undo_with_empty_stack_resends_current_code():
+    session = new_session()
+    session.perform("error")
+    assert sent_since(session, 1) == [S.ERROR, S.INIT_VALUE]
+
+
+def test_undo_stack_is_bounded():
+    machine = ProtocolMachine(lambda: S.INIT_VALUE.value)
+    for _ in range(ProtocolMachine.UNDO_DEPTH + 10):
+        machine.fire("water_button")
+    assert len(machine.undo_stack) == ProtocolMachine.UNDO_DEPTH
+
+
+def test_break_resumes_state_from_before_it():
+    session = new_session("command", "reply")
+    n = len(session.sink.codes)
+    session.run(["water", "water"])
+    assert sent_since(session, n) == [S.WATER, S.REPLY]
@@ -0,0 +1,74 @@
+# tests/test_rawcapture.py
+import gzip
+
+import pytest
+
+import rawcapture
+from rawcapture import RawCaptureWriter, TextCaptureWriter, iter_lines, iter_records, segment_paths
+
+SENTENCES = [b"$GPGGA,120000.00,5213.0,N,02100.0,E,1,08,0.9,100.0,M,,,,*5A", b"$GPVTG,,T,,M,0.0,N,0.0,K*4E"]
+
+
+def write_records(base, records, **kwargs):
+    with RawCaptureWriter(str(base), compression="gzip", **kwargs) as writer:
+        for mono_ns, wall_ns, data in records:
+            writer.write(mono_ns, wall_ns, data)
+    return writer.segment_paths
+
+
+def test_round_trip_with_rotation(tmp_path):
+    s = 1_000_000_000
+    records = [(i * 600 * s, 1_700_000_000 * s + i, SENTENCES[i % 2]) for i in range(7)]
+    paths = write_records(tmp_path / "raw", records, rotate_s=1800)
+    assert len(paths) == 3
+    assert segment_paths(str(tmp_path / "raw")) == paths
+    assert list(iter_records(str(tmp_path / "raw"))) == records
+    assert next(iter_lines(paths)).endswith(SENTENCES[0].decode())
+
+
+def test_writers_accept_memoryview(tmp_path):
+    data = bytearray(b"xx" + SENTENCES[0] + b"\r\n")
+    view = memoryview(data)[2:-2]
+    paths = write_records(tmp_path / "raw", [(1, 2, view)])
+    assert list(iter_records(paths)) == [(1, 2, SENTENCES[0])]
+    with TextCaptureWriter(str(tmp_path / "raw")) as writer:
+        writer.write(0, 1_700_000_000_000_000_000, view)
+    assert (tmp_path / "raw.txt").read_text().endswith(SENTENCES[0].decode() + "\n")
+
+
+def test_truncated_last_segment_is_read_up_to_last_full_frame(tmp_path):
+    records = [(i, i, SENTENCES[0]) for i in range(5)]
+    (path,) = write_records(tmp_path / "raw", records)
+    payload = gzip.decompress(open(path, "rb").read())
+    # Urwana ostatnia ramka i urwany strumień gzip (brak stopki)
+    compressed = gzip.compress(payload[:-10])
+    open(path, "wb").write(compressed[:-8])
+    assert list(iter_records(path)) == records[:4]
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "raw_0000.nmea.gz"
+    path.write_bytes(gzip.compress(b"not a capture"))
+    with pytest.raises(ValueError):
+        list(iter_records(str(path)))
+
+
+def test_default_compression_follows_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(rawcapture, "zstandard", None)
+    writer = RawCaptureWriter(str(tmp_path / "raw"))
+    assert writer.compression == "gzip"
+    writer.close()
+    with pytest.raises(RuntimeError):
+        RawCaptureWriter(str(tmp_path / "raw"), compression="zstd")
+
+
+def test_flush_due_writes_buffer_without_new_frames(tmp_path):
+    writer = RawCaptureWriter(str(tmp_path / "raw"), compression="gzip", flush_ms=0)
+    mono_ns = writer._last_flush_ns - 1  # ramka sprzed ostatniego flushu – write() nie flushuje
+    writer.write(mono_ns, 0, SENTENCES[0])
+    assert writer._pending
+    writer.flush_due()
+    assert not writer._pending
+    # Segment jeszcze otwarty (bez stopki gzip), ale ramka jest już na dysku
+    assert list(iter_records(writer.segment_paths)) == [(mono_ns, 0, SENTENCES[0])]
+    writer.close()
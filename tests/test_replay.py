@@ -0,0 +1,141 @@
+# tests/test_replay.py
+from datetime import datetime
+
+import pytest
+
+from conftest import FakeClock
+from rawcapture import RawCaptureWriter
+from replay import (ActionEvent, ActionReplayer, ReplaySerial, first_nmea_time, load_actions, load_nmea, parse_time,
+                    shared_playhead)
+from scheduler import Scheduler
+from session import FakeTriggerSink, Session
+from taskstate import TaskStateEnum as S
+
+T0 = datetime(2025, 1, 1, 12, 0, 0).timestamp()
+
+
+def test_load_nmea_from_text_and_raw_capture(tmp_path):
+    text = tmp_path / "GNSS_All_Log.txt"
+    text.write_text("2025-01-01 12:00:00.000: $A\nnoise\n$B\n2025-01-01 12:00:01.500: $C\n")
+    assert load_nmea(str(text)) == [(T0, b"$A"), (T0, b"$B"), (T0 + 1.5, b"$C")]
+
+    with RawCaptureWriter(str(tmp_path / "raw"), compression="gzip") as writer:
+        writer.write(1, int(T0 * 1e9), b"$A")
+    assert load_nmea(str(tmp_path / "raw")) == [(T0, b"$A")]
+
+
+def test_parse_time():
+    assert parse_time(None) is None
+    assert parse_time("12.5") == 12.5
+    assert parse_time("2025-01-01 12:00:00") == T0
+    assert parse_time("12:00:01", reference_t=T0 + 3600) == T0 + 1
+    with pytest.raises(ValueError):
+        parse_time("12:00:01")
+
+
+def test_replay_serial_releases_sentences_in_recorded_tempo():
+    clock = FakeClock(100.0)
+    slept = []
+
+    def sleep(s):
+        slept.append(s)
+        clock.now += s
+
+    records = [(T0, b"$A"), (T0 + 1.0, b"$B"), (T0 + 3.0, b"$C")]
+    ser = ReplaySerial(records, speed=2.0, clock=clock, sleep=sleep)
+    buffer = bytearray(64)
+    assert ser.in_waiting == 4
+    assert bytes(buffer[:ser.readinto(buffer)]) == b"$A\r\n"
+    # $B nagrano 1 s później – przy speed 2 czekamy 0.5 s
+    assert bytes(buffer[:ser.readinto(buffer)]) == b"$B\r\n"
+    assert slept == [0.5]
+    ser.seek(T0 + 3.0)
+    assert ser.read(64) == b"$C\r\n"
+    assert ser.finished
+
+
+def test_replay_serial_fastest_in_bursts():
+    records = [(T0 + i, b"$%d" % i) for i in range(10)]
+    ser = ReplaySerial(records, speed=None, burst=4, sleep=lambda s: None)
+    chunks = []
+    while not ser.finished:
+        chunks.append(ser.read(1000))
+    assert [chunk.count(b"$") for chunk in chunks] == [4, 4, 2]
+    assert b"".join(chunks) == b"".join(b"$%d\r\n" % i for i in range(10))
+
+
+def test_action_replayer_presses_logged_buttons_through_scheduler(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_text(
+        "2025-01-01 12:00:00.000 [ACTION] - Button clicked: Command (s)\n"
+        "2025-01-01 12:00:00.500 [INFO] - something else\n"
+        "2025-01-01 12:00:02.000 [ACTION] - Button clicked: Reply (s)\n"
+        "2025-01-01 12:00:03.000 [ACTION] - Button clicked: Start1 (w)\n"
+    )
+    events = load_actions(str(log))
+    assert [e.label for e in events] == ["Command (s)", "Reply (s)", "Start1 (w)"]
+
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    session = Session(FakeTriggerSink(), instructions=[])
+    replayer = ActionReplayer(events, session.machine, session.press, scheduler, speed=1.0)
+    replayer.start()
+    scheduler.run_due()
+    assert session.sink.codes == [S.COMMAND.value]
+    clock.now = 1.9
+    scheduler.run_due()
+    assert replayer.pressed == 1
+    clock.now = 3.0
+    scheduler.run_due()
+    scheduler.run_due()
+    assert replayer.finished and replayer.pressed == 2
+    # Start1 jest ukryty przed pierwszym holdingiem – zdarzenie pominięte
+    assert replayer.skipped == [events[2]]
+    assert session.sink.codes == [S.COMMAND.value, S.REPLY.value]
+
+
+def test_action_replayer_resolves_slot_names():
+    session = Session(FakeTriggerSink(), instructions=[])
+    replayer = ActionReplayer([], session.machine, session.press, Scheduler(clock=FakeClock()))
+    assert replayer.resolve(ActionEvent(0.0, slot="water_button")) == "water_button"
+    assert replayer.resolve(ActionEvent(0.0, slot="direct_button")) is None
+
+
+def test_shared_playhead_origin():
+    events = [ActionEvent(T0 + 5.0, slot="water_button")]
+    assert shared_playhead(1.0, events=events).origin_t == T0 + 5.0
+    assert shared_playhead(1.0, "12:00:01", events=events).origin_t == T0 + 1.0
+    assert not shared_playhead(1.0, events=events).started
+
+
+def test_click_fires_when_nmea_replay_reaches_its_time(tmp_path):
+    nmea = tmp_path / "GNSS_All_Log.txt"
+    nmea.write_text("".join(f"2025-01-01 12:00:0{i}.000: ${name}\n" for i, name in enumerate("ABCD")))
+    assert first_nmea_time(str(nmea)) == T0
+    # Pierwsza akcja nagrana 2 s po pierwszym zdaniu NMEA
+    events = [ActionEvent(T0 + 2.0, label="Command (s)")]
+
+    clock = FakeClock(50.0)
+    scheduler = Scheduler(clock=clock)
+    session = Session(FakeTriggerSink(), instructions=[])
+    playhead = shared_playhead(1.0, None, str(nmea), events, clock=clock)
+    ser = ReplaySerial(load_nmea(str(nmea)), playhead=playhead, sleep=lambda s: None)
+    seen = []
+    clicks = []
+
+    def press(slot):
+        clicks.append(seen[-1])
+        session.press(slot)
+
+    replayer = ActionReplayer(events, session.machine, press, scheduler, playhead=playhead)
+    assert ser.in_waiting == 0  # przed startem wspólnej osi nic nie wychodzi
+    playhead.start()
+    replayer.start()
+    for step in range(17):
+        clock.now = 50.0 + step * 0.25
+        if ser.in_waiting:
+            seen.extend(ser.read(ser.in_waiting).split())
+        scheduler.run_due()
+    assert seen == [b"$A", b"$B", b"$C", b"$D"]
+    assert clicks == [b"$C"]
+    assert session.sink.codes == [S.COMMAND.value]
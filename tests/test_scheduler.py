@@ -0,0 +1,67 @@
+# tests/test_scheduler.py
+from conftest import FakeClock, simulate
+from scheduler import LegTimer, Scheduler
+
+
+def test_call_later_runs_once_and_cancel_removes_task():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    calls = []
+    scheduler.call_later(1.0, lambda: calls.append("a"))
+    cancelled = scheduler.call_later(1.0, lambda: calls.append("b"))
+    cancelled.cancel()
+    assert len(scheduler) == 1
+
+    clock.now = 0.5
+    assert scheduler.run_due() == 0
+    clock.now = 1.0
+    assert scheduler.run_due() == 1
+    clock.now = 5.0
+    assert scheduler.run_due() == 0
+    assert calls == ["a"] and len(scheduler) == 0
+
+
+def test_call_every_skips_missed_periods_without_drift():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    handle = scheduler.call_every(1.0, lambda: None)
+
+    clock.now = 3.5  # przestój: terminy 1, 2, 3 wykonane raz
+    assert scheduler.run_due() == 1
+    assert handle.last_due == 1.0
+    assert handle.due == 4.0
+    clock.now = 4.0
+    assert scheduler.run_due() == 1
+    assert handle.due == 5.0
+
+
+def test_leg_timer_reset_replaces_its_task():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    ticks = []
+    timer = LegTimer(scheduler, ticks.append)
+    for second in range(10):
+        clock.now = float(second)
+        timer.reset()
+        scheduler.run_due()
+    assert len(scheduler) == 1
+    clock.now = 12.0
+    assert timer.elapsed == 3.0
+
+
+def test_scripted_session_keeps_callback_and_task_counts_constant():
+    minutes = simulate(hours=1.0, action_interval_s=5.0, step_s=0.1)
+    steady = minutes[5:]
+    calls = [m["callbacks"] for m in steady]
+    tasks = [m["tasks"] for m in steady]
+    # Mapa, status fix i licznik odcinka po 1 Hz (+/- przesunięcie fazy przy resecie), przypomnienie
+    assert max(calls) <= 3 * 60 + 10
+    assert min(calls) >= 3 * 60 - 10
+    assert max(tasks) <= 4
+    # Ostatnie pół godziny nie kosztuje więcej niż pierwsze
+    assert sum(calls[-25:]) <= sum(calls[:25]) + 25
+
+
+def test_legacy_timer_growth_is_detected():
+    minutes = simulate(hours=0.25, action_interval_s=5.0, step_s=0.1, legacy=True)
+    assert minutes[-1]["tasks"] > minutes[5]["tasks"]
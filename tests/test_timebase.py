@@ -0,0 +1,83 @@
+# tests/test_timebase.py
+import numpy as np
+import pytest
+
+from timebase import GnssTime, TimeBase, format_utc
+
+S = 1_000_000_000
+
+
+def feed(tb, start_utc, start_ns, n, drift_ppm=0.0, step_s=1.0):
+    for i in range(n):
+        mono_ns = start_ns + int(i * step_s * S)
+        tb.add_fix((start_utc + i * step_s * (1 + drift_ppm * 1e-6)) % 86400.0, mono_ns)
+    return start_ns + int(n * step_s * S)
+
+
+def test_not_ready_before_min_samples():
+    tb = TimeBase(min_samples=10)
+    feed(tb, 1000.0, 0, 9)
+    assert not tb.ready and tb.gnss_time(0) is None
+    feed(tb, 1009.0, 9 * S, 1)
+    assert tb.ready
+
+
+def test_fit_recovers_offset_and_drift():
+    tb = TimeBase()
+    feed(tb, 43200.0, 5 * S, 60, drift_ppm=50.0)
+    assert tb.drift_ppm == pytest.approx(50.0, abs=1e-3)
+    t = tb.gnss_time(5 * S + 30 * S)
+    assert t.utc_s == pytest.approx(43200.0 + 30 * (1 + 50e-6), abs=1e-6)
+    assert t.error_s == pytest.approx(0.0, abs=1e-6)
+
+
+def test_fit_continues_across_utc_midnight():
+    tb = TimeBase()
+    end_ns = feed(tb, 86400.0 - 30.0, 0, 60)  # 23:59:30 .. 00:00:29
+    assert tb.resets == 0 and tb.rejected == 0
+    t = tb.gnss_time(end_ns)
+    assert t.utc_s == pytest.approx(86400.0 + 30.0, abs=1e-6)
+    assert t.seconds_of_day == pytest.approx(30.0, abs=1e-6)
+    assert format_utc(t).startswith("00:00:30.000000")
+    # Stempel sprzed północy nadal daje czas poprzedniego dnia
+    assert tb.gnss_time(10 * S).seconds_of_day == pytest.approx(86400.0 - 20.0, abs=1e-6)
+
+
+def test_outliers_rejected_then_series_resets_axis():
+    tb = TimeBase(reset_after=3)
+    end_ns = feed(tb, 1000.0, 0, 20)
+    assert tb.add_fix(1020.0 + 5.0, end_ns) is False  # skok o 5 s
+    assert tb.rejected == 1 and tb.resets == 0
+    for i in range(1, 3):
+        tb.add_fix(1025.0 + i, end_ns + i * S)
+    assert tb.resets == 1
+    assert tb.fit.n == 1
+
+
+def test_missing_time_and_wall_clock_steps():
+    tb = TimeBase()
+    assert tb.add_fix(None, 0) is False
+    assert tb.add_fix(float("nan"), 0) is False
+    tb.add_fix(1000.0, 0, wall_ns=10 * S)
+    tb.add_fix(1001.0, S, wall_ns=11 * S)
+    tb.add_fix(1002.0, 2 * S, wall_ns=14 * S)  # zegar ścienny przestawiony o +2 s
+    assert tb.wall_steps == 1 and tb.last_wall_step_s == pytest.approx(2.0)
+
+
+def test_format_utc():
+    assert format_utc(GnssTime(3723.25, 0.0015)) == "01:02:03.250000±1.5 ms"
+
+
+def test_running_sums_match_full_fit_after_window_wraps():
+    rng = np.random.default_rng(1)
+    tb = TimeBase(window=50, outlier_s=1.0)
+    x = np.arange(3000) * 1.0 + 7200.0
+    y = 40000.0 + x * (1 + 30e-6) + rng.normal(0, 2e-3, len(x))
+    for xi, yi in zip(x, y):
+        assert tb.add_fix(float(yi), int(xi * S))
+    xs, ys = x[-50:] - x[0], y[-50:]
+    slope, intercept = np.polyfit(xs, ys, 1)
+    residual_s = np.sqrt(np.sum((ys - intercept - slope * xs) ** 2) / 48)
+    assert tb.drift_ppm == pytest.approx((slope - 1) * 1e6, abs=1e-3)
+    assert tb.fit.residual_s == pytest.approx(residual_s, rel=1e-6)
+    assert tb.gnss_time(int(x[-1] * S)).utc_s == pytest.approx(intercept + slope * xs[-1], abs=1e-9)
@@ -0,0 +1,43 @@
+# tests/test_trackbuffer.py
+import numpy as np
+
+from trackbuffer import ChunkedTrackHistory, TrackRingBuffer, TrackStore
+
+
+def test_ring_buffer_view_before_and_after_wraparound():
+    ring = TrackRingBuffer(4)
+    for k in range(3):
+        ring.append(float(k), float(-k))
+    lons, lats = ring.view()
+    assert lats.tolist() == [0.0, 1.0, 2.0] and lons.tolist() == [0.0, -1.0, -2.0]
+    for k in range(3, 10):
+        ring.append(float(k), float(-k))
+        lons, lats = ring.view()
+        assert lats.tolist() == [float(j) for j in range(max(0, k - 3), k + 1)]
+        assert lons.tolist() == [-lat for lat in lats.tolist()]
+    assert len(ring) == 4
+    # Widok bez kopii: ciągły wycinek bufora
+    assert np.shares_memory(ring.view()[1], ring._lats)
+
+
+def test_history_take_keeps_order_across_chunks():
+    history = ChunkedTrackHistory(chunk_size=4)
+    for k in range(11):
+        history.append(float(k), float(100 + k))
+    assert len(history) == 11
+    assert [len(c) for c in history.chunks()] == [4, 4, 3]
+    indices = [0, 3, 4, 5, 9, 10]
+    lons, lats = history.take(indices)
+    assert lats.tolist() == [float(k) for k in indices]
+    assert lons.tolist() == [float(100 + k) for k in indices]
+    lons, lats = history.to_arrays()
+    assert lats.tolist() == [float(k) for k in range(11)]
+
+
+def test_store_keeps_recent_window_and_full_history():
+    store = TrackStore(recent_capacity=3, chunk_size=4)
+    for k in range(7):
+        store.append(float(k), 0.0)
+    assert len(store) == 7
+    assert store.recent.view()[1].tolist() == [4.0, 5.0, 6.0]
+    assert store.lod.render(100)[1].tolist() == [float(k) for k in range(7)]
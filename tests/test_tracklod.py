@@ -0,0 +1,66 @@
+# tests/test_tracklod.py
+import numpy as np
+import pytest
+
+from trackbuffer import ChunkedTrackHistory
+from tracklod import TrackLOD
+
+N = 100_000
+SPIKE = 12_345
+
+
+@pytest.fixture(scope="module")
+def lod():
+    """Ślad na północ z łagodnym meandrem i jednym odskokiem na wschód."""
+    history = ChunkedTrackHistory(chunk_size=1024)
+    index = TrackLOD(history)
+    i = np.arange(N)
+    lats = 52.0 + i * 1e-6
+    lons = 21.0 + np.sin(i / 500) * 1e-4
+    lons[SPIKE] += 0.01
+    for k, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist())):
+        history.append(lat, lon)
+        index.append_index(k)
+    return index
+
+
+def test_short_track_is_drawn_in_full(lod):
+    assert np.array_equal(lod.select(N + 1), np.arange(N))
+
+
+@pytest.mark.parametrize("budget", [500, 2000, 5000])
+def test_select_covers_whole_track_within_budget(lod, budget):
+    selected = lod.select(budget)
+    assert selected[0] == 0 and selected[-1] == N - 1
+    assert np.all(np.diff(selected) > 0)
+    assert budget // 2 <= len(selected) <= budget
+    # Najnowsze punkty w pełnej rozdzielczości
+    recent = budget // 4
+    assert np.array_equal(selected[-recent:], np.arange(N - recent, N))
+    # Odskok daleko w historii przetrwał uproszczenie
+    assert SPIKE in selected
+
+
+def test_render_returns_coordinates(lod):
+    lons, lats = lod.render(1000)
+    assert len(lons) == len(lats) == len(lod.select(1000))
+    assert lons.max() == pytest.approx(21.01, abs=1e-3)
+
+
+def test_select_never_exceeds_budget_and_stays_in_range():
+    rng = np.random.default_rng(0)
+    history = ChunkedTrackHistory(chunk_size=256)
+    index = TrackLOD(history)
+    for k in range(5000):
+        history.append(52.0 + rng.normal() * 1e-3, 21.0 + rng.normal() * 1e-3)
+        index.append_index(k)
+    for n_budget in range(200):
+        budget = int(rng.integers(1, 600))
+        recent = int(rng.integers(0, 7000)) if n_budget % 3 else None
+        selected = index.select(budget, recent)
+        assert len(selected) <= budget
+        assert np.all(np.diff(selected) > 0)
+        assert selected[0] >= 0 and selected[-1] < len(index)
+    # Przypadek z przeglądu: prawie cały budżet na najnowsze punkty
+    assert len(index.select(100, recent=90)) <= 100
+    assert len(index.select(100, recent=10_000)) <= 100
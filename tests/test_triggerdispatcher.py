@@ -0,0 +1,62 @@
+# tests/test_triggerdispatcher.py
+from triggerdispatcher import TriggerDispatcher
+
+
+class FlakyPort:
+    """Port rzucający wyjątek dla wybranych kodów."""
+
+    def __init__(self, failing_codes):
+        self.failing_codes = set(failing_codes)
+        self.written = []
+
+    def send_signal(self, code):
+        if code in self.failing_codes:
+            raise ValueError(f"Unknown trigger code: {code}")
+        self.written.append(code)
+
+
+def test_port_error_does_not_stop_dispatcher():
+    port = FlakyPort({99})
+    errors = []
+    dispatcher = TriggerDispatcher(port, on_error=errors.append)
+    dispatcher.send(5)
+    dispatcher.send(99)
+    dispatcher.send_sequence([6, 99, 7], spacing_s=0.001)
+    dispatcher.stop()
+
+    assert port.written == [5, 6, 7]
+    assert [r.code for r in dispatcher.records] == [5, 6, 7]
+    assert dispatcher.failed == 2
+    assert [f.code for f in dispatcher.failures] == [99, 99]
+    assert len(errors) == 2 and "99" in errors[0]
+
+
+def test_failing_callback_does_not_stop_dispatcher():
+    port = FlakyPort(())
+    errors = []
+
+    def on_sent(record):
+        if record.code == 6:
+            raise RuntimeError("journal closed")
+
+    dispatcher = TriggerDispatcher(port, on_sent=on_sent, on_error=errors.append)
+    for code in (5, 6, 7):
+        dispatcher.send(code)
+    dispatcher.stop()
+
+    assert port.written == [5, 6, 7]
+    assert len(dispatcher.records) == 3
+    assert dispatcher.failed == 0
+    assert len(errors) == 1 and "journal closed" in errors[0]
+
+
+def test_unavailable_port_is_counted_but_not_reported():
+    class DownPort:
+        def send_signal(self, code):
+            return False
+
+    errors = []
+    dispatcher = TriggerDispatcher(DownPort(), on_error=errors.append)
+    dispatcher.send(5)
+    dispatcher.stop()
+    assert dispatcher.failed == 1 and not dispatcher.records and not errors
@@ -0,0 +1,266 @@
+# timebase.py
+"""
+Wspólna oś czasu: time.monotonic_ns, zegar ścienny i czas UTC z GNSS.
+
+Każde zdarzenie dostaje stempel ``time.monotonic_ns`` (odporny na kroki NTP).
+TimeBase dopasowuje na bieżąco prostą
+
+    UTC_GNSS = a + b * monotonic
+
+metodą najmniejszych kwadratów na oknie ostatnich ``window`` fixów (czas UTC
+z GGA vs moment odebrania zdania z NmeaStream). ``b`` daje dryf zegara
+komputera względem GNSS, ``a`` – przesunięcie. ``gnss_time(mono_ns)`` zwraca
+czas UTC zdarzenia z błędem standardowym predykcji (1 sigma), w którym jest
+rozrzut opóźnienia portu szeregowego wokół prostej.
+
+Dopasowanie liczone jest z sum bieżących okna (dodawanie nowej i odejmowanie
+wypadającej próbki), więc fix kosztuje O(1) niezależnie od ``window``. Sumy
+są liczone dla ``u = y - x - y_ref`` (odchyłka od prostej o nachyleniu 1),
+żeby odejmowanie dużych liczb nie zjadało precyzji reszt; co ``window``
+próbek są przeliczane od nowa, żeby błąd zaokrągleń się nie kumulował.
+
+Stałe opóźnienie zdania (koniec epoki -> ostatni bajt GGA na porcie) przesuwa
+całą prostą; bez sygnału PPS nie da się go zmierzyć, więc jest parametrem
+``latency_s`` (domyślnie 0). Rozrzut reszt (``residual_s``) to miara jittera
+portu szeregowego.
+
+Triggery mają stemple time.perf_counter_ns (dispatcher); ``perf_to_mono``
+przelicza je na monotonic – na Linuksie to ten sam zegar, na Windows
+przesunięcie jest kalibrowane przy każdym fixie (przed Pythonem 3.13
+monotonic ma tam rozdzielczość ~16 ms).
+
+Zapis (``add_fix``) z jednego wątku – GPS albo GUI; odczyt z dowolnego:
+dopasowanie jest podmieniane jedną krotką.
+"""
+import math
+import time
+from collections import deque
+from typing import NamedTuple
+
+_DAY_S = 86400.0
+_SAME_CLOCK = (
+    time.get_clock_info("monotonic").implementation == time.get_clock_info("perf_counter").implementation
+)
+
+
+class GnssTime(NamedTuple):
+    utc_s: float    # sekundy od północy UTC pierwszego dnia sesji (po północy > 86400)
+    error_s: float  # błąd standardowy (1 sigma)
+
+    @property
+    def seconds_of_day(self):
+        return self.utc_s % _DAY_S
+
+
+class _Fit(NamedTuple):
+    x0_ns: int      # początek osi x (monotonic_ns pierwszej próbki)
+    x_mean: float
+    y_mean: float
+    slope: float
+    residual_s: float
+    n: int
+    sxx: float
+
+
+class TimeBase:
+    def __init__(self, window=300, min_samples=10, outlier_s=0.25, reset_after=5, latency_s=0.0,
+                 wall_step_s=0.05):
+        self.window = window
+        self.min_samples = min_samples
+        self.outlier_s = outlier_s
+        self.reset_after = reset_after
+        self.latency_s = latency_s
+        self.wall_step_s = wall_step_s
+
+        self._samples = deque(maxlen=window)  # (x_s, u_s)
+        self._sums = [0.0] * 5  # sum x, u, x*x, x*u, u*u
+        self._y_ref = None
+        self._appended = 0
+        self._x0_ns = None
+        self._day_offset = 0.0
+        self._last_y = None
+        self._outliers_in_row = 0
+        self.fit = None
+        self.rejected = 0
+        self.resets = 0
+
+        self._wall_offset_ns = None
+        self.wall_steps = 0
+        self.last_wall_step_s = 0.0
+
+        self._perf_offset_ns = 0
+        self.calibrate()
+
+    # ------------------------------------------------------------------
+    # Zegary lokalne
+    # ------------------------------------------------------------------
+    @staticmethod
+    def stamp():
+        """(monotonic_ns, wall_ns) – stempel zdarzenia."""
+        return time.monotonic_ns(), time.time_ns()
+
+    def calibrate(self):
+        """Przesunięcie perf_counter -> monotonic (z najwęższego z kilku odczytów)."""
+        if _SAME_CLOCK:
+            return
+        best = None
+        for _ in range(5):
+            p0 = time.perf_counter_ns()
+            m = time.monotonic_ns()
+            p1 = time.perf_counter_ns()
+            if best is None or p1 - p0 < best[0]:
+                best = (p1 - p0, m - (p0 + p1) // 2)
+        self._perf_offset_ns = best[1]
+
+    def perf_to_mono(self, perf_ns):
+        return perf_ns + self._perf_offset_ns
+
+    # ------------------------------------------------------------------
+    # Fixy GNSS
+    # ------------------------------------------------------------------
+    def add_fix(self, utc_seconds, mono_ns, wall_ns=None):
+        """Próbka: czas UTC z GGA (sekundy doby) odebrany w chwili ``mono_ns``; False = odrzucona."""
+        if wall_ns is not None:
+            self._check_wall(wall_ns, mono_ns)
+        if utc_seconds is None or math.isnan(utc_seconds):
+            return False
+        self.calibrate()
+
+        if self._x0_ns is None:
+            self._x0_ns = mono_ns
+        y = utc_seconds + self._day_offset + self.latency_s
+        if self._last_y is not None and y < self._last_y - _DAY_S / 2:  # północ UTC
+            self._day_offset += _DAY_S
+            y += _DAY_S
+        x = (mono_ns - self._x0_ns) / 1e9
+
+        fit = self.fit
+        if fit is not None and fit.n >= self.min_samples:
+            residual = y - self._predict(fit, x)
+            if abs(residual) > max(self.outlier_s, 5 * fit.residual_s):
+                # Powtórzona epoka albo skok czasu odbiornika; seria odrzuceń = nowa oś
+                self.rejected += 1
+                self._outliers_in_row += 1
+                if self._outliers_in_row < self.reset_after:
+                    return False
+                self._clear()
+                self.resets += 1
+        self._outliers_in_row = 0
+        self._last_y = y
+        self._append(x, y)
+        self._refit()
+        return True
+
+    def add_fixes(self, batch):
+        """Fixy z GnssProcess.poll() (tablica ``SLOT_DTYPE``)."""
+        for t_gnss, mono_ns, t_local in zip(batch["t_gnss"].tolist(), batch["mono_ns"].tolist(),
+                                            batch["t_local"].tolist()):
+            self.add_fix(t_gnss, mono_ns, int(t_local * 1e9))
+
+    def _check_wall(self, wall_ns, mono_ns):
+        """Kroki zegara ściennego (NTP, ręczna zmiana) względem monotonic."""
+        offset = wall_ns - mono_ns
+        if self._wall_offset_ns is not None:
+            step = (offset - self._wall_offset_ns) / 1e9
+            if abs(step) > self.wall_step_s:
+                self.wall_steps += 1
+                self.last_wall_step_s = step
+        self._wall_offset_ns = offset
+
+    def _clear(self):
+        self._samples.clear()
+        self._sums = [0.0] * 5
+        self._y_ref = None
+
+    def _append(self, x, y):
+        samples = self._samples
+        if self._y_ref is None:
+            self._y_ref = y - x
+        u = y - x - self._y_ref
+        sums = self._sums
+        if len(samples) == samples.maxlen:
+            old_x, old_u = samples[0]
+            sums[0] -= old_x
+            sums[1] -= old_u
+            sums[2] -= old_x * old_x
+            sums[3] -= old_x * old_u
+            sums[4] -= old_u * old_u
+        samples.append((x, u))
+        self._appended += 1
+        if self._appended % samples.maxlen == 0:
+            self._sums = [
+                math.fsum(x for x, _ in samples), math.fsum(u for _, u in samples),
+                math.fsum(x * x for x, _ in samples), math.fsum(x * u for x, u in samples),
+                math.fsum(u * u for _, u in samples),
+            ]
+            return
+        sums[0] += x
+        sums[1] += u
+        sums[2] += x * x
+        sums[3] += x * u
+        sums[4] += u * u
+
+    def _refit(self):
+        n = len(self._samples)
+        sx, su, sxx, sxu, suu = self._sums
+        x_mean = sx / n
+        u_mean = su / n
+        y_mean = x_mean + self._y_ref + u_mean
+        sxx -= sx * x_mean
+        if n < 2 or sxx <= 0:
+            self.fit = _Fit(self._x0_ns, x_mean, y_mean, 1.0, 0.0, n, 0.0)
+            return
+        sxu -= sx * u_mean
+        beta = sxu / sxx
+        sse = max(0.0, suu - su * u_mean - beta * sxu)
+        residual_s = math.sqrt(sse / (n - 2)) if n > 2 else 0.0
+        self.fit = _Fit(self._x0_ns, x_mean, y_mean, 1.0 + beta, residual_s, n, sxx)
+
+    @staticmethod
+    def _predict(fit, x):
+        return fit.y_mean + fit.slope * (x - fit.x_mean)
+
+    # ------------------------------------------------------------------
+    # Czas GNSS zdarzeń
+    # ------------------------------------------------------------------
+    @property
+    def ready(self):
+        fit = self.fit
+        return fit is not None and fit.n >= self.min_samples
+
+    def gnss_time(self, mono_ns):
+        """GnssTime dla chwili ``mono_ns``; None, dopóki nie ma ``min_samples`` fixów."""
+        fit = self.fit
+        if fit is None or fit.n < self.min_samples:
+            return None
+        x = (mono_ns - fit.x0_ns) / 1e9
+        error_s = fit.residual_s * math.sqrt(1 / fit.n + (x - fit.x_mean) ** 2 / fit.sxx)
+        return GnssTime(self._predict(fit, x), error_s)
+
+    def gnss_time_perf(self, perf_ns):
+        return self.gnss_time(self.perf_to_mono(perf_ns))
+
+    @property
+    def drift_ppm(self):
+        fit = self.fit
+        return (fit.slope - 1.0) * 1e6 if fit is not None and fit.n >= 2 else None
+
+    def summary(self):
+        fit = self.fit
+        return {
+            "samples": fit.n if fit else 0,
+            "drift_ppm": self.drift_ppm,
+            "residual_ms": fit.residual_s * 1000 if fit else None,
+            "rejected": self.rejected,
+            "resets": self.resets,
+            "wall_steps": self.wall_steps,
+            "last_wall_step_s": self.last_wall_step_s,
+        }
+
+
+def format_utc(gnss_time):
+    """"HH:MM:SS.ffffff±E ms" dla logu."""
+    s = gnss_time.seconds_of_day
+    h, rem = divmod(s, 3600)
+    m, sec = divmod(rem, 60)
+    return f"{int(h):02d}:{int(m):02d}:{sec:09.6f}±{gnss_time.error_s * 1000:.1f} ms"
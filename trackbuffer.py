@@ -0,0 +1,110 @@
+# trackbuffer.py
+"""
+Przechowywanie śladu GPS dla mapy na żywo.
+
+TrackRingBuffer – prealokowany bufor pierścieniowy ostatnich ``capacity``
+punktów. Każdy punkt jest zapisywany dwukrotnie (pod indeksem ``i`` oraz
+``i + capacity``), dzięki czemu okno ostatnich punktów jest zawsze ciągłym
+wycinkiem tablicy: dopisanie jest O(1), a widok dla wykresu – bez kopiowania.
+
+ChunkedTrackHistory – pełny ślad sesji w porcjach stałej wielkości, bez
+realokacji całej historii przy dopisywaniu.
+
+TrackStore łączy oba oraz indeks TrackLOD (tracklod.py), który pozwala
+narysować cały ślad sesji w stałym budżecie punktów.
+"""
+import numpy as np
+
+from tracklod import TrackLOD
+
+
+class TrackRingBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._lons = np.empty(2 * capacity)
+        self._lats = np.empty(2 * capacity)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, lat, lon):
+        i = self._head
+        self._lats[i] = self._lats[i + self.capacity] = lat
+        self._lons[i] = self._lons[i + self.capacity] = lon
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def view(self):
+        """(lons, lats) – widoki od najstarszego do najnowszego punktu."""
+        if self._count < self.capacity:
+            start = 0
+        else:
+            start = self._head
+        end = start + self._count
+        return self._lons[start:end], self._lats[start:end]
+
+
+class ChunkedTrackHistory:
+    def __init__(self, chunk_size=4096):
+        self.chunk_size = chunk_size
+        self._chunks = []
+        self._fill = chunk_size  # wymusza utworzenie pierwszej porcji
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, lat, lon):
+        if self._fill == self.chunk_size:
+            self._chunks.append(np.empty((self.chunk_size, 2)))
+            self._fill = 0
+        self._chunks[-1][self._fill] = (lon, lat)
+        self._fill += 1
+        self._count += 1
+
+    def chunks(self):
+        """Zapełnione fragmenty porcji jako tablice (n, 2) kolumn lon, lat (widoki)."""
+        if not self._chunks:
+            return []
+        return self._chunks[:-1] + [self._chunks[-1][:self._fill]]
+
+    def point(self, index):
+        """(lon, lat) punktu o danym indeksie."""
+        return self._chunks[index // self.chunk_size][index % self.chunk_size]
+
+    def take(self, indices):
+        """(lons, lats) dla podanych (rosnących) indeksów punktów w sesji."""
+        indices = np.asarray(indices, dtype=np.int64)
+        out = np.empty((len(indices), 2))
+        chunk_ids = indices // self.chunk_size
+        offsets = indices % self.chunk_size
+        for chunk_id in np.unique(chunk_ids):
+            mask = chunk_ids == chunk_id
+            out[mask] = self._chunks[chunk_id][offsets[mask]]
+        return out[:, 0], out[:, 1]
+
+    def to_arrays(self):
+        """(lons, lats) całej sesji (kopia)."""
+        chunks = self.chunks()
+        if not chunks:
+            return np.empty(0), np.empty(0)
+        data = np.concatenate(chunks)
+        return data[:, 0], data[:, 1]
+
+
+class TrackStore:
+    def __init__(self, recent_capacity, chunk_size=4096):
+        self.recent = TrackRingBuffer(recent_capacity)
+        self.history = ChunkedTrackHistory(chunk_size)
+        self.lod = TrackLOD(self.history)
+
+    def __len__(self):
+        return len(self.history)
+
+    def append(self, lat, lon):
+        self.recent.append(lat, lon)
+        self.history.append(lat, lon)
+        self.lod.append_index(len(self.history) - 1)
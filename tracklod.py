@@ -0,0 +1,149 @@
+# tracklod.py
+"""
+Wielorozdzielczy indeks śladu GPS (level of detail) dla mapy na żywo.
+
+Poziom ``k`` dzieli ślad na wyrównane kubełki po ``2**k`` punktów; każdy
+kubełek zapamiętuje punkt początkowy (niejawnie) oraz punkt najbardziej
+odchylony od cięciwy kubełka (jeden krok Douglasa–Peuckera). Kubełek poziomu
+``k + 1`` powstaje z dwóch sąsiednich kubełków poziomu ``k`` w chwili, gdy
+drugi z nich się zapełni – dopisanie punktu kosztuje zamortyzowane O(1)
+i nigdy nie przelicza całej historii.
+
+``render`` dobiera poziomy tak, aby cały ślad zmieścił się w budżecie
+punktów: najnowsze punkty w pełnej rozdzielczości, starsze odcinki coraz
+mocniej uproszczone.
+"""
+import heapq
+import math
+
+import numpy as np
+
+
+def _cover_cost(cursor):
+    """Najmniejsza liczba punktów pokrycia [0, cursor) kubełkami (rozkład binarny)."""
+    return 2 * bin(cursor).count("1") - (cursor & 1)
+
+
+class TrackLOD:
+    def __init__(self, history):
+        """``history`` – ChunkedTrackHistory, z której czytane są współrzędne."""
+        self._history = history
+        self._fars = [None]  # _fars[k][j] – indeks punktu "far" kubełka j poziomu k
+        self._count = 0
+        self._lon_scale = None
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def levels(self):
+        return len(self._fars) - 1
+
+    def _xy(self, index):
+        lon, lat = self._history.point(index)
+        return lon * self._lon_scale, lat
+
+    def _deviation(self, a, c, p):
+        """Odległość punktu p od cięciwy a–c (w układzie lokalnie równoodległym)."""
+        ax, ay = self._xy(a)
+        cx, cy = self._xy(c)
+        px, py = self._xy(p)
+        dx, dy = cx - ax, cy - ay
+        norm = math.hypot(dx, dy)
+        if norm == 0.0:
+            return math.hypot(px - ax, py - ay)
+        return abs(dx * (py - ay) - dy * (px - ax)) / norm
+
+    def append_index(self, index):
+        """Rejestruje punkt ``index`` (już dopisany do historii)."""
+        if self._lon_scale is None:
+            _lon, lat = self._history.point(index)
+            self._lon_scale = math.cos(math.radians(lat))
+        self._count = index + 1
+        if index % 2 == 0:
+            return
+
+        # Kubełek poziomu 1 (dwa punkty) jest kompletny; łączymy w górę
+        level, far = 1, index
+        while True:
+            if len(self._fars) <= level:
+                self._fars.append([])
+            fars = self._fars[level]
+            fars.append(far)
+            j = len(fars) - 1
+            if j % 2 == 0:
+                return
+            size = 1 << level
+            start = (j - 1) * size
+            end = start + 2 * size - 1
+            candidates = (fars[j - 1], j * size, far)
+            far = max(candidates, key=lambda p: self._deviation(start, end, p))
+            level += 1
+
+    def select(self, budget, recent=None, first_level=2):
+        """Rosnące indeksy punktów do narysowania (najwyżej ``budget`` punktów z [0, n)).
+
+        ``recent`` – ile najnowszych punktów pokazać w pełnej rozdzielczości
+        (domyślnie ćwierć budżetu; najwyżej ``budget``).
+        """
+        n = self._count
+        if n <= budget:
+            return np.arange(n, dtype=np.int64)
+        if budget <= 0:
+            return np.zeros(0, dtype=np.int64)
+        if recent is None:
+            recent = budget // 4
+        recent = max(0, min(recent, n, budget))
+        first_level = max(1, min(first_level, self.levels))
+
+        # Starszą część [0, cursor) musi pokryć co najmniej rozkład binarny cursor
+        while recent and recent + _cover_cost(n - recent) > budget:
+            recent -= 1
+        cursor = n - recent
+        if _cover_cost(cursor) > budget:
+            # Budżet mniejszy niż ~2*log2(n) – tylko równomierne próbkowanie
+            return np.unique(np.linspace(0, n - 1, budget).astype(np.int64))
+
+        points = []
+        for start, level in sorted(self._coarse_buckets(cursor, budget - recent, first_level)):
+            points.append(start)
+            if level:
+                points.append(self._fars[level][start >> level])
+        return np.concatenate((np.asarray(points, dtype=np.int64), np.arange(cursor, n, dtype=np.int64)))
+
+    def _coarse_buckets(self, cursor, available, first_level):
+        """Kubełki (start, poziom) pokrywające [0, cursor) w ``available`` punktach.
+
+        Start: rozkład binarny ``cursor`` (najmniej kubełków). Potem dzielony
+        jest kubełek największy względem swojego wieku (rozmiar / odległość od
+        ``cursor``), więc rozmiar kubełków rośnie z wiekiem – pasma o podobnej
+        liczbie punktów. Podział kubełka poziomu >= 2 kosztuje 2 punkty.
+        """
+        buckets = []
+        heap = []
+        used = 0
+        start = 0
+        for level in range(cursor.bit_length() - 1, -1, -1):
+            if cursor >> level & 1:
+                used += 2 if level else 1
+                self._push_bucket(heap, buckets, cursor, start, level, first_level)
+                start += 1 << level
+        while heap and used + 2 <= available:
+            _priority, start, level = heapq.heappop(heap)
+            used += 2
+            half = 1 << (level - 1)
+            for child in (start, start + half):
+                self._push_bucket(heap, buckets, cursor, child, level - 1, first_level)
+        buckets.extend((start, level) for _priority, start, level in heap)
+        return buckets
+
+    @staticmethod
+    def _push_bucket(heap, buckets, cursor, start, level, first_level):
+        if level > first_level:
+            heapq.heappush(heap, (-(1 << level) / (cursor - start), start, level))
+        else:
+            buckets.append((start, level))
+
+    def render(self, budget, recent=None):
+        """(lons, lats) całego śladu uproszczonego do najwyżej ``budget`` punktów."""
+        return self._history.take(self.select(budget, recent))
@@ -0,0 +1,136 @@
+# triggerdispatcher.py
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+
+class TriggerRecord(NamedTuple):
+    """Timing of a single trigger byte (all stamps from time.perf_counter_ns).
+
+    ``input_ns`` is when the operator input that caused the trigger reached the
+    key / button handler, or None for triggers not caused by an input event.
+    """
+    code: int
+    enqueue_ns: int
+    write_ns: int
+    input_ns: Optional[int] = None
+
+
+class TriggerFailure(NamedTuple):
+    """A trigger byte the port did not write (exception or ``send_signal`` returning False)."""
+    code: int
+    enqueue_ns: int
+    fail_ns: int
+    error: str
+
+
+def sleep_until_ns(target_ns, spin_ns=2_000_000):
+    """Hybrid wait: sleep most of the interval, busy-wait the last ``spin_ns``."""
+    while True:
+        remaining = target_ns - time.perf_counter_ns()
+        if remaining <= 0:
+            return
+        if remaining > spin_ns:
+            time.sleep((remaining - spin_ns) / 1e9)
+
+
+class TriggerDispatcher:
+    """Owns the DSI serial port on its own thread and writes queued trigger codes.
+
+    ``send`` and ``send_sequence`` only put a job on a queue, so the Tk main loop
+    never waits on the serial write or on the spacing between pulses. Codes of a
+    sequence are written ``spacing_s`` apart, measured from the first write.
+
+    With ``stats`` (instrumentation.Instrumentation) the thread records the queue
+    wait before the first write of each job (``dispatch.queue``) and the duration
+    of every serial write (``dispatch.write``), and for input-driven triggers
+    the time from the input handler to the write (``dispatch.input_to_write``).
+
+    A failing write or ``on_sent`` callback never stops the thread: the error is
+    passed to ``on_error(message)`` (default: printed), failed writes are kept in
+    ``failures`` and counted in ``failed``, and the next trigger is written as usual.
+    """
+
+    def __init__(self, port, spin_ns=2_000_000, history=10_000, on_sent=None, stats=None, on_error=None):
+        self._port = port
+        self._spin_ns = spin_ns
+        self._on_sent = on_sent
+        self._stats = stats
+        self._on_error = on_error or print
+        self._jobs = queue.Queue()
+        self.records = deque(maxlen=history)
+        self.failures = deque(maxlen=history)
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="TriggerDispatcher", daemon=True)
+        self._thread.start()
+
+    def send(self, code, input_ns=None):
+        """Queue a single trigger code. Returns the enqueue timestamp (ns)."""
+        enqueue_ns = time.perf_counter_ns()
+        self._jobs.put(((code,), 0, enqueue_ns, input_ns))
+        return enqueue_ns
+
+    def send_sequence(self, codes, spacing_s=0.01, input_ns=None):
+        """Queue several codes to be written ``spacing_s`` seconds apart."""
+        enqueue_ns = time.perf_counter_ns()
+        self._jobs.put((tuple(codes), int(spacing_s * 1e9), enqueue_ns, input_ns))
+        return enqueue_ns
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            codes, spacing_ns, enqueue_ns, input_ns = job
+            first_ns = None
+            for i, code in enumerate(codes):
+                if first_ns is None:
+                    first_ns = time.perf_counter_ns()
+                    if self._stats is not None:
+                        self._stats.record("dispatch.queue", first_ns - enqueue_ns)
+                else:
+                    sleep_until_ns(first_ns + i * spacing_ns, self._spin_ns)
+                write_start_ns = time.perf_counter_ns()
+                try:
+                    written = self._port.send_signal(code)
+                except Exception as error:
+                    self._write_failed(code, enqueue_ns, repr(error))
+                    continue
+                if written is False:
+                    # Port down; DSISerialPort keeps the trigger in ``pending`` and logs the outage itself
+                    self._write_failed(code, enqueue_ns, "port unavailable", report=False)
+                    continue
+                record = TriggerRecord(code, enqueue_ns, time.perf_counter_ns(), input_ns)
+                if self._stats is not None:
+                    self._stats.record("dispatch.write", record.write_ns - write_start_ns)
+                    if input_ns is not None:
+                        self._stats.record("dispatch.input_to_write", record.write_ns - input_ns)
+                self.records.append(record)
+                if self._on_sent:
+                    try:
+                        self._on_sent(record)
+                    except Exception as error:
+                        self._report(f"Trigger {code} written, on_sent callback failed: {error!r}")
+
+    def _write_failed(self, code, enqueue_ns, error, report=True):
+        failure = TriggerFailure(code, enqueue_ns, time.perf_counter_ns(), error)
+        self.failed += 1
+        self.failures.append(failure)
+        if self._stats is not None:
+            self._stats.record("dispatch.failed", failure.fail_ns - enqueue_ns)
+        if report:
+            self._report(f"Trigger {code} not written: {error}")
+
+    def _report(self, message):
+        try:
+            self._on_error(message)
+        except Exception:
+            pass
+
+    def stop(self, timeout=2.0):
+        """Write everything already queued, then stop the thread."""
+        self._jobs.put(None)
+        self._thread.join(timeout=timeout)